@@ -89,7 +89,10 @@ class UserResource(Resource):
     def put(self, user_id):
         """Update a user's information"""
         user_data = api.payload
-        updated_user = facade.update_user(user_id, user_data)
+        try:
+            updated_user = facade.update_user(user_id, user_data)
+        except (TypeError, ValueError) as e:
+            return {'error': str(e)}, 400
         if not updated_user:
             return {'error': 'User not found'}, 404
         return {'id': updated_user.id,
@@ -27,10 +27,62 @@ class Repository(ABC):
 
 
 class InMemoryRepository(Repository):
-    def __init__(self):
+    """Dictionary-backed repository with optional secondary hash indexes.
+
+    unique_indexes map one attribute value to a single object, indexes map a
+    value to every object holding it. Both are kept up to date by add, update
+    and delete, so lookups on an indexed attribute do not scan the storage.
+    """
+
+    def __init__(self, unique_indexes=(), indexes=()):
         self._storage = {}
+        self._unique = {attr: {} for attr in unique_indexes}
+        self._multi = {attr: {} for attr in indexes}
+        self._indexed = {}
+
+    def _check_unique(self, obj_id, values):
+        for attr, index in self._unique.items():
+            owner = index.get(values[attr])
+            if owner is not None and owner != obj_id:
+                raise ValueError(f'{attr} must be unique')
+
+    def _index(self, obj):
+        values = {attr: getattr(obj, attr, None) for attr in (*self._unique, *self._multi)}
+        self._check_unique(obj.id, values)
+        self._insert(obj.id, values)
+
+    def _unindex(self, obj_id):
+        values = self._indexed.pop(obj_id, None)
+        if values is None:
+            return
+        for attr, index in self._unique.items():
+            if index.get(values[attr]) == obj_id:
+                del index[values[attr]]
+        for attr, index in self._multi.items():
+            bucket = index.get(values[attr], {})
+            bucket.pop(obj_id, None)
+            if not bucket:
+                index.pop(values[attr], None)
+
+    def _reindex(self, obj):
+        previous = self._indexed.get(obj.id)
+        self._unindex(obj.id)
+        try:
+            self._index(obj)
+        except ValueError:
+            if previous is not None:
+                self._insert(obj.id, previous)
+            raise
+
+    def _insert(self, obj_id, values):
+        for attr, index in self._unique.items():
+            index[values[attr]] = obj_id
+        for attr, index in self._multi.items():
+            index.setdefault(values[attr], {})[obj_id] = None
+        self._indexed[obj_id] = values
 
     def add(self, obj):
+        self._reindex(obj)
         self._storage[obj.id] = obj
 
     def get(self, obj_id):
@@ -42,11 +94,38 @@ class InMemoryRepository(Repository):
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
-            obj.update(data)
+            # Check the new values before changing anything, so a conflict
+            # leaves both the object and the indexes as they were
+            values = {attr: data.get(attr, value) for attr, value in self._indexed[obj_id].items()}
+            self._check_unique(obj_id, values)
+            previous = {key: getattr(obj, key) for key in data if hasattr(obj, key)}
+            try:
+                obj.update(data)
+            except (TypeError, ValueError):
+                # A setter rejected one of the values: undo the ones already applied
+                for key, value in previous.items():
+                    setattr(obj, key, value)
+                raise
+            self._reindex(obj)
 
     def delete(self, obj_id):
         if obj_id in self._storage:
+            self._unindex(obj_id)
             del self._storage[obj_id]
 
     def get_by_attribute(self, attr_name, attr_value):
+        if attr_name in self._unique:
+            return self._storage.get(self._unique[attr_name].get(attr_value))
+        if attr_name in self._multi:
+            bucket = self._multi[attr_name].get(attr_value)
+            return self._storage[next(iter(bucket))] if bucket else None
         return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """Return every object whose attribute equals attr_value."""
+        if attr_name in self._multi:
+            return [self._storage[obj_id] for obj_id in self._multi[attr_name].get(attr_value, ())]
+        if attr_name in self._unique:
+            obj = self.get_by_attribute(attr_name, attr_value)
+            return [obj] if obj else []
+        return [obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value]
@@ -7,10 +7,10 @@ from app.models.review import Review
 
 class HBnBFacade:
     def __init__(self):
-        self.user_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
-        self.amenity_repo = InMemoryRepository()
+        self.user_repo = InMemoryRepository(unique_indexes=('email',))
+        self.place_repo = InMemoryRepository(indexes=('owner_id',))
+        self.review_repo = InMemoryRepository(indexes=('place_id',))
+        self.amenity_repo = InMemoryRepository(indexes=('name',))
 
     # Users
     def create_user(self, user_data):
@@ -40,11 +40,8 @@ class HBnBFacade:
         required_fields = {'first_name', 'last_name', 'email'}
         if not required_fields.issubset(user_data):
             raise TypeError('Missing required fields in payload')
-        
-        for key, value in user_data.items():
-            if hasattr(user, key):
-                setattr(user, key, value)
-        
+
+        # The repository applies the changes once the email is known to be free
         self.user_repo.update(user_id, user_data)
         return user
     # Users
@@ -64,6 +61,10 @@ class HBnBFacade:
         """Retrieve all places."""
         return self.place_repo.get_all()
 
+    def get_places_by_owner(self, owner_id):
+        """Retrieve all places owned by a specific user."""
+        return self.place_repo.get_all_by_attribute('owner_id', owner_id)
+
     def update_place(self, place_id, place_data):
         """Update place details if the place exists."""
         place = self.place_repo.get(place_id)
@@ -127,7 +128,7 @@ class HBnBFacade:
 
     def get_reviews_by_place(self, place_id):
         """Retrieve all reviews associated with a specific place."""
-        return [review for review in self.review_repo.get_all() if review.place_id == place_id]
+        return self.review_repo.get_all_by_attribute('place_id', place_id)
 
     def update_review(self, review_id, review_data):
         """Update review details if the review exists."""
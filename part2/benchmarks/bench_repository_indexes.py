@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""Lookup latency of InMemoryRepository with and without secondary indexes.
+
+The place_id column measures get_all_by_attribute over buckets that grow
+with the table (size / 1000 reviews per place), so it is O(k), not O(1).
+
+Run from part2/: python -m benchmarks.bench_repository_indexes
+"""
+import random
+import sys
+import timeit
+
+from app.persistence.repository import InMemoryRepository
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+SCAN_LIMIT = 100_000  # linear scans past this size take minutes
+LOOKUPS = 1_000
+PLACES = 1_000
+
+
+class Record:
+    """Minimal stand-in for a model: id plus the indexed attributes."""
+    __slots__ = ('id', 'email', 'place_id')
+
+    def __init__(self, n):
+        self.id = str(n)
+        self.email = f'user{n}@example.com'
+        self.place_id = f'place-{n % PLACES}'
+
+    def update(self, data):
+        for key, value in data.items():
+            setattr(self, key, value)
+
+
+def fill(repo, size):
+    for n in range(size):
+        repo.add(Record(n))
+    return repo
+
+
+def per_lookup_us(func, keys):
+    seconds = timeit.timeit(lambda: [func(key) for key in keys], number=1)
+    return seconds / len(keys) * 1e6
+
+
+def main():
+    print(f"{'objects':>10} {'email idx':>12} {'email scan':>12} {'place_id idx':>14} {'place_id scan':>14}")
+    for size in SIZES:
+        keys = [f'user{random.randrange(size)}@example.com' for _ in range(LOOKUPS)]
+        places = [f'place-{random.randrange(PLACES)}' for _ in range(LOOKUPS)]
+        indexed = fill(InMemoryRepository(unique_indexes=('email',), indexes=('place_id',)), size)
+        row = [
+            per_lookup_us(lambda key: indexed.get_by_attribute('email', key), keys),
+            per_lookup_us(lambda key: indexed.get_all_by_attribute('place_id', key), places),
+        ]
+        if size <= SCAN_LIMIT:
+            plain = fill(InMemoryRepository(), size)
+            sample = keys[:20]
+            row.insert(1, per_lookup_us(lambda key: plain.get_by_attribute('email', key), sample))
+            row.append(per_lookup_us(lambda key: plain.get_all_by_attribute('place_id', key), places[:20]))
+        else:
+            row.insert(1, None)
+            row.append(None)
+        print(f'{size:>10} ' + ' '.join(f'{value:>12.2f}us' if value is not None else f"{'-':>14}"
+                                        for value in row))
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
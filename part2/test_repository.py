@@ -0,0 +1,56 @@
+import pytest
+from app.models.user import User
+from app.persistence.repository import InMemoryRepository
+
+
+@pytest.fixture
+def repo():
+    """Repository of two users, with a unique email index and a last_name index"""
+    repo = InMemoryRepository(unique_indexes=('email',), indexes=('last_name',))
+    repo.add(User('Ann', 'Smith', 'a@example.com', 'Password123!'))
+    repo.add(User('Bob', 'Smith', 'b@example.com', 'Password123!'))
+    return repo
+
+
+def test_add_indexes_the_object(repo):
+    assert repo.get_by_attribute('email', 'a@example.com').first_name == 'Ann'
+    assert {user.first_name for user in repo.get_all_by_attribute('last_name', 'Smith')} == {'Ann', 'Bob'}
+    with pytest.raises(ValueError):
+        repo.add(User('Eve', 'Doe', 'a@example.com', 'Password123!'))
+    assert len(repo.get_all()) == 2
+    assert repo.get_by_attribute('email', 'a@example.com').first_name == 'Ann'
+
+
+def test_update_moves_the_index_entries(repo):
+    bob = repo.get_by_attribute('email', 'b@example.com')
+    repo.update(bob.id, {'email': 'bob@example.com', 'last_name': 'Jones'})
+    assert repo.get_by_attribute('email', 'b@example.com') is None
+    assert repo.get_by_attribute('email', 'bob@example.com') is bob
+    assert repo.get_all_by_attribute('last_name', 'Jones') == [bob]
+    assert [user.first_name for user in repo.get_all_by_attribute('last_name', 'Smith')] == ['Ann']
+
+
+def test_conflicting_update_changes_nothing(repo):
+    bob = repo.get_by_attribute('email', 'b@example.com')
+    with pytest.raises(ValueError):
+        repo.update(bob.id, {'email': 'a@example.com', 'first_name': 'Robert'})
+    assert (bob.email, bob.first_name) == ('b@example.com', 'Bob')
+    assert repo.get_by_attribute('email', 'b@example.com') is bob
+    assert repo.get_by_attribute('email', 'a@example.com').first_name == 'Ann'
+
+
+def test_invalid_update_changes_nothing(repo):
+    bob = repo.get_by_attribute('email', 'b@example.com')
+    with pytest.raises(ValueError):
+        repo.update(bob.id, {'email': 'bob@example.com', 'first_name': ''})
+    assert (bob.email, bob.first_name) == ('b@example.com', 'Bob')
+    assert repo.get_by_attribute('email', 'bob@example.com') is None
+
+
+def test_delete_unindexes_the_object(repo):
+    ann = repo.get_by_attribute('email', 'a@example.com')
+    repo.delete(ann.id)
+    assert repo.get_by_attribute('email', 'a@example.com') is None
+    assert [user.first_name for user in repo.get_all_by_attribute('last_name', 'Smith')] == ['Bob']
+    repo.add(User('Amy', 'Lee', 'a@example.com', 'Password123!'))
+    assert repo.get_by_attribute('email', 'a@example.com').first_name == 'Amy'
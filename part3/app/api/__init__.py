@@ -4,10 +4,14 @@ from app.api.v1.users import api as users_ns
 from app.api.v1.places import api as places_ns
 from app.api.v1.reviews import api as reviews_ns
 from app.api.v1.amenities import api as amenities_ns
+from app.api.v1.auth import api as auth_ns
+from app.api.v1.metrics import api as metrics_ns
+from app.api.v1.serializers import output_json
 
 def create_app():
     app = Flask(__name__)
     api = Api(app, version='1.0', title='HBnB API', description='HBnB Application API', doc='/api/v1/')
+    api.representation('application/json')(output_json)
 
     # Placeholder for API namespaces (endpoints will be added later)
     
@@ -16,5 +20,7 @@ def create_app():
     api.add_namespace(places_ns, path='/api/v1/places')
     api.add_namespace(reviews_ns, path='/api/v1/reviews')
     api.add_namespace(amenities_ns, path='/api/v1/amenities')
+    api.add_namespace(auth_ns, path='/api/v1/auth')
+    api.add_namespace(metrics_ns, path='/api/v1/metrics')
     
     return app
@@ -0,0 +1,211 @@
+"""ASGI application exposing the same /api/v1 routes as the Flask app.
+
+Public GET routes of users, places, reviews and amenities, and the login
+route, are served natively by the async facade: a request waiting on
+SQLite or bcrypt only holds a coroutine, not a thread. Every other route
+is forwarded to the Flask application through asgiref's WsgiToAsgi, which
+buffers the request body first, so slow clients never tie up a worker
+thread either.
+"""
+import json
+import re
+from urllib.parse import parse_qs, urlencode
+from asgiref.wsgi import WsgiToAsgi
+from flask_jwt_extended import create_access_token, create_refresh_token
+from sqlalchemy.engine import make_url
+from werkzeug.http import parse_etags
+from app.api.v1.conditional import CACHE_CONTROL, make_etag
+from app.api.v1.serializers import AMENITY, PLACE, REVIEW, USER, dumps
+from app.api.v1.streaming import NDJSON
+from app.models.hashing import PasswordHasherBusy
+from app.persistence.pagination import clamp_limit
+
+
+def async_database_url(url):
+    """Async driver URL for the database the Flask app uses."""
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite':
+        return url.set(drivername='sqlite+aiosqlite')
+    return url
+
+
+class Request:
+    def __init__(self, scope, body=b''):
+        self.scope = scope
+        self.method = scope['method']
+        self.path = scope['path']
+        self.args = {key: values[-1] for key, values in
+                     parse_qs(scope.get('query_string', b'').decode('latin-1')).items()}
+        self.body = body
+
+    @property
+    def base_url(self):
+        headers = dict(self.scope.get('headers', []))
+        host = headers.get(b'host', b'localhost').decode('latin-1')
+        return '{}://{}{}'.format(self.scope.get('scheme', 'http'), host, self.path)
+
+    def page_args(self):
+        return clamp_limit(self.args.get('limit')), self.args.get('cursor') or None
+
+    def page_headers(self, next_cursor):
+        if not next_cursor:
+            return {}
+        args = dict(self.args, cursor=next_cursor)
+        return {'X-Next-Cursor': next_cursor,
+                'Link': '<{}?{}>; rel="next"'.format(self.base_url, urlencode(args))}
+
+    def json(self):
+        return json.loads(self.body or b'null')
+
+    def if_none_match(self, etag):
+        headers = dict(self.scope.get('headers', []))
+        return parse_etags(headers.get(b'if-none-match', b'').decode('latin-1')).contains_weak(etag)
+
+
+class HBnBAsgi:
+    """Minimal router: native async handlers first, Flask for the rest."""
+
+    def __init__(self, flask_app, facade):
+        self.flask_app = flask_app
+        self.facade = facade
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.routes = []
+        self._register()
+
+    def route(self, method, pattern, handler, flask_args=()):
+        # Requests carrying one of flask_args, or a sparse fieldset, are left to the Flask app
+        flask_args = set(flask_args) | {'fields'}
+        self.routes.append((method, re.compile('^/api/v1' + pattern + '$'), handler, flask_args))
+
+    def _register(self):
+        self.route('GET', r'/users/', self.list_page(self.facade.get_users_page, USER))
+        self.route('GET', r'/users/(?P<obj_id>[^/]+)', self.detail(
+            self.facade.get_user, USER, {'error': 'User not found'}))
+        self.route('GET', r'/places/', self.list_page(
+            self.facade.get_places_page, PLACE, self.facade.get_places_version, 'places'),
+            flask_args=('bbox', 'near', 'min_price', 'max_price', 'amenities', 'owner_id', 'sort', 'stream',
+                        'expand'))
+        self.route('GET', r'/reviews/', self.list_page(self.facade.get_reviews_page, REVIEW), flask_args=('stream',))
+        self.route('GET', r'/reviews/(?P<obj_id>[^/]+)', self.detail(
+            self.facade.get_review, REVIEW, {'error': 'Review not found'}))
+        self.route('GET', r'/reviews/places/(?P<place_id>[^/]+)/reviews', self.place_reviews)
+        self.route('GET', r'/amenities/', self.list_page(
+            self.facade.get_amenities_page, AMENITY, self.facade.get_amenities_version, 'amenities'))
+        self.route('GET', r'/amenities/(?P<obj_id>[^/]+)', self.detail(
+            self.facade.get_amenity, AMENITY, {'message': 'Amenity not found'}, 'amenities'))
+        self.route('POST', r'/auth/login', self.login)
+
+    def cache_headers(self, etag, namespace):
+        # Same ETags and Cache-Control policies as app.api.v1.conditional
+        policy = self.flask_app.config.get('CACHE_CONTROL', CACHE_CONTROL).get(namespace)
+        headers = {'ETag': '"{}"'.format(etag)}
+        if policy:
+            headers['Cache-Control'] = policy
+        return headers
+
+    def list_page(self, fetch, serializer, version=None, namespace=None):
+        async def handler(request):
+            headers = {}
+            if version:
+                etag = make_etag(namespace, await version(), sorted(request.args.items()))
+                headers = self.cache_headers(etag, namespace)
+                if request.if_none_match(etag):
+                    return 304, None, headers
+            try:
+                items, next_cursor = await fetch(*request.page_args())
+            except ValueError as e:
+                return 400, {'error': str(e)}, {}
+            return 200, serializer.dump_many(items), dict(request.page_headers(next_cursor), **headers)
+        return handler
+
+    def detail(self, fetch, serializer, not_found, namespace=None):
+        async def handler(request, obj_id):
+            obj = await fetch(obj_id)
+            if not obj:
+                return 404, not_found, {}
+            headers = {}
+            if namespace:
+                etag = make_etag(obj.id, obj.updated_at)
+                headers = self.cache_headers(etag, namespace)
+                if request.if_none_match(etag):
+                    return 304, None, headers
+            return 200, serializer.dump(obj), headers
+        return handler
+
+    async def place_reviews(self, request, place_id):
+        try:
+            reviews, next_cursor = await self.facade.get_reviews_by_place(place_id, *request.page_args())
+        except ValueError as e:
+            return 400, {'error': str(e)}, {}
+        if not reviews and not await self.facade.place_exists(place_id):
+            return 404, {'error': 'Place not found'}, {}
+        return 200, REVIEW.dump_many(reviews), request.page_headers(next_cursor)
+
+    async def login(self, request):
+        try:
+            credentials = request.json()
+            # The app context carries BCRYPT_LOG_ROUNDS into the hashing thread
+            with self.flask_app.app_context():
+                user = await self.facade.authenticate(credentials['email'], credentials['password'])
+        except PasswordHasherBusy as e:
+            return 503, {'error': str(e)}, {'Retry-After': str(e.retry_after)}
+        except (ValueError, KeyError, TypeError):
+            return 400, {'message': 'Invalid input data'}, {}
+        if not user:
+            return 401, {'error': 'Invalid credentials'}, {}
+        identity = {'id': str(user.id), 'is_admin': user.is_admin}
+        with self.flask_app.app_context():
+            tokens = {'access_token': create_access_token(identity=identity),
+                      'refresh_token': create_refresh_token(identity=identity)}
+        return 200, tokens, {}
+
+    def match(self, method, path, query_string=b'', accept=b''):
+        if NDJSON.encode() in accept:
+            # Streamed responses are written by the Flask app
+            return None, None
+        # Blank values count too: "?fields=" is an error only the Flask app reports
+        args = parse_qs(query_string.decode('latin-1'), keep_blank_values=True)
+        for route_method, pattern, handler, flask_args in self.routes:
+            found = pattern.match(path)
+            if found and route_method == method and not flask_args.intersection(args):
+                return handler, found.groupdict()
+        return None, None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            return await self.wsgi(scope, receive, send)
+        accept = dict(scope.get('headers', [])).get(b'accept', b'')
+        handler, params = self.match(scope['method'], scope['path'], scope.get('query_string', b''), accept)
+        if handler is None:
+            return await self.wsgi(scope, receive, send)
+        body = b''
+        more = True
+        while more:
+            message = await receive()
+            body += message.get('body', b'')
+            more = message.get('more_body', False)
+        status, payload, headers = await handler(Request(scope, body), **params)
+        if status == 304:
+            data, raw_headers = b'', []
+        else:
+            data = dumps(payload)
+            raw_headers = [(b'content-type', b'application/json'), (b'content-length', str(len(data)).encode())]
+        raw_headers += [(key.lower().encode('latin-1'), value.encode('latin-1')) for key, value in headers.items()]
+        await send({'type': 'http.response.start', 'status': status, 'headers': raw_headers})
+        await send({'type': 'http.response.body', 'body': data})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.facade.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_asgi_app(flask_app, facade):
+    return HBnBAsgi(flask_app, facade)
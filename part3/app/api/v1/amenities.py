@@ -1,6 +1,10 @@
 from flask_restx import Namespace, Resource, fields
 from app.services.facade import HBnBFacade
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.api.v1.batch import batch_items, batch_response
+from app.api.v1.conditional import cache_headers, detail_etag, not_modified, page_etag
+from app.api.v1.pagination import PAGE_PARAMS, page_args, page_headers
+from app.api.v1.serializers import AMENITY, FIELDS_PARAMS, requested_fields
 
 api = Namespace('amenities', description='Amenity operations')
 
@@ -29,38 +33,73 @@ class AmenityList(Resource):
             return {'message': 'Invalid input data'}, 400
         
         new_amenity = facade.create_amenity(amenity_data)
-        return {
-            'id': new_amenity.id,
-            'name': new_amenity.name
-        }, 201
+        return AMENITY.dump(new_amenity), 201
         
         
 
+    @api.doc(params=dict(PAGE_PARAMS, **FIELDS_PARAMS))
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(304, 'Amenities not modified')
+    @api.response(400, 'Invalid pagination or fields parameters')
     def get(self):
-        """Retrieve a list of all amenities"""
-        amenities = facade.get_all_amenities()
-        return [
-            {
-            'id': amenity.id,
-            'name': amenity.name
-            } for amenity in amenities
-        ]
+        """Retrieve a page of amenities"""
+        try:
+            serializer, columns = requested_fields(AMENITY)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        etag = page_etag('amenities', facade.get_amenities_version())
+        cached = not_modified(etag, 'amenities')
+        if cached:
+            return cached
+        try:
+            amenities, next_cursor = facade.get_amenities_page(*page_args(), columns)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return serializer.dump_many(amenities), 200, dict(page_headers(next_cursor), **cache_headers(etag, 'amenities'))
+
+@api.route('/batch')
+class AmenityBatch(Resource):
+    @api.expect([amenity_model])
+    @api.response(201, 'Amenities successfully created')
+    @api.response(207, 'Some amenities could not be created')
+    @api.response(400, 'Invalid input data')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self):
+        """Register several amenities in a single transaction"""
+        current_user = get_jwt_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+
+        try:
+            amenities_data = batch_items(api.payload)
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        results = facade.create_amenities(amenities_data)
+        return batch_response(results, AMENITY.dump)
 
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
+    @api.doc(params=FIELDS_PARAMS)
     @api.response(200, 'Amenity details retrieved successfully')
+    @api.response(304, 'Amenity not modified')
+    @api.response(400, 'Invalid fields parameter')
     @api.response(404, 'Amenity not found')
     def get(self, amenity_id):
         """Get amenity details by ID"""
-        amenities_data = facade.get_amenity(amenity_id)
+        try:
+            serializer, columns = requested_fields(AMENITY)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        amenities_data = facade.get_amenity(amenity_id, columns)
         
         if not amenities_data:
             return  {'message': 'Amenity not found'}, 404
-        return {
-            'id': amenities_data.id,
-            'name': amenities_data.name
-        }, 200
+        etag = detail_etag(amenities_data)
+        cached = not_modified(etag, 'amenities')
+        if cached:
+            return cached
+        return serializer.dump(amenities_data), 200, cache_headers(etag, 'amenities')
 
     @api.expect(amenity_model)
     @api.response(200, 'Amenity updated successfully')
@@ -1,5 +1,7 @@
+from datetime import datetime, timezone
 from flask_restx import Namespace, Resource, fields, api
-from flask_jwt_extended import create_access_token
+from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt
+from app.models.hashing import PasswordHasherBusy
 from app.services.facade import HBnBFacade
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
@@ -12,17 +14,49 @@ login_model = api.model('Login', {
     'password': fields.String(required=True, description='User password')
 })
 
+def token_identity(user):
+    return {'id': str(user.id), 'is_admin': user.is_admin}
+
 @api.route('/login')
 class Login(Resource):
     @api.expect(login_model)
+    @api.response(503, 'Too many password checks in progress')
     def post(self):
-        """Authenticate user and return a JWT token"""
+        """Authenticate user and return an access token and a refresh token"""
         credentials = api.payload
-        user = facade.get_user_by_email(credentials['email'])
-        if not user or not user.verify_password(credentials['password']):
+        try:
+            user = facade.authenticate(credentials['email'], credentials['password'])
+        except PasswordHasherBusy as e:
+            return {'error': str(e)}, 503, {'Retry-After': str(e.retry_after)}
+        if not user:
+            return {'error': 'Invalid credentials'}, 401
+        identity = token_identity(user)
+        return {'access_token': create_access_token(identity=identity),
+                'refresh_token': create_refresh_token(identity=identity)}, 200
+
+@api.route('/refresh')
+class Refresh(Resource):
+    @api.response(401, 'Refresh token revoked or invalid')
+    @jwt_required(refresh=True)
+    def post(self):
+        """Exchange a refresh token for a new access token, without the password"""
+        if facade.is_token_revoked(get_jwt()['jti']):
+            return {'error': 'Token has been revoked'}, 401
+        # Re-read the user so that a deleted or demoted user gets no stale token
+        user = facade.get_user(get_jwt_identity()['id'])
+        if not user:
             return {'error': 'Invalid credentials'}, 401
-        access_token = create_access_token(identity={'id': str(user.id), 'is_admin': user.is_admin})
-        return {'access_token': access_token}, 200
+        return {'access_token': create_access_token(identity=token_identity(user))}, 200
+
+@api.route('/logout')
+class Logout(Resource):
+    @jwt_required(refresh=True)
+    def post(self):
+        """Revoke a refresh token"""
+        claims = get_jwt()
+        expires_at = datetime.fromtimestamp(claims['exp'], timezone.utc).replace(tzinfo=None)
+        facade.revoke_token(claims['jti'], expires_at)
+        return {'message': 'Refresh token revoked'}, 200
 
 @api.route('/protected')
 class ProtectedResource(Resource):
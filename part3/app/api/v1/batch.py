@@ -0,0 +1,29 @@
+MAX_BATCH_SIZE = 500
+
+
+def batch_items(payload):
+    """Return the items of a batch request, raising ValueError when malformed."""
+    if not isinstance(payload, list) or not payload:
+        raise ValueError('Expected a non-empty list of items')
+    if len(payload) > MAX_BATCH_SIZE:
+        raise ValueError('A batch holds at most {} items'.format(MAX_BATCH_SIZE))
+    if not all(isinstance(item, dict) for item in payload):
+        raise ValueError('Every item must be an object')
+    return payload
+
+
+def batch_response(results, dump):
+    """Build the per-item body and the overall status of a batch request.
+
+    201 when every item was created, 207 when only some were, 400 otherwise.
+    """
+    body = []
+    for index, (obj, error) in enumerate(results):
+        if error is None:
+            body.append(dict(dump(obj), index=index, status=201))
+        else:
+            body.append({'index': index, 'status': 400, 'error': error})
+    created = sum(1 for obj, error in results if error is None)
+    if created == len(results):
+        return body, 201
+    return body, 207 if created else 400
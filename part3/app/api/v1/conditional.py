@@ -0,0 +1,65 @@
+"""Conditional GET: strong ETags, If-None-Match and Cache-Control.
+
+The ETag of a detail response is derived from the entity's updated_at,
+the ETag of a list page from the collection version (a counter bumped
+by every write, see app.persistence.versions) and the query string. Both are computed before the
+body is built, so a matching If-None-Match is answered with an empty
+304 without serializing anything.
+
+Cache-Control policies are set per namespace and can be overridden
+with the CACHE_CONTROL config key.
+"""
+import hashlib
+from flask import Response, current_app, request
+
+CACHE_CONTROL = {
+    # Amenities change almost never: let browsers reuse them for a while
+    'amenities': 'public, max-age=300',
+    # Places change often, and details need a token: always revalidate
+    'places': 'no-cache',
+}
+
+
+def make_etag(*parts):
+    """Strong (opaque, unquoted) ETag value for the given version parts."""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def _related_version(related):
+    if related is None:
+        return None
+    if isinstance(related, list):
+        return sorted((obj.id, obj.updated_at) for obj in related)
+    return related.id, related.updated_at
+
+
+def detail_etag(obj, expand=()):
+    """ETag of a detail response: the entity's version, plus the ?fields= it was narrowed to
+    and the versions of the relationships it embeds."""
+    parts = [obj.id, obj.updated_at]
+    fields = request.args.get('fields')
+    if fields:
+        parts.append(fields)
+    for name in expand:
+        parts.append((name, _related_version(getattr(obj, name))))
+    return make_etag(*parts)
+
+
+def page_etag(namespace, version):
+    """ETag of one list page: collection version plus the query string."""
+    return make_etag(namespace, version, sorted(request.args.to_dict().items()))
+
+
+def cache_headers(etag, namespace):
+    policy = current_app.config.get('CACHE_CONTROL', CACHE_CONTROL).get(namespace)
+    headers = {'ETag': '"{}"'.format(etag)}
+    if policy:
+        headers['Cache-Control'] = policy
+    return headers
+
+
+def not_modified(etag, namespace):
+    """Empty 304 response when If-None-Match matches etag, None otherwise."""
+    if request.if_none_match.contains_weak(etag):
+        return Response(status=304, headers=cache_headers(etag, namespace))
+    return None
@@ -0,0 +1,26 @@
+from flask import current_app
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models import hashing
+from app.persistence import cache as entity_cache
+
+api = Namespace('metrics', description='Runtime counters of the process serving the request')
+
+
+@api.route('/')
+class Metrics(Resource):
+    @api.response(200, 'Counters retrieved successfully')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Password hashing pool, entity cache and JWT claims cache counters"""
+        current_user = get_jwt_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        claims_cache = getattr(current_app.extensions.get('flask-jwt-extended'), 'claims_cache', None)
+        return {
+            # Queue length, rejections and wait times; null when hashing inline
+            'password_hashing': hashing.stats(),
+            'entity_cache': entity_cache.stats(),
+            'jwt_claims_cache': claims_cache.stats() if claims_cache is not None else None,
+        }, 200
@@ -0,0 +1,25 @@
+from urllib.parse import urlencode
+from flask import request
+from app.persistence.pagination import clamp_limit
+
+PAGE_PARAMS = {
+    'limit': 'Maximum number of items to return',
+    'cursor': 'Opaque cursor taken from the X-Next-Cursor header of the previous page'
+}
+
+
+def page_args():
+    """Read the limit/cursor query parameters of a list request."""
+    return clamp_limit(request.args.get('limit')), request.args.get('cursor') or None
+
+
+def page_headers(next_cursor):
+    """Expose the cursor of the next page, both raw and as a Link header."""
+    if not next_cursor:
+        return {}
+    args = request.args.to_dict()
+    args['cursor'] = next_cursor
+    return {
+        'X-Next-Cursor': next_cursor,
+        'Link': '<{}?{}>; rel="next"'.format(request.base_url, urlencode(args))
+    }
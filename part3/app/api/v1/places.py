@@ -1,6 +1,15 @@
+import math
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from app.services.facade import HBnBFacade
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.api.v1.batch import batch_items, batch_response
+from app.api.v1.conditional import cache_headers, detail_etag, make_etag, not_modified, page_etag
+from app.api.v1.pagination import PAGE_PARAMS, page_args, page_headers
+from app.api.v1.serializers import (AUTHOR, EXPAND_PARAMS, FIELDS_PARAMS, NEW_PLACE, PLACE, PLACE_EXPANSIONS, REVIEW,
+                                    expanding, requested_expand, requested_fields)
+from app.api.v1.streaming import STREAM_PARAMS, stream_format, stream_response
+from app.persistence.search import highlight
 
 api = Namespace('places', description='Place operations')
 
@@ -37,6 +46,71 @@ place_model = api.model('Place', {
 
 facade = HBnBFacade()
 
+DEFAULT_RADIUS_KM = 10
+
+GEO_PARAMS = {
+    'bbox': 'min_lon,min_lat,max_lon,max_lat: places inside this box, nearest to its center first',
+    'near': 'lat,lon: places within radius_km of this point, nearest first',
+    'radius_km': 'Search radius around near, in kilometres (default {})'.format(DEFAULT_RADIUS_KM)
+}
+
+FILTER_PARAMS = {
+    'min_price': 'Lowest price per night',
+    'max_price': 'Highest price per night',
+    'amenities': "Comma-separated amenity ID's, places must have all of them",
+    'owner_id': 'ID of the owner',
+    'sort': 'price, -price, rating (best first) or newest; oldest first by default'
+}
+
+
+def _numbers(name, value, count):
+    try:
+        numbers = [float(part) for part in value.split(',')]
+    except ValueError:
+        numbers = []
+    if not all(math.isfinite(number) for number in numbers):
+        numbers = []
+    if len(numbers) != count:
+        if count == 1:
+            raise ValueError('{} must be a number'.format(name))
+        raise ValueError('{} must be {} comma-separated numbers'.format(name, count))
+    return numbers
+
+
+def list_filters():
+    """Filters of a place list request, only those present in the query string."""
+    args = request.args
+    filters = {}
+    for name in ('min_price', 'max_price'):
+        if args.get(name):
+            filters[name], = _numbers(name, args[name], 1)
+    if args.get('amenities'):
+        filters['amenity_ids'] = [amenity_id for amenity_id in args['amenities'].split(',') if amenity_id]
+    if args.get('owner_id'):
+        filters['owner_id'] = args['owner_id']
+    if args.get('sort'):
+        filters['sort'] = args['sort']
+    return filters
+
+
+def geo_search(limit, cursor, filters, columns=None, expand=()):
+    """(place, distance_km) pairs of a bbox or near request, None for a plain list request."""
+    args = request.args
+    if 'bbox' not in args and 'near' not in args:
+        return None
+    if 'bbox' in args and 'near' in args:
+        raise ValueError('bbox and near cannot be combined')
+    if cursor:
+        raise ValueError('cursor is not supported with bbox or near, use limit')
+    if filters:
+        raise ValueError('bbox and near cannot be combined with filters or sort')
+    if 'bbox' in args:
+        min_lon, min_lat, max_lon, max_lat = _numbers('bbox', args['bbox'], 4)
+        return facade.get_places_in_bbox(min_lat, min_lon, max_lat, max_lon, limit, columns, expand)
+    latitude, longitude = _numbers('near', args['near'], 2)
+    radius_km, = _numbers('radius_km', args.get('radius_km', str(DEFAULT_RADIUS_KM)), 1)
+    return facade.get_places_near(latitude, longitude, radius_km, limit, columns, expand)
+
 @api.route('/')
 class PlaceList(Resource):
     @api.expect(place_model)
@@ -51,54 +125,106 @@ class PlaceList(Resource):
         
         if not place_data:
             return {'message': 'Invalid input data'}, 400
-        new_place = facade.create_place(place_data)
-        return {
-                    "id": new_place.id,
-                    "title": new_place.title,
-                    "description": new_place.description,
-                    "price": new_place.price,
-                    "latitude": new_place.latitude,
-                    "longitude": new_place.longitude,
-                    "owner_id": new_place.owner_id
-                }, 201
+        try:
+            new_place = facade.create_place(place_data)
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        return NEW_PLACE.dump(new_place), 201
         
 
+    @api.doc(params=dict(PAGE_PARAMS, **GEO_PARAMS, **FILTER_PARAMS, **STREAM_PARAMS, **FIELDS_PARAMS,
+                         **EXPAND_PARAMS))
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(304, 'Places not modified')
+    @api.response(400, 'Invalid pagination, search, fields or expand parameters')
+    def get(self):
+        """Retrieve a page of places, or the places nearest to a box or point, or stream them all"""
+        try:
+            serializer, columns = requested_fields(PLACE)
+            expand = requested_expand(PLACE_EXPANSIONS)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        dump = expanding(serializer.dump, expand, PLACE_EXPANSIONS)
+        mimetype = stream_format()
+        if mimetype:
+            if any(name in request.args for name in ('cursor', *GEO_PARAMS, *FILTER_PARAMS)):
+                return {'error': 'stream cannot be combined with cursor, bbox, near, filters or sort'}, 400
+            return stream_response(facade.iter_places(columns, expand), dump, mimetype)
+        etag = page_etag('places', facade.get_places_version(expand))
+        cached = not_modified(etag, 'places')
+        if cached:
+            return cached
+        try:
+            limit, cursor = page_args()
+            filters = list_filters()
+            found = geo_search(limit, cursor, filters, columns, expand)
+            if found is None:
+                places, next_cursor = facade.get_places_page(limit, cursor, columns, expand, **filters)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        if found is not None:
+            return [dict(dump(place), distance_km=round(distance, 3))
+                    for place, distance in found], 200, cache_headers(etag, 'places')
+        return [dump(place) for place in places], 200, dict(page_headers(next_cursor), **cache_headers(etag, 'places'))
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.doc(params=dict(PAGE_PARAMS, **FIELDS_PARAMS, **EXPAND_PARAMS,
+                         q='Words to look for in titles, descriptions and reviews'))
+    @api.response(200, 'Matching places retrieved successfully')
+    @api.response(400, 'Invalid search, pagination, fields or expand parameters')
     def get(self):
-        """Retrieve a list of all places"""
-        places = facade.get_all_places()
-        return [
-            {
-                "id": place.id,
-                "title": place.title,
-                "description": place.description,
-                "price": place.price,
-                "latitude": place.latitude,
-                "longitude": place.longitude,
-                "owner_id": place.owner_id
-            } for place in places
-        ]
+        """Full-text search of places, best match first"""
+        try:
+            serializer, columns = requested_fields(PLACE)
+            expand = requested_expand(PLACE_EXPANSIONS)
+            found, next_cursor = facade.search_places(request.args.get('q', ''), *page_args(), columns, expand)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        dump = expanding(serializer.dump, expand, PLACE_EXPANSIONS)
+        return [dict(dump(place), snippet=highlight(snippet))
+                for place, snippet in found], 200, page_headers(next_cursor)
+
+@api.route('/batch')
+class PlaceBatch(Resource):
+    @api.expect([place_model])
+    @api.response(201, 'Places successfully created')
+    @api.response(207, 'Some places could not be created')
+    @api.response(400, 'Invalid input data')
+    @jwt_required()
+    def post(self):
+        """Register several places in a single transaction"""
+        current_user = get_jwt_identity()
+        try:
+            places_data = batch_items(api.payload)
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        results = facade.create_places(places_data, current_user['id'])
+        return batch_response(results, NEW_PLACE.dump)
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
+    @api.doc(params=dict(FIELDS_PARAMS, **EXPAND_PARAMS))
     @api.response(200, 'Place details retrieved successfully')
+    @api.response(304, 'Place not modified')
+    @api.response(400, 'Invalid fields or expand parameter')
     @api.response(404, 'Place not found')
     @jwt_required()
     def get(self, place_id):
         """Get place details by ID"""
-
-        places_data = facade.get_place(place_id)
+        try:
+            serializer, columns = requested_fields(PLACE)
+            expand = requested_expand(PLACE_EXPANSIONS)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        places_data = facade.get_place(place_id, columns, expand)
         if not places_data:
             return {'message': 'Place not found'}, 404
-        return {
-            "id": places_data.id,
-            "title": places_data.title,
-            "description": places_data.description,
-            "price": places_data.price,
-            "latitude": places_data.latitude,
-            "longitude": places_data.longitude,
-            "owner_id": places_data.owner_id
-            }, 200
+        etag = detail_etag(places_data, expand)
+        cached = not_modified(etag, 'places')
+        if cached:
+            return cached
+        return expanding(serializer.dump, expand, PLACE_EXPANSIONS)(places_data), 200, cache_headers(etag, 'places')
 
 
 
@@ -116,22 +242,52 @@ class PlaceResource(Resource):
         is_admin = current_user.get('is_admin', False)
         user_id = current_user.get('id')
 
+        if not place:
+            return {'message': 'Place not found'}, 404
         if not is_admin and place.owner_id != user_id:
             return {'error': 'Unauthorized action'}, 403
-        if place.owner_id != current_user:
-            return {'error': 'Unauthorized action'}, 403
         if not place_data:
             return {'message': 'Invalid input data'}, 400
     
-        updated_place = facade.update_place(place_id, place_data)
+        try:
+            updated_place = facade.update_place(place_id, place_data)
+        except ValueError as e:
+            return {'message': str(e)}, 400
         if not updated_place:
             return {'message': 'Place not found'}, 404
         
-        return {
-            "title": updated_place.title,
-            "description": updated_place.description,
-            "price": updated_place.price,
-            "latitude": updated_place.latitude,
-            "longitude": updated_place.longitude,
-            "owner_id": updated_place.owner_id
-            }, 200
+        return PLACE.dump(updated_place), 200
+
+
+# Relationships embedded by /places/<place_id>/full besides the reviews
+FULL_EXPAND = ('owner', 'amenities')
+dump_full_place = expanding(PLACE.dump, FULL_EXPAND, PLACE_EXPANSIONS)
+
+
+@api.route('/<place_id>/full')
+class PlaceFull(Resource):
+    @api.doc(params=PAGE_PARAMS)
+    @api.response(200, 'Place, owner, amenities and reviews retrieved successfully')
+    @api.response(304, 'Place not modified')
+    @api.response(400, 'Invalid pagination parameters')
+    @api.response(404, 'Place not found')
+    @jwt_required()
+    def get(self, place_id):
+        """Get a place with its owner, its amenities and a page of its reviews, newest first"""
+        try:
+            found = facade.get_place_full(place_id, *page_args())
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        if not found:
+            return {'message': 'Place not found'}, 404
+        place, reviews, next_cursor = found
+        etag = make_etag(detail_etag(place, FULL_EXPAND), next_cursor, [
+            (review.id, review.updated_at, review.author.updated_at if review.author else None)
+            for review in reviews])
+        cached = not_modified(etag, 'places')
+        if cached:
+            return cached
+        data = dump_full_place(place)
+        data['reviews'] = [dict(REVIEW.dump(review), author=AUTHOR.dump(review.author) if review.author else None)
+                           for review in reviews]
+        return data, 200, dict(page_headers(next_cursor), **cache_headers(etag, 'places'))
@@ -1,6 +1,11 @@
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from app.services.facade import HBnBFacade
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.api.v1.batch import batch_items, batch_response
+from app.api.v1.pagination import PAGE_PARAMS, page_args, page_headers
+from app.api.v1.serializers import FIELDS_PARAMS, REVIEW, requested_fields
+from app.api.v1.streaming import STREAM_PARAMS, stream_format, stream_response
 
 api = Namespace('reviews', description='Review operations')
 
@@ -39,49 +44,69 @@ class ReviewList(Resource):
             if existing_review:
                 return {'message': 'You have already reviewed this place'}, 400
         
-        new_review = facade.create_review(review_data)
-        return {
-                'id': new_review.id,
-                'text': new_review.text,
-                'rating': new_review.rating,
-                'user_id': new_review.user_id,
-                'place_id': new_review.place_id,
-                'message': 'Review successfully created'
-            }, 201
+        try:
+            new_review = facade.create_review(review_data)
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        return dict(REVIEW.dump(new_review), message='Review successfully created'), 201
         
+    @api.doc(params=dict(PAGE_PARAMS, **STREAM_PARAMS, **FIELDS_PARAMS))
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid pagination or fields parameters')
     def get(self):
-        """Retrieve a list of all reviews"""
-        reviews = facade.get_all_reviews()
-        return [
-            {
-                'id': review.id,
-                'text': review.text,
-                'rating': review.rating,
-                'user_id': review.user_id,
-                'place_id': review.place_id
-            } for review in reviews
-        ], 200
+        """Retrieve a page of reviews, or stream them all"""
+        try:
+            serializer, columns = requested_fields(REVIEW)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        mimetype = stream_format()
+        if mimetype:
+            if 'cursor' in request.args:
+                return {'error': 'stream cannot be combined with cursor'}, 400
+            return stream_response(facade.iter_reviews(columns), serializer.dump, mimetype)
+        try:
+            reviews, next_cursor = facade.get_reviews_page(*page_args(), columns)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return serializer.dump_many(reviews), 200, page_headers(next_cursor)
+
+@api.route('/batch')
+class ReviewBatch(Resource):
+    @api.expect([review_model])
+    @api.response(201, 'Reviews successfully created')
+    @api.response(207, 'Some reviews could not be created')
+    @api.response(400, 'Invalid input data')
+    @jwt_required()
+    def post(self):
+        """Register several reviews in a single transaction"""
+        current_user = get_jwt_identity()
+        try:
+            reviews_data = batch_items(api.payload)
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        results = facade.create_reviews(reviews_data, current_user)
+        return batch_response(results, REVIEW.dump)
 
 @api.route('/<review_id>')
 class ReviewResource(Resource):
+    @api.doc(params=FIELDS_PARAMS)
     @api.response(200, 'Review details retrieved successfully')
+    @api.response(400, 'Invalid fields parameter')
     @api.response(404, 'Review not found')
     def get(self, review_id):
         """Get review details by ID"""
-        review = facade.get_review(review_id)
+        try:
+            serializer, columns = requested_fields(REVIEW)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        review = facade.get_review(review_id, columns)
         if not review:
             return {'error': 'Review not found'}, 404
-        return {
-            'id': review.id,
-            'text': review.text,
-            'rating': review.rating,
-            'user_id': review.user_id,
-            'place_id': review.place_id
-        }, 200
+        return serializer.dump(review), 200
 
     @api.expect(review_model, validate=True)
     @api.response(200, 'Review successfully updated')
+    @api.response(400, 'Invalid input data')
     @api.response(404, 'Review not found')
     @api.response(403, 'Unauthorized action')
     @jwt_required()
@@ -98,15 +123,11 @@ class ReviewResource(Resource):
         if not is_admin and str(review.user_id) != str(current_user['id']):
             return {'error': 'Unauthorized action'}, 403
         
-        updated_review = facade.update_review(review_id, review_data)
-        return {
-            'id': updated_review.id,
-            'text': updated_review.text,
-            'rating': updated_review.rating,
-            'user_id': updated_review.user_id,
-            'place_id': updated_review.place_id,
-            'message': 'Review successfully updated'
-        }, 200
+        try:
+            updated_review = facade.update_review(review_id, review_data)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return dict(REVIEW.dump(updated_review), message='Review successfully updated'), 200
 
     @api.response(200, 'Review successfully deleted')
     @api.response(404, 'Review not found')
@@ -131,22 +152,20 @@ class ReviewResource(Resource):
 
 @api.route('/places/<place_id>/reviews')
 class PlaceReviewList(Resource):
+    @api.doc(params=dict(PAGE_PARAMS, **FIELDS_PARAMS))
     @api.response(200, 'List of reviews for the place retrieved successfully')
+    @api.response(400, 'Invalid pagination or fields parameters')
     @api.response(404, 'Place not found')
     def get(self, place_id):
-        """Get all reviews for a specific place"""
-        place_reviews = facade.get_reviews_by_place(place_id)
-        if not place_reviews:
+        """Get the reviews of a specific place, newest first"""
+        try:
+            serializer, columns = requested_fields(REVIEW)
+            place_reviews, next_cursor = facade.get_reviews_by_place(place_id, *page_args(), columns)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        if not place_reviews and not facade.place_exists(place_id):
             return {'error': 'Place not found'}, 404
-        return [
-            {
-                'id': review.id,
-                'text': review.text,
-                'rating': review.rating,
-                'user_id': review.user_id,
-                'place_id': review.place_id
-            } for review in place_reviews
-        ], 200
+        return serializer.dump_many(place_reviews), 200, page_headers(next_cursor)
 
     @jwt_required()
     def put(self, place_id):
@@ -0,0 +1,151 @@
+"""Response serializers, one per model, and the Api's JSON representation.
+
+A Serializer is built once, at import time, from the attribute names of
+the response: an operator.attrgetter reads all of them in one call, and
+the values are zipped with the names instead of building a dict literal
+per object in every handler.
+
+A `?fields=` query parameter narrows a response to some of its fields
+(requested_fields()); the model columns those fields read are passed
+down to the repositories, which load only them. An `?expand=` parameter
+embeds related objects in place responses (requested_expand()); the
+facade eager-loads exactly those relationships.
+
+Bodies are encoded straight to bytes with orjson when it is installed,
+and with the standard json module otherwise.
+"""
+import json
+from operator import attrgetter
+from flask import current_app, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class Serializer:
+    """Dump objects to dicts of the given attributes, in that order.
+
+    columns maps the fields that are computed from other model columns
+    to those columns, e.g. {'price': ('price_cents',)}.
+    """
+
+    def __init__(self, *fields, columns=None):
+        self.fields = fields
+        self.columns = {field: (columns or {}).get(field, (field,)) for field in fields}
+        getter = attrgetter(*fields)
+        self._values = getter if len(fields) > 1 else lambda obj: (getter(obj),)
+        self._subsets = {}
+
+    def only(self, names):
+        """Serializer of the given fields, in declaration order; raises ValueError on unknown ones."""
+        unknown = [name for name in names if name not in self.columns]
+        if unknown:
+            raise ValueError('Unknown fields: {}. Available fields: {}'.format(
+                ', '.join(unknown), ', '.join(self.fields)))
+        fields = tuple(field for field in self.fields if field in names)
+        if not fields:
+            raise ValueError('fields must name at least one field')
+        if fields not in self._subsets:
+            self._subsets[fields] = Serializer(*fields, columns=self.columns)
+        return self._subsets[fields]
+
+    def column_names(self):
+        return {column for field in self.fields for column in self.columns[field]}
+
+    def dump(self, obj):
+        return dict(zip(self.fields, self._values(obj)))
+
+    def dump_many(self, objs):
+        fields, values = self.fields, self._values
+        return [dict(zip(fields, values(obj))) for obj in objs]
+
+
+USER = Serializer('id', 'first_name', 'last_name', 'email')
+# A review's author, shown next to the review
+AUTHOR = Serializer('id', 'first_name', 'last_name')
+PLACE_COLUMNS = {
+    'title': ('_title',),
+    'description': ('_description',),
+    'price': ('price_cents',),
+    'average_rating': ('review_count', 'rating_sum'),
+    'rating_histogram': tuple('rating_{}'.format(stars) for stars in range(1, 6)),
+}
+PLACE = Serializer('id', 'title', 'description', 'price', 'latitude', 'longitude', 'owner_id',
+                   'review_count', 'rating_sum', 'average_rating', 'rating_histogram', columns=PLACE_COLUMNS)
+# Returned by the create endpoints, before the place has any review
+NEW_PLACE = Serializer('id', 'title', 'description', 'price', 'latitude', 'longitude', 'owner_id',
+                       columns=PLACE_COLUMNS)
+REVIEW = Serializer('id', 'text', 'rating', 'user_id', 'place_id')
+AMENITY = Serializer('id', 'name')
+
+# Relationships a place response can embed, and how each one is dumped
+PLACE_EXPANSIONS = {
+    'owner': lambda owner: USER.dump(owner) if owner is not None else None,
+    'amenities': AMENITY.dump_many,
+    'reviews': REVIEW.dump_many,
+}
+
+
+FIELDS_PARAMS = {'fields': 'Comma-separated fields to return, all of them by default'}
+EXPAND_PARAMS = {'expand': 'Comma-separated related objects to embed: {}; none by default'.format(
+    ', '.join(PLACE_EXPANSIONS))}
+
+
+def requested_fields(serializer):
+    """(serializer, columns) narrowed to the request's ?fields=, (serializer, None) without it.
+
+    Raises ValueError when a requested field does not exist or none is named.
+    """
+    value = request.args.get('fields')
+    if value is None:
+        return serializer, None
+    subset = serializer.only([name.strip() for name in value.split(',') if name.strip()])
+    return subset, subset.column_names()
+
+
+def requested_expand(expansions):
+    """Names of the request's ?expand= relationships, in the order of expansions; () without it.
+
+    Raises ValueError when a requested relationship does not exist.
+    """
+    value = request.args.get('expand')
+    if not value:
+        return ()
+    names = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = sorted(names.difference(expansions))
+    if unknown:
+        raise ValueError('Unknown expand: {}. Available: {}'.format(', '.join(unknown), ', '.join(expansions)))
+    return tuple(name for name in expansions if name in names)
+
+
+def expanding(dump, expand, expansions):
+    """dump, adding the dumped relationships named in expand to each result."""
+    if not expand:
+        return dump
+    dumpers = [(name, expansions[name]) for name in expand]
+
+    def dump_expanded(obj):
+        data = dump(obj)
+        for name, dump_related in dumpers:
+            data[name] = dump_related(getattr(obj, name))
+        return data
+    return dump_expanded
+
+
+if orjson is not None:
+    def dumps(data):
+        """JSON document of data as bytes, newline-terminated."""
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+else:
+    def dumps(data):
+        """JSON document of data as bytes, newline-terminated."""
+        return (json.dumps(data) + '\n').encode('utf-8')
+
+
+def output_json(data, code, headers=None):
+    """Flask-RESTX representation of application/json, encoded with dumps()."""
+    response = current_app.response_class(dumps(data), code, mimetype='application/json')
+    response.headers.extend(headers or {})
+    return response
@@ -0,0 +1,52 @@
+"""Streamed responses for whole collections.
+
+A list endpoint asked for `?stream=true` returns every row as a chunked
+JSON array instead of one page; with `Accept: application/x-ndjson` it
+returns them as newline-delimited JSON. Rows are read with yield_per
+and written as they are serialized, so neither the rows nor the body
+are ever held in memory as a whole and the first byte leaves after the
+first batch.
+"""
+from flask import Response, request, stream_with_context
+from app.api.v1.serializers import dumps
+
+NDJSON = 'application/x-ndjson'
+
+STREAM_PARAMS = {
+    'stream': 'true: every item as a chunked JSON array, without pagination '
+              '(Accept: application/x-ndjson streams NDJSON)'
+}
+
+# Serialized items written to the socket at once
+CHUNK_ITEMS = 100
+
+
+def stream_format():
+    """NDJSON or 'application/json' when the request asks for a stream, None otherwise."""
+    if request.accept_mimetypes.best_match(['application/json', NDJSON]) == NDJSON:
+        return NDJSON
+    if request.args.get('stream', '').lower() in ('1', 'true'):
+        return 'application/json'
+    return None
+
+
+def _chunks(items, dump, array):
+    chunk = [b'['] if array else []
+    separator = b''
+    for item in items:
+        chunk.append(separator + dumps(dump(item)))
+        if array:
+            separator = b','
+        if len(chunk) >= CHUNK_ITEMS:
+            yield b''.join(chunk)
+            chunk = []
+    if array:
+        chunk.append(b']\n')
+    if chunk:
+        yield b''.join(chunk)
+
+
+def stream_response(items, dump, mimetype):
+    """Chunked response writing dump(item) for every item of the items iterator."""
+    chunks = _chunks(items, dump, array=mimetype != NDJSON)
+    return Response(stream_with_context(chunks), 200, mimetype=mimetype)
@@ -1,8 +1,11 @@
 from flask_restx import Namespace, Resource, fields
+from app.models.hashing import PasswordHasherBusy
 from app.services.facade import HBnBFacade
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import re
 from flask import request
+from app.api.v1.pagination import PAGE_PARAMS, page_args, page_headers
+from app.api.v1.serializers import FIELDS_PARAMS, USER, requested_fields
 
 api = Namespace('users', description='User operations')
 
@@ -23,6 +26,7 @@ class UserList(Resource):
     @api.response(400, 'Email already registered')
     @api.response(400, 'Invalid input data')
     @api.response(403, 'Admin privileges required')
+    @api.response(503, 'Too many password checks in progress')
     @jwt_required()
     def post(self):
         """Register a new user (Admin only)"""
@@ -45,40 +49,43 @@ class UserList(Resource):
         if not email or not re.match(r"[^@]+@[^@]+\.[^@]+", email):
             return {'error': 'Invalid email format'}, 400
 
-        new_user = facade.create_user(user_data)
+        try:
+            new_user = facade.create_user(user_data)
+        except PasswordHasherBusy as e:
+            return {'error': str(e)}, 503, {'Retry-After': str(e.retry_after)}
         return {'id': new_user.id, "message": 'User Successfully created'}, 201
     
         
 
+    @api.doc(params=dict(PAGE_PARAMS, **FIELDS_PARAMS))
     @api.response(200, "List of users successfully retrieved")
+    @api.response(400, 'Invalid pagination or fields parameters')
     def get(self):
-        """Retrieve list of users"""
-        users = facade.get_all_users()
-        return [
-            {
-                'id': user.id,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'email': user.email
-            } for user in users
-        ]
+        """Retrieve a page of users"""
+        try:
+            serializer, columns = requested_fields(USER)
+            users, next_cursor = facade.get_users_page(*page_args(), columns)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return serializer.dump_many(users), 200, page_headers(next_cursor)
 
 
 @api.route('/<user_id>')
 class UserResource(Resource):
+    @api.doc(params=FIELDS_PARAMS)
     @api.response(200, 'User details retrieved successfully')
+    @api.response(400, 'Invalid fields parameter')
     @api.response(404, 'User not found')
     def get(self, user_id):
         """Get user details by ID"""
-        user = facade.get_user(user_id)
+        try:
+            serializer, columns = requested_fields(USER)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        user = facade.get_user(user_id, columns)
         if not user:
             return {'error': 'User not found'}, 404
-        return {
-            'id': user.id,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'email': user.email
-        }, 200
+        return serializer.dump(user), 200
 
     @api.expect(user_model)
     @api.response(200, 'User successfully updated')
@@ -110,10 +117,4 @@ class UserResource(Resource):
                 return {'error': 'Email already registered'}, 400
 
         updated_user = facade.update_user(user_id, user_data)
-        return {
-            'id': updated_user.id,
-            'first_name': updated_user.first_name,
-            'last_name': updated_user.last_name,
-            'email': updated_user.email,
-            'message': 'User successfully updated'
-        }, 200
+        return dict(USER.dump(updated_user), message='User successfully updated'), 200
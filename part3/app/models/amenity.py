@@ -6,6 +6,7 @@ from app.models.__init__ import db
 class Amenity(db.Model):
 
     __tablename__ = 'amenities'
+    __table_args__ = (db.Index('ix_amenities_created_at_id', 'created_at', 'id'),)
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = db.Column(db.String(50), nullable=False)
@@ -17,11 +18,11 @@ class Amenity(db.Model):
             raise ValueError("Amenity name is required and must be at most 50 characters long.")
         self.name = name
         self.id = str(uuid.uuid4())
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        self.created_at = datetime.utcnow()
+        self.updated_at = datetime.utcnow()
 
     def save(self):
-        self.updated_at = datetime.now()
+        self.updated_at = datetime.utcnow()
 
     def dict(self):
         return {
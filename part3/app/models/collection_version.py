@@ -0,0 +1,11 @@
+from app.models.__init__ import db
+
+
+class CollectionVersion(db.Model):
+    """Counter of one table, bumped by every transaction that changes its rows."""
+
+    __tablename__ = 'collection_versions'
+
+    # Name of the counted table
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
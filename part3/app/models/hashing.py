@@ -0,0 +1,127 @@
+"""Password hashing on a bounded process pool, with admission control.
+
+bcrypt is CPU-bound by design: run on the request thread, a burst of
+logins takes every core and starves cheap GETs. configure() moves
+hashing and verification onto a pool of worker processes, one per core
+by default. A call made while max_queue jobs are already waiting for a
+worker is rejected with PasswordHasherBusy instead of queueing; the API
+answers it with a 503 and a Retry-After header.
+
+Until configure() is called (tests, scripts) hashing runs inline. The
+pool's counters (stats()) are served to admins by GET /api/v1/metrics/.
+"""
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from flask_bcrypt import Bcrypt
+
+# Seconds assumed per job until the pool has completed one
+DEFAULT_JOB_SECONDS = 0.25
+
+_bcrypt = Bcrypt()
+
+
+def _hash(password, rounds):
+    return _bcrypt.generate_password_hash(password, rounds).decode('utf-8')
+
+
+def _check(pw_hash, password):
+    return _bcrypt.check_password_hash(pw_hash, password)
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+class PasswordHasherBusy(Exception):
+    """Raised instead of queueing a job when the pool's queue is full."""
+
+    def __init__(self, retry_after):
+        super().__init__('Too many password checks in progress, retry in {}s'.format(retry_after))
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Process pool running at most workers jobs, with max_queue more waiting."""
+
+    def __init__(self, workers=None, max_queue=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = self.workers * 4 if max_queue is None else max_queue
+        self._executor = ProcessPoolExecutor(self.workers)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.run_total = 0.0
+
+    def run(self, fn, *args):
+        """Run fn(*args) in a worker process and wait for its result."""
+        with self._lock:
+            if self.in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusy(self._retry_after())
+            self.in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            result, run_time = self._executor.submit(_timed, fn, *args).result()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        wait = time.perf_counter() - submitted - run_time
+        with self._lock:
+            self.completed += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.run_total += run_time
+        return result
+
+    def _retry_after(self):
+        # Seconds for the jobs ahead to drain at the average job time
+        average = self.run_total / self.completed if self.completed else DEFAULT_JOB_SECONDS
+        return max(1, math.ceil(self.in_flight * average / self.workers))
+
+    def stats(self):
+        with self._lock:
+            completed = self.completed or 1
+            return {'workers': self.workers, 'in_flight': self.in_flight,
+                    'queued': max(0, self.in_flight - self.workers), 'max_queue': self.max_queue,
+                    'completed': self.completed, 'rejected': self.rejected,
+                    'wait_ms_avg': self.wait_total / completed * 1000, 'wait_ms_max': self.wait_max * 1000,
+                    'run_ms_avg': self.run_total / completed * 1000}
+
+    def shutdown(self):
+        self._executor.shutdown()
+
+
+_hasher = None
+
+
+def configure(settings):
+    """Start the pool, e.g. {'workers': 4, 'max_queue': 16}; None hashes inline."""
+    global _hasher
+    if _hasher is not None:
+        _hasher.shutdown()
+    _hasher = PasswordHasher(**settings) if settings is not None else None
+
+
+def hash_password(password, rounds):
+    if _hasher is None:
+        return _hash(password, rounds)
+    return _hasher.run(_hash, password, rounds)
+
+
+def check_password(pw_hash, password):
+    if _hasher is None:
+        return _check(pw_hash, password)
+    return _hasher.run(_check, pw_hash, password)
+
+
+def stats():
+    """Queue length and wait-time counters of the pool, None when hashing inline."""
+    return _hasher.stats() if _hasher is not None else None
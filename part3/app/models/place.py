@@ -1,40 +1,57 @@
 import uuid
 from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from app.models.__init__ import BaseModel, db
 
 place_amenity = db.Table('place_amenity',
     db.Column('place_id', db.String(36), db.ForeignKey('places.id'), primary_key=True),
-    db.Column('amenity_id', db.String(36), db.ForeignKey('amenities.id'), primary_key=True)
+    db.Column('amenity_id', db.String(36), db.ForeignKey('amenities.id'), primary_key=True),
+    db.Index('ix_place_amenity_amenity_id', 'amenity_id', 'place_id')
 )
 
 class Place(BaseModel):
 
     __tablename__ = 'places'
+    __table_args__ = (
+        db.Index('ix_places_created_at_id', 'created_at', 'id'),
+        db.Index('ix_places_owner_id', 'owner_id'),
+        db.Index('ix_places_price_cents_id', 'price_cents', 'id'),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     _title = db.Column(db.String(50), nullable=False)
     _description = db.Column(db.String(50), nullable=False)
-    _price = db.Column(db.String(120), nullable=False, unique=True)
+    # Price per night in cents, exposed in currency units by the price property
+    price_cents = db.Column(db.Integer, nullable=False)
     latitude = db.Column(db.Float, default=False)
     longitude = db.Column(db.Float, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     owner_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    # Rating aggregates, kept up to date by HBnBFacade in the review write transactions
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_1 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_2 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_3 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_4 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_5 = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     reviews = db.relationship('Review', backref='place', lazy=True)
-    amenities = db.relationship('Amenity', secondary=place_amenity, lazy='subquery',
+    # Loaded on access; list endpoints eager-load it only when asked (?expand=)
+    amenities = db.relationship('Amenity', secondary=place_amenity, lazy=True,
                               backref=db.backref('places', lazy=True))
 
-    def __init__(self, title='', description='', price='', latitude=0.0, longitude=0.0, owner_id=''):
+    def __init__(self, title='', description='', price=0.0, latitude=0.0, longitude=0.0, owner_id=''):
         self.id = str(uuid.uuid4())
         self._title = title
         self._description = description
-        self._price = price
+        self.price = price
         self.latitude = latitude
         self.longitude = longitude
         self.owner_id = owner_id
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        self.created_at = datetime.utcnow()
+        self.updated_at = datetime.utcnow()
 
     @property
     def title(self):
@@ -56,13 +73,33 @@ class Place(BaseModel):
 
     @property
     def price(self):
-        return self._price
+        if self.price_cents is None:
+            return None
+        return self.price_cents / 100
 
     @price.setter
     def price(self, value):
-        if value < 0:
+        try:
+            cents = (Decimal(str(value)) * 100).quantize(Decimal('1'), ROUND_HALF_UP)
+        except InvalidOperation:
+            raise ValueError("Price must be a number")
+        if not cents.is_finite():
+            raise ValueError("Price must be a number")
+        if cents < 0:
             raise ValueError("Price can't be negative")
-        self._price = value
+        self.price_cents = int(cents)
+
+    @property
+    def average_rating(self):
+        """Mean rating, or None while the place has no review."""
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 2)
+
+    @property
+    def rating_histogram(self):
+        """Number of reviews per star rating, keyed '1' to '5'."""
+        return {str(stars): getattr(self, 'rating_{}'.format(stars)) or 0 for stars in range(1, 6)}
 
     def set_coordinates(self, latitude, longitude):
         if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
@@ -81,3 +118,12 @@ class Place(BaseModel):
     def add_user(self, user):
         """Add a user to the place"""
         self.users.append(user)
+
+
+# Sort keys of the place listing, each backed by an index; the rating key is an
+# expression index, which SQLite only uses for this exact expression.
+PRICE_KEY = Place.price_cents
+RATING_KEY = db.case((Place.review_count > db.literal_column('0'),
+                      db.cast(Place.rating_sum, db.Float) / Place.review_count),
+                     else_=db.literal_column('0.0'))
+db.Index('ix_places_rating_id', RATING_KEY, Place.id)
@@ -5,12 +5,19 @@ from app.models.__init__ import BaseModel, db
 class Review(db.Model):
 
     __tablename__ = 'reviews'
+    __table_args__ = (
+        db.Index('ix_reviews_created_at_id', 'created_at', 'id'),
+        db.Index('ix_reviews_place_id_created_at', 'place_id', 'created_at', 'id'),
+        db.Index('ux_reviews_user_id_place_id', 'user_id', 'place_id', unique=True),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     text = db.Column(db.String(1024), nullable=False)
     rating = db.Column(db.Integer, nullable=False)
     place_id = db.Column(db.String(36), db.ForeignKey('places.id'), nullable=False)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __init__(self, text, rating, place_id, user_id, id=None):
         if not text:
@@ -30,11 +37,11 @@ class Review(db.Model):
         self.user_id = user_id
 
         self.id = id or str(uuid.uuid4())
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        self.created_at = datetime.utcnow()
+        self.updated_at = datetime.utcnow()
 
     def save(self):
-        self.updated_at = datetime.now()
+        self.updated_at = datetime.utcnow()
 
     def dict(self):
         return {
@@ -0,0 +1,18 @@
+from datetime import datetime
+from app.models.__init__ import db
+
+
+class RevokedToken(db.Model):
+    """A refresh token that may no longer be used, until it would have expired anyway."""
+
+    __tablename__ = 'revoked_tokens'
+
+    # The token's jti claim
+    id = db.Column(db.String(36), primary_key=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __init__(self, jti, expires_at):
+        self.id = jti
+        self.expires_at = expires_at
+        self.created_at = datetime.utcnow()
@@ -1,11 +1,23 @@
 import uuid
 from datetime import datetime
-from .__init__ import BaseModel, db, bcrypt
+from flask import current_app, has_app_context
+from .__init__ import BaseModel, db
+from . import hashing
+
+DEFAULT_LOG_ROUNDS = 12
+
+
+def configured_log_rounds():
+    """bcrypt cost set by BCRYPT_LOG_ROUNDS in the current app's config."""
+    if has_app_context():
+        return current_app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_LOG_ROUNDS)
+    return DEFAULT_LOG_ROUNDS
 
 
 class User(BaseModel):
 
     __tablename__ = 'users'
+    __table_args__ = (db.Index('ix_users_created_at_id', 'created_at', 'id'),)
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     first_name = db.Column(db.String(50), nullable=False)
@@ -26,10 +38,10 @@ class User(BaseModel):
         self.last_name = last_name
         self.email = email
         self.is_admin = is_admin
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        self.created_at = datetime.utcnow()
+        self.updated_at = datetime.utcnow()
         self.place = []
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.hash_password(password)
 
     def validation(self, first_name, last_name, is_admin):
             if len(self.first_name) > 50 or len(self.last_name) > 50:
@@ -42,16 +54,33 @@ class User(BaseModel):
 
     def save(self):
         """Update the updated_at timestamp whenever the object is modified."""
-        self.updated_at = datetime.now()
+        self.updated_at = datetime.utcnow()
 
     def add_place(self, place):
         """Add a review to the place."""
         self.place.append(place)
         
     def hash_password(self, password):
-        """Hash the password before storing it."""
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        """Hash the password before storing it, at the configured cost.
+
+        Runs on the hashing pool when one is configured and raises
+        hashing.PasswordHasherBusy when its queue is full.
+        """
+        self.password = hashing.hash_password(password, configured_log_rounds())
+
+    @property
+    def password_cost(self):
+        """bcrypt cost the stored hash was made with, read from its $2b$<cost>$ prefix."""
+        return int(self.password.split('$')[2])
 
     def verify_password(self, password):
-        """Verify the hashed password."""
-        return bcrypt.check_password_hash(self.password, password)
+        """Verify the hashed password.
+
+        On success the password is rehashed when it was hashed at another
+        cost than the configured one; the caller saves the new hash.
+        """
+        if not hashing.check_password(self.password, password):
+            return False
+        if self.password_cost != configured_log_rounds():
+            self.hash_password(password)
+        return True
@@ -0,0 +1,33 @@
+"""Bulk repair of the denormalized rating aggregates of places.
+
+HBnBFacade keeps places.review_count, rating_sum and rating_1..rating_5
+up to date incrementally. recompute_place_ratings() rebuilds them from the
+reviews table, for databases written by older releases or after reviews
+were changed outside the facade. Places are processed in rowid order,
+batch_size places per transaction, so a live database keeps accepting
+writes in between.
+"""
+from sqlalchemy import text
+
+_RECOMPUTE = (
+    "UPDATE places SET "
+    "review_count = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id), "
+    "rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM reviews WHERE reviews.place_id = places.id), "
+    + ", ".join("rating_{0} = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id "
+                "AND rating = {0})".format(stars) for stars in range(1, 6))
+    + " WHERE rowid BETWEEN :first AND :last")
+
+
+def recompute_place_ratings(engine, batch_size):
+    """Recompute every place's rating aggregates, return the number of places."""
+    total, last = 0, 0
+    while True:
+        with engine.begin() as conn:
+            rowids = conn.execute(text(
+                "SELECT rowid FROM places WHERE rowid > :last ORDER BY rowid LIMIT :batch_size"),
+                {'last': last, 'batch_size': batch_size}).scalars().all()
+            if not rowids:
+                return total
+            conn.execute(text(_RECOMPUTE), {'first': rowids[0], 'last': rowids[-1]})
+        total += len(rowids)
+        last = rowids[-1]
@@ -0,0 +1,150 @@
+"""Asyncio counterpart of app.persistence.repository.
+
+Built on SQLAlchemy's asyncio extension and an async SQLite driver
+(aiosqlite, URL scheme sqlite+aiosqlite://). The repositories read the
+current AsyncSession from a context variable set by async_unit_of_work(),
+so, like the synchronous ones, they only flush and never commit.
+"""
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from sqlalchemy import select, tuple_
+from app.models.collection_version import CollectionVersion
+from app.persistence.pagination import clamp_limit, decode_cursor, split_page
+
+_current_session = ContextVar('hbnb_async_session', default=None)
+
+
+def current_session():
+    session = _current_session.get()
+    if session is None:
+        raise RuntimeError("No async unit of work is active")
+    return session
+
+
+@asynccontextmanager
+async def async_unit_of_work(sessionmaker, commit=True):
+    """Open one AsyncSession for the block; nested blocks reuse it.
+
+    The outermost block commits on success (unless commit=False, for
+    read-only work) and rolls back on error.
+    """
+    session = _current_session.get()
+    if session is not None:
+        yield session
+        return
+    async with sessionmaker() as session:
+        token = _current_session.set(session)
+        try:
+            yield session
+            if commit:
+                await session.commit()
+        except BaseException:
+            await session.rollback()
+            raise
+        finally:
+            _current_session.reset(token)
+
+
+class AsyncRepository(ABC):
+    @abstractmethod
+    async def add(self, obj):
+        pass
+
+    @abstractmethod
+    async def add_many(self, objs):
+        pass
+
+    @abstractmethod
+    async def get(self, obj_id):
+        pass
+
+    @abstractmethod
+    async def get_all(self):
+        pass
+
+    @abstractmethod
+    async def get_page(self, limit=None, cursor=None, newest_first=False, **filters):
+        pass
+
+    @abstractmethod
+    async def exists(self, obj_id):
+        pass
+
+    @abstractmethod
+    async def version(self):
+        pass
+
+    @abstractmethod
+    async def update(self, obj_id, data):
+        pass
+
+    @abstractmethod
+    async def delete(self, obj_id):
+        pass
+
+    @abstractmethod
+    async def get_by_attribute(self, attr_name, attr_value):
+        pass
+
+
+class AsyncSQLAlchemyRepository(AsyncRepository):
+    def __init__(self, model):
+        self.model = model
+
+    async def add(self, obj):
+        session = current_session()
+        session.add(obj)
+        await session.flush()
+
+    async def add_many(self, objs):
+        session = current_session()
+        session.add_all(objs)
+        await session.flush()
+
+    async def get(self, obj_id):
+        return await current_session().get(self.model, str(obj_id))
+
+    async def get_all(self):
+        return (await current_session().scalars(select(self.model))).all()
+
+    async def get_page(self, limit=None, cursor=None, newest_first=False, **filters):
+        limit = clamp_limit(limit)
+        key = tuple_(self.model.created_at, self.model.id)
+        query = select(self.model).filter_by(**filters)
+        if newest_first:
+            query = query.order_by(self.model.created_at.desc(), self.model.id.desc())
+        else:
+            query = query.order_by(self.model.created_at, self.model.id)
+        if cursor:
+            after = tuple_(*decode_cursor(cursor))
+            query = query.where(key < after if newest_first else key > after)
+        items = (await current_session().scalars(query.limit(limit + 1))).all()
+        return split_page(list(items), limit)
+
+    async def exists(self, obj_id):
+        query = select(self.model.id).where(self.model.id == str(obj_id)).exists()
+        return await current_session().scalar(select(query))
+
+    async def version(self):
+        # Counter maintained by app.persistence.versions, bumped on flush
+        query = select(CollectionVersion.version).where(CollectionVersion.name == self.model.__tablename__)
+        return await current_session().scalar(query) or 0
+
+    async def update(self, obj_id, data):
+        obj = await self.get(obj_id)
+        if obj:
+            for key, value in data.items():
+                setattr(obj, key, value)
+            await current_session().flush()
+
+    async def delete(self, obj_id):
+        obj = await self.get(obj_id)
+        if obj:
+            session = current_session()
+            await session.delete(obj)
+            await session.flush()
+
+    async def get_by_attribute(self, attr_name, attr_value):
+        query = select(self.model).filter_by(**{attr_name: attr_value}).limit(1)
+        return await current_session().scalar(query)
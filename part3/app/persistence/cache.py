@@ -0,0 +1,152 @@
+"""Optional per-process read-through cache in front of SQLAlchemyRepository.get.
+
+Each cached model gets an LRU cache with a time-to-live. Entries hold a
+snapshot of the row's column values rather than ORM instances, which are
+bound to a request's session; a hit is turned back into an instance of
+the current session with merge(load=False), without emitting SQL.
+
+Entries are dropped by the repository's own add/update/delete and, for
+anything else written through the ORM, when the transaction commits or
+rolls back. Writes that bypass the ORM (bulk UPDATE statements) must call
+invalidate() themselves. Rows read by a session holding uncommitted
+changes are never stored (see can_store()).
+"""
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, class_mapper, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+_PENDING_KEY = 'entity_cache_pending'
+_FLUSHED_KEY = 'entity_cache_flushed'
+
+
+class EntityCache:
+    """Thread-safe LRU + TTL mapping of primary key -> column snapshot."""
+
+    def __init__(self, maxsize=1024, ttl=60.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._data[key]
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._data), 'maxsize': self.maxsize, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
+
+
+_caches = {}
+
+
+def configure(settings):
+    """Enable caching per model name, e.g. {'Place': {'maxsize': 10000, 'ttl': 60}}."""
+    _caches.clear()
+    for model_name, options in (settings or {}).items():
+        _caches[model_name] = EntityCache(**options)
+    if _caches and not event.contains(Session, 'after_flush', _collect_changes):
+        event.listen(Session, 'after_flush', _collect_changes)
+        event.listen(Session, 'after_commit', _apply_invalidations)
+        event.listen(Session, 'after_rollback', _apply_invalidations)
+
+
+def clear():
+    """Drop every cached entity, e.g. after rows were rewritten outside the ORM."""
+    for cache in _caches.values():
+        cache.clear()
+
+
+def cache_for(model):
+    return _caches.get(model.__name__)
+
+
+def invalidate(model, obj_id):
+    cache = cache_for(model)
+    if cache is not None:
+        cache.invalidate(str(obj_id))
+
+
+def invalidate_on_commit(session, model, obj_id):
+    """Drop an entry now and again when session commits, for bulk UPDATEs."""
+    invalidate(model, obj_id)
+    if cache_for(model) is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add((model, str(obj_id)))
+
+
+def can_store(session):
+    """Tell whether rows read through session are committed state, safe to cache."""
+    return not (session.new or session.dirty or session.deleted or session.info.get(_FLUSHED_KEY))
+
+
+def stats():
+    """Hit/miss/eviction counters of every configured cache."""
+    return {model_name: cache.stats() for model_name, cache in _caches.items()}
+
+
+def snapshot(obj):
+    """Column values of a fully loaded instance, or None if some are unloaded."""
+    state = inspect(obj)
+    keys = [attr.key for attr in state.mapper.column_attrs]
+    if state.unloaded.intersection(keys):
+        return None
+    return {key: state.dict[key] for key in keys}
+
+
+def restore(session, model, values):
+    """Attach a cached snapshot to session as a persistent instance, without SQL."""
+    obj = class_mapper(model).class_manager.new_instance()
+    for key, value in values.items():
+        set_committed_value(obj, key, value)
+    make_transient_to_detached(obj)
+    return session.merge(obj, load=False)
+
+
+def _collect_changes(session, flush_context):
+    session.info[_FLUSHED_KEY] = True
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in (*session.dirty, *session.deleted):
+        model = type(obj)
+        if model.__name__ in _caches:
+            pending.add((model, inspect(obj).identity[0]))
+
+
+def _apply_invalidations(session):
+    # On commit the entries are outdated; on rollback they may hold values
+    # that were flushed but never committed: drop them either way
+    session.info.pop(_FLUSHED_KEY, None)
+    for model, obj_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate(model, obj_id)
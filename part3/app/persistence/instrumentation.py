@@ -0,0 +1,39 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter:
+    """Count the SQL statements and commits issued while the block runs.
+
+        with QueryCounter() as counter:
+            client.post(...)
+        assert counter.commits == 1
+
+    parameters holds the bound parameters of each of the statements.
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.parameters = []
+        self.commits = 0
+
+    @property
+    def queries(self):
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+    def _on_commit(self, conn):
+        self.commits += 1
+
+    def __enter__(self):
+        event.listen(Engine, 'before_cursor_execute', self._on_execute)
+        event.listen(Engine, 'commit', self._on_commit)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(Engine, 'before_cursor_execute', self._on_execute)
+        event.remove(Engine, 'commit', self._on_commit)
+        return False
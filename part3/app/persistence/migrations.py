@@ -0,0 +1,252 @@
+"""Versioned schema migrations for databases created by older releases.
+
+db.create_all() only creates missing tables, so columns and indexes added
+to the models never reach an existing database. Each migration below runs
+once, in version order, and the last applied version is recorded in the
+schema_version table. Migrations are idempotent so they can also run right
+after create_all() on a fresh database. Long data rewrites are done in
+batches of batch_size rows, one short transaction per batch, so a live
+SQLite database keeps accepting writes in between.
+"""
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import inspect, text
+from app.persistence.aggregates import recompute_place_ratings
+from app.persistence.search import install_search_index, rebuild_search_index
+from app.persistence.spatial import install_rtree, rebuild_rtree
+
+DEFAULT_BATCH_SIZE = 1000
+
+Migration = namedtuple('Migration', ['version', 'description', 'apply'])
+
+
+class MigrationError(Exception):
+    """A migration cannot run on the current data; nothing is changed to make it fit."""
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    """Register a function(engine, batch_size) as a schema migration."""
+    def register(func):
+        MIGRATIONS.append(Migration(version, description, func))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return func
+    return register
+
+
+def _ensure_version_table(engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            "version INTEGER PRIMARY KEY, description VARCHAR(255) NOT NULL, "
+            "applied_at DATETIME NOT NULL)"))
+
+
+def current_version(engine):
+    """Return the last applied migration version, 0 for an unversioned database."""
+    _ensure_version_table(engine)
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+
+
+def upgrade(engine, target=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Apply every pending migration up to target (default: the latest).
+
+    Returns the list of versions applied.
+    """
+    applied = []
+    version = current_version(engine)
+    for step in MIGRATIONS:
+        if step.version <= version or (target is not None and step.version > target):
+            continue
+        step.apply(engine, batch_size)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO schema_version (version, description, applied_at) "
+                "VALUES (:version, :description, :applied_at)"),
+                {'version': step.version, 'description': step.description,
+                 'applied_at': datetime.utcnow()})
+        applied.append(step.version)
+    return applied
+
+
+# Helpers shared by the migrations
+
+def has_column(engine, table, column):
+    return column in {col['name'] for col in inspect(engine).get_columns(table)}
+
+
+def add_column(engine, table, column, ddl):
+    """ALTER TABLE ... ADD COLUMN unless the column already exists."""
+    if not has_column(engine, table, column):
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE {} ADD COLUMN {} {}".format(table, column, ddl)))
+
+
+def create_index(engine, name, table, columns, unique=False):
+    """Create one index in its own transaction, unless it already exists."""
+    with engine.begin() as conn:
+        conn.execute(text("CREATE {}INDEX IF NOT EXISTS {} ON {} ({})".format(
+            'UNIQUE ' if unique else '', name, table, ', '.join(columns))))
+
+
+def batched(engine, statement, batch_size, params=None):
+    """Run a rowid-limited UPDATE/DELETE repeatedly until it touches no row.
+
+    statement must contain a ":batch_size" LIMIT so each run is one batch.
+    """
+    total = 0
+    while True:
+        with engine.begin() as conn:
+            count = conn.execute(text(statement), dict(params or {}, batch_size=batch_size)).rowcount
+        if not count:
+            return total
+        total += count
+
+
+def rebuild_table(engine, table, create_sql, columns, select=None):
+    """Replace table by a copy with another definition, keeping its rowids.
+
+    create_sql creates the new definition under the name <table>_new;
+    columns are copied from the select expressions (default: the same
+    columns). SQLite cannot drop UNIQUE columns or change column types in
+    place, so this is the create/copy/drop/rename procedure of its ALTER
+    TABLE documentation. It runs in one transaction; indexes and triggers
+    of the old table are dropped with it and must be created again.
+    """
+    with engine.connect() as conn:
+        foreign_keys = conn.exec_driver_sql("PRAGMA foreign_keys").scalar()
+        conn.exec_driver_sql("PRAGMA foreign_keys = OFF")
+        conn.commit()
+        try:
+            with conn.begin():
+                conn.execute(text("DROP TABLE IF EXISTS {}_new".format(table)))
+                conn.execute(text(create_sql))
+                conn.execute(text("INSERT INTO {0}_new (rowid, {1}) SELECT rowid, {2} FROM {0}".format(
+                    table, ', '.join(columns), ', '.join(select or columns))))
+                conn.execute(text("DROP TABLE {}".format(table)))
+                conn.execute(text("ALTER TABLE {0}_new RENAME TO {0}".format(table)))
+        finally:
+            conn.exec_driver_sql("PRAGMA foreign_keys = {}".format('ON' if foreign_keys else 'OFF'))
+            conn.commit()
+
+
+# Current time in the text format SQLAlchemy stores SQLite DATETIMEs in
+_NOW = "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+# Migrations
+
+@migration(1, 'Review timestamps and indexes for the hot lookup columns')
+def _hot_lookup_indexes(engine, batch_size):
+    add_column(engine, 'reviews', 'created_at', 'DATETIME')
+    add_column(engine, 'reviews', 'updated_at', 'DATETIME')
+    batched(engine,
+            # SQLAlchemy's DATETIME text format, with microseconds: keyset cursors
+            # compare these values as text with the ones the models write
+            "UPDATE reviews SET created_at = " + _NOW + ", updated_at = " + _NOW + " "
+            "WHERE rowid IN (SELECT rowid FROM reviews WHERE created_at IS NULL LIMIT :batch_size)",
+            batch_size)
+
+    for table in ('users', 'places', 'amenities', 'reviews'):
+        create_index(engine, 'ix_{}_created_at_id'.format(table), table, ['created_at', 'id'])
+    create_index(engine, 'ix_places_owner_id', 'places', ['owner_id'])
+    create_index(engine, 'ix_reviews_place_id_created_at', 'reviews', ['place_id', 'created_at', 'id'])
+
+    duplicates = duplicate_reviews(engine)
+    if duplicates:
+        raise MigrationError(
+            'Cannot enforce one review per user and place, these (user_id, place_id) pairs have several '
+            'reviews: {}. Run "python manage.py dedupe-reviews" to keep only the latest review of each '
+            'pair, then migrate again.'.format(', '.join(
+                '({}, {}): {}'.format(user_id, place_id, count) for user_id, place_id, count in duplicates)))
+    create_index(engine, 'ux_reviews_user_id_place_id', 'reviews', ['user_id', 'place_id'], unique=True)
+
+
+def duplicate_reviews(engine):
+    """(user_id, place_id, count) of every pair having more than one review."""
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.execute(text(
+            "SELECT user_id, place_id, COUNT(*) FROM reviews GROUP BY user_id, place_id "
+            "HAVING COUNT(*) > 1 ORDER BY user_id, place_id"))]
+
+
+def dedupe_reviews(engine, batch_size=DEFAULT_BATCH_SIZE):
+    """Delete all but the most recent review of each (user, place) pair, return the count deleted."""
+    return batched(engine,
+                   "DELETE FROM reviews WHERE rowid IN (SELECT rowid FROM reviews WHERE rowid NOT IN "
+                   "(SELECT MAX(rowid) FROM reviews GROUP BY user_id, place_id) LIMIT :batch_size)",
+                   batch_size)
+
+
+@migration(2, 'Rating aggregates on places')
+def _place_rating_aggregates(engine, batch_size):
+    for column in ('review_count', 'rating_sum', 'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5'):
+        add_column(engine, 'places', column, 'INTEGER NOT NULL DEFAULT 0')
+    recompute_place_ratings(engine, batch_size)
+
+
+@migration(3, 'R*Tree spatial index of place coordinates')
+def _places_rtree(engine, batch_size):
+    install_rtree(engine)
+    rebuild_rtree(engine, batch_size)
+
+
+@migration(4, 'FTS5 full-text index of places and reviews')
+def _search_index(engine, batch_size):
+    install_search_index(engine)
+    rebuild_search_index(engine, batch_size)
+
+
+@migration(5, 'Indexes for filtering and sorting the place listing')
+def _place_listing_indexes(engine, batch_size):
+    if has_column(engine, 'places', '_price'):
+        create_index(engine, 'ix_places_price_id', 'places', ['CAST(_price AS FLOAT)', 'id'])
+    create_index(engine, 'ix_places_rating_id', 'places', [
+        'CASE WHEN (review_count > 0) THEN CAST(rating_sum AS FLOAT) / (review_count + 0.0) ELSE 0.0 END', 'id'])
+    create_index(engine, 'ix_place_amenity_amenity_id', 'place_amenity', ['amenity_id', 'place_id'])
+
+
+_PRICE_CENTS = "CAST(ROUND(CAST(_price AS REAL) * 100) AS INTEGER)"
+
+_PLACES_V6 = (
+    "CREATE TABLE places_new (id VARCHAR(36) NOT NULL, _title VARCHAR(50) NOT NULL, "
+    "_description VARCHAR(50) NOT NULL, price_cents INTEGER NOT NULL, latitude FLOAT, "
+    "longitude FLOAT NOT NULL, created_at DATETIME, updated_at DATETIME, owner_id VARCHAR(36) NOT NULL, "
+    "review_count INTEGER DEFAULT '0' NOT NULL, rating_sum INTEGER DEFAULT '0' NOT NULL, "
+    "rating_1 INTEGER DEFAULT '0' NOT NULL, rating_2 INTEGER DEFAULT '0' NOT NULL, "
+    "rating_3 INTEGER DEFAULT '0' NOT NULL, rating_4 INTEGER DEFAULT '0' NOT NULL, "
+    "rating_5 INTEGER DEFAULT '0' NOT NULL, PRIMARY KEY (id), FOREIGN KEY(owner_id) REFERENCES users (id))")
+
+_PLACES_V6_COLUMNS = ['id', '_title', '_description', 'price_cents', 'latitude', 'longitude', 'created_at',
+                      'updated_at', 'owner_id', 'review_count', 'rating_sum', 'rating_1', 'rating_2',
+                      'rating_3', 'rating_4', 'rating_5']
+
+
+@migration(6, 'Numeric price_cents column replacing the unique text price')
+def _numeric_price(engine, batch_size):
+    if has_column(engine, 'places', '_price'):
+        # A single copy under the write lock: the text prices are converted
+        # while rebuilding, and the unique text column is dropped with the table
+        select = [_PRICE_CENTS if column == 'price_cents' else column for column in _PLACES_V6_COLUMNS]
+        rebuild_table(engine, 'places', _PLACES_V6, _PLACES_V6_COLUMNS, select)
+        create_index(engine, 'ix_places_created_at_id', 'places', ['created_at', 'id'])
+        create_index(engine, 'ix_places_owner_id', 'places', ['owner_id'])
+        create_index(engine, 'ix_places_rating_id', 'places', [
+            'CASE WHEN (review_count > 0) THEN CAST(rating_sum AS FLOAT) / (review_count + 0.0) ELSE 0.0 END',
+            'id'])
+        install_rtree(engine)
+        install_search_index(engine)
+    create_index(engine, 'ix_places_price_cents_id', 'places', ['price_cents', 'id'])
+
+
+@migration(7, 'Microseconds on the review timestamps backfilled without them')
+def _review_timestamp_format(engine, batch_size):
+    # Migration 1 used to backfill 'YYYY-MM-DD HH:MM:SS', which sorts before the
+    # same second written by SQLAlchemy and breaks keyset cursors over those rows
+    for column in ('created_at', 'updated_at'):
+        batched(engine,
+                "UPDATE reviews SET {0} = {0} || '.000000' WHERE rowid IN "
+                "(SELECT rowid FROM reviews WHERE length({0}) = 19 LIMIT :batch_size)".format(column),
+                batch_size)
@@ -0,0 +1,65 @@
+import base64
+import json
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# Rows fetched per round trip when a whole collection is streamed
+STREAM_BATCH_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(created_at, obj_id):
+    """Build an opaque cursor pointing just after (created_at, id)."""
+    raw = json.dumps([created_at.isoformat(), obj_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the (created_at, id) pair stored in an opaque cursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, obj_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), str(obj_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor("Invalid pagination cursor")
+
+
+def encode_score_cursor(score, obj_id):
+    """Build an opaque cursor pointing just after (score, id), for ranked results."""
+    raw = json.dumps([score, obj_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_score_cursor(cursor):
+    """Return the (score, id) pair stored in a ranked-results cursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        score, obj_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return float(score), str(obj_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor("Invalid pagination cursor")
+
+
+def clamp_limit(limit):
+    """Validate a requested page size and keep it within bounds."""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def split_page(items, limit):
+    """Trim the look-ahead row of a limit + 1 query and build the next cursor."""
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_cursor(items[-1].created_at, items[-1].id)
@@ -1,5 +1,17 @@
+import heapq
+import math
+from datetime import datetime
+from decimal import Decimal
 from abc import ABC, abstractmethod
-from app.models import user, place, review, amenity
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import lazyload, load_only
+from app.models import user, place, review, amenity, revoked_token
+from app.persistence.pagination import (STREAM_BATCH_SIZE, clamp_limit, decode_cursor, decode_score_cursor,
+                                        encode_cursor, encode_score_cursor, split_page)
+from app.persistence import cache as entity_cache, search, spatial, versions
+from app.persistence.routing import read_session
+from app.persistence.unit_of_work import in_unit_of_work
 from app import db
 
 class Repository(ABC):
@@ -8,17 +20,59 @@ class Repository(ABC):
         pass
 
     @abstractmethod
-    def get(self, obj_id):
+    def add_many(self, objs):
+        """Persist several objects in a single write."""
+        pass
+
+    @abstractmethod
+    def get(self, obj_id, columns=None, options=()):
+        """The object with this id, or None.
+
+        columns: load only these attributes, options: extra loader options
+        (eager-loaded relationships), both when supported.
+        """
         pass
 
     @abstractmethod
     def get_all(self):
         pass
 
+    @abstractmethod
+    def get_page(self, limit=None, cursor=None, newest_first=False, columns=None, options=(), **filters):
+        """Return (items, next_cursor) matching filters, ordered by (created_at, id)."""
+        pass
+
+    @abstractmethod
+    def iter_all(self, batch_size=STREAM_BATCH_SIZE, columns=None, options=(), **filters):
+        """Yield every object matching filters, ordered by (created_at, id), batch_size rows at a time."""
+        pass
+
+    @abstractmethod
+    def exists(self, obj_id):
+        pass
+
+    @abstractmethod
+    def version(self, *related):
+        """Value that changes whenever an object is added, updated or deleted.
+
+        With related repositories, a tuple of this version and theirs.
+        """
+        pass
+
     @abstractmethod
     def update(self, obj_id, data):
         pass
 
+    @abstractmethod
+    def increment(self, obj_id, deltas):
+        """Add {attr_name: delta} to numeric attributes of one object."""
+        pass
+
+    @abstractmethod
+    def update_many(self, updates):
+        """Apply {obj_id: data} updates in a single write, return the updated objects."""
+        pass
+
     @abstractmethod
     def delete(self, obj_id):
         pass
@@ -30,55 +84,342 @@ class Repository(ABC):
 class InMemoryRepository(Repository):
     def __init__(self):
         self._storage = {}
+        self._version = 0
 
     def add(self, obj):
         self._storage[obj.id] = obj
+        self._version += 1
 
-    def get(self, obj_id):
+    def add_many(self, objs):
+        for obj in objs:
+            self.add(obj)
+
+    def get(self, obj_id, columns=None, options=()):
         return self._storage.get(obj_id)
 
     def get_all(self):
         return list(self._storage.values())
 
+    def get_page(self, limit=None, cursor=None, newest_first=False, columns=None, options=(), **filters):
+        limit = clamp_limit(limit)
+        objs = [obj for obj in self._storage.values()
+                if all(getattr(obj, key) == value for key, value in filters.items())]
+        objs.sort(key=lambda obj: (obj.created_at, obj.id), reverse=newest_first)
+        if cursor:
+            after = decode_cursor(cursor)
+            objs = [obj for obj in objs
+                    if ((obj.created_at, obj.id) < after if newest_first else (obj.created_at, obj.id) > after)]
+        return split_page(objs[:limit + 1], limit)
+
+    def iter_all(self, batch_size=STREAM_BATCH_SIZE, columns=None, options=(), **filters):
+        objs = [obj for obj in self._storage.values()
+                if all(getattr(obj, key) == value for key, value in filters.items())]
+        return iter(sorted(objs, key=lambda obj: (obj.created_at, obj.id)))
+
+    def exists(self, obj_id):
+        return obj_id in self._storage
+
+    def version(self, *related):
+        if related:
+            return (self._version, *(repo.version() for repo in related))
+        return self._version
+
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
             obj.update(data)
+            self._version += 1
+
+    def increment(self, obj_id, deltas):
+        obj = self.get(obj_id)
+        if obj:
+            for key, delta in deltas.items():
+                setattr(obj, key, getattr(obj, key) + delta)
+            self._version += 1
+
+    def update_many(self, updates):
+        objs = [obj for obj in (self.get(obj_id) for obj_id in updates) if obj]
+        for obj in objs:
+            obj.update(updates[obj.id])
+        self._version += 1
+        return objs
 
     def delete(self, obj_id):
         if obj_id in self._storage:
             del self._storage[obj_id]
+            self._version += 1
 
     def get_by_attribute(self, attr_name, attr_value):
         return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
 
 class SQLAlchemyRepository(Repository):
+    """Repository over a SQLAlchemy model.
+
+    Writes are only flushed: committing is left to the unit of work
+    opened by the facade (see app.persistence.unit_of_work). Reads go
+    through read_session(), which may be a read-only engine; objects that
+    are about to be modified are always loaded from the primary session.
+    """
+
     def __init__(self, model):
         self.model = model
 
     def add(self, obj):
         db.session.add(obj)
-        db.session.commit()
+        db.session.flush()
+        entity_cache.invalidate(self.model, obj.id)
+
+    def add_many(self, objs):
+        # Same-mapper rows with client-side ids are flushed as one executemany INSERT
+        db.session.add_all(objs)
+        db.session.flush()
+
+    def _query(self, *entities):
+        return read_session().query(*(entities or (self.model,)))
+
+    def _loaders(self, columns, options=()):
+        # Loader options reading only the given attributes, plus the keyset columns,
+        # followed by the caller's options
+        if not columns:
+            return list(options)
+        names = set(columns) | {'id', 'created_at', 'updated_at'}
+        return [load_only(*(getattr(self.model, name) for name in sorted(names))), *options]
 
-    def get(self, obj_id):
+    def _get_for_write(self, obj_id):
+        return db.session.get(self.model, str(obj_id))
+
+    def get(self, obj_id, columns=None, options=()):
+        # Read-through: a cache hit is merged into the session without SQL.
+        # The cache holds whole rows, so columns only narrows uncached reads,
+        # and the relationships of a cached row load on access.
         obj_id = str(obj_id)
-        return self.model.query.get(obj_id)
+        session = read_session()
+        cache = entity_cache.cache_for(self.model)
+        if cache is None:
+            return session.get(self.model, obj_id, options=self._loaders(columns, options))
+        values = cache.get(obj_id)
+        if values is not None:
+            return entity_cache.restore(session, self.model, values)
+        obj = session.get(self.model, obj_id, options=list(options))
+        # A session with uncommitted writes may return rows other requests must not see
+        if obj is not None and not in_unit_of_work() and entity_cache.can_store(session):
+            values = entity_cache.snapshot(obj)
+            if values is not None:
+                cache.set(obj_id, values)
+        return obj
 
     def get_all(self):
-        return self.model.query.all()
+        return self._query().all()
+
+    def get_page(self, limit=None, cursor=None, newest_first=False, columns=None, options=(), **filters):
+        limit = clamp_limit(limit)
+        key = db.tuple_(self.model.created_at, self.model.id)
+        query = self._query().options(*self._loaders(columns, options)).filter_by(**filters)
+        if newest_first:
+            query = query.order_by(self.model.created_at.desc(), self.model.id.desc())
+        else:
+            query = query.order_by(self.model.created_at, self.model.id)
+        if cursor:
+            after = db.tuple_(*decode_cursor(cursor))
+            query = query.filter(key < after if newest_first else key > after)
+        return split_page(query.limit(limit + 1).all(), limit)
+
+    def iter_all(self, batch_size=STREAM_BATCH_SIZE, columns=None, options=(), **filters):
+        # yield_per fetches batch_size rows per round trip and keeps no strong
+        # reference to the instances already yielded: memory stays flat. Only the
+        # relationships named by options are loaded with each batch, the others
+        # load on access.
+        statement = (select(self.model).options(lazyload('*'), *self._loaders(columns, options))
+                     .filter_by(**filters)
+                     .order_by(self.model.created_at, self.model.id).execution_options(yield_per=batch_size))
+        yield from read_session().scalars(statement)
+
+    def exists(self, obj_id):
+        query = self._query(self.model.id).filter(self.model.id == str(obj_id))
+        return read_session().query(query.exists()).scalar()
+
+    def version(self, *related):
+        # Maintained counters (app.persistence.versions), all read with one lookup
+        found = versions.current(read_session(), self.model.__tablename__,
+                                 *(repo.model.__tablename__ for repo in related))
+        return found if related else found[0]
 
     def update(self, obj_id, data):
-        obj = self.get(obj_id)
+        obj = self._get_for_write(obj_id)
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            db.session.flush()
+            entity_cache.invalidate(self.model, obj_id)
+
+    def increment(self, obj_id, deltas):
+        # "col = col + delta" in SQL, so concurrent transactions never lose an increment
+        values = {getattr(self.model, key): getattr(self.model, key) + delta for key, delta in deltas.items()}
+        db.session.query(self.model).filter(self.model.id == str(obj_id)).update(
+            values, synchronize_session='evaluate')
+        versions.bump(db.session, self.model.__tablename__)
+        entity_cache.invalidate_on_commit(db.session, self.model, obj_id)
+
+    def update_many(self, updates):
+        # One SELECT for the objects and one flush for every change; the
+        # unit of work commits them together
+        updates = {str(obj_id): data for obj_id, data in updates.items()}
+        objs = db.session.query(self.model).filter(self.model.id.in_(updates)).all()
+        for obj in objs:
+            for key, value in updates[obj.id].items():
+                setattr(obj, key, value)
+        db.session.flush()
+        for obj in objs:
+            entity_cache.invalidate(self.model, obj.id)
+        return objs
 
     def delete(self, obj_id):
-        obj = self.get(obj_id)
+        obj = self._get_for_write(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            db.session.flush()
+            entity_cache.invalidate(self.model, obj_id)
 
     def get_by_attribute(self, attr_name, attr_value):
-        return self.model.query.filter_by(**{attr_name: attr_value}).first()
+        return self._query().filter_by(**{attr_name: attr_value}).first()
+
+
+# Best BM25 score (lower is better) and snippet of each place matching :match in
+# its title/description or in one of its reviews; title hits weigh the most
+_SEARCH = """
+SELECT place_id, score, snippet FROM (
+    SELECT place_id, MIN(score) AS score, snippet FROM (
+        SELECT places.id AS place_id, bm25(places_fts, 4.0, 1.0) AS score,
+               snippet(places_fts, -1, :start, :end, '...', 16) AS snippet
+        FROM places_fts JOIN places ON places.rowid = places_fts.rowid
+        WHERE places_fts MATCH :match
+        UNION ALL
+        SELECT reviews.place_id, bm25(reviews_fts) * 0.5,
+               snippet(reviews_fts, 0, :start, :end, '...', 16)
+        FROM reviews_fts JOIN reviews ON reviews.rowid = reviews_fts.rowid
+        WHERE reviews_fts MATCH :match
+    ) GROUP BY place_id
+) WHERE (score, place_id) > (:after_score, :after_id)
+ORDER BY score, place_id LIMIT :limit
+"""
+
+
+class PlaceRepository(SQLAlchemyRepository):
+    """Places, with spatial lookups through the places_rtree index (see app.persistence.spatial)."""
+
+    def __init__(self):
+        super().__init__(place.Place)
+
+    # sort name -> (key expression, descending, score cursor); the default is oldest first
+    SORTS = {
+        None: (place.Place.created_at, False, False),
+        'newest': (place.Place.created_at, True, False),
+        'price': (place.PRICE_KEY, False, True),
+        '-price': (place.PRICE_KEY, True, True),
+        'rating': (place.RATING_KEY, True, True),
+    }
+
+    def get_filtered_page(self, limit=None, cursor=None, sort=None, min_price=None, max_price=None,
+                          amenity_ids=None, owner_id=None, columns=None, options=()):
+        """Keyset page of the places matching every given filter, in sort order.
+
+        amenity_ids keeps the places having all of the amenities. Returns
+        (places, next_cursor) like get_page().
+        """
+        if sort not in self.SORTS:
+            raise ValueError('sort must be one of: {}'.format(', '.join(name for name in self.SORTS if name)))
+        limit = clamp_limit(limit)
+        key, descending, score_cursor = self.SORTS[sort]
+        query = self._query(self.model, key.label('sort_key')).options(*self._loaders(columns, options))
+        if owner_id:
+            query = query.filter(self.model.owner_id == owner_id)
+        # Prices are stored in cents
+        if min_price is not None:
+            query = query.filter(place.PRICE_KEY >= math.ceil(Decimal(str(min_price)) * 100))
+        if max_price is not None:
+            query = query.filter(place.PRICE_KEY <= math.floor(Decimal(str(max_price)) * 100))
+        if amenity_ids:
+            amenity_ids = set(amenity_ids)
+            links = place.place_amenity.c
+            having_all = (db.select(links.place_id).where(links.amenity_id.in_(amenity_ids))
+                          .group_by(links.place_id).having(db.func.count() == len(amenity_ids)))
+            query = query.filter(self.model.id.in_(having_all))
+        if cursor:
+            after = db.tuple_(*(decode_score_cursor(cursor) if score_cursor else decode_cursor(cursor)))
+            row = db.tuple_(key, self.model.id)
+            query = query.filter(row < after if descending else row > after)
+        if descending:
+            query = query.order_by(key.desc(), self.model.id.desc())
+        else:
+            query = query.order_by(key, self.model.id)
+        rows = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last, sort_key = rows[-1]
+            next_cursor = (encode_score_cursor if score_cursor else encode_cursor)(sort_key, last.id)
+        return [obj for obj, sort_key in rows], next_cursor
+
+    def _nearest(self, boxes, lat, lon, limit, radius_km=None, columns=None, options=()):
+        # R*Tree candidates, exact filter and distance on the real coordinates,
+        # then only the `limit` nearest places are loaded
+        rtree = spatial.places_rtree
+        inside = db.or_(*(db.and_(rtree.c.max_lat >= min_lat, rtree.c.min_lat <= max_lat,
+                                  rtree.c.max_lon >= min_lon, rtree.c.min_lon <= max_lon)
+                          for min_lat, min_lon, max_lat, max_lon in boxes))
+        candidates = self._query(self.model.id, self.model.latitude, self.model.longitude).filter(
+            self.model.id.in_(db.select(rtree.c.place_id).where(inside)))
+        found = []
+        for place_id, place_lat, place_lon in candidates:
+            if radius_km is None and not spatial.in_boxes(boxes, place_lat, place_lon):
+                continue
+            distance = spatial.haversine_km(lat, lon, place_lat, place_lon)
+            if radius_km is None or distance <= radius_km:
+                found.append((distance, place_id))
+        found = heapq.nsmallest(clamp_limit(limit), found)
+        if not found:
+            return []
+        places = {obj.id: obj for obj in self._query().options(*self._loaders(columns, options)).filter(
+            self.model.id.in_([pid for _, pid in found]))}
+        return [(places[pid], distance) for distance, pid in found if pid in places]
+
+    def get_near(self, lat, lon, radius_km, limit=None, columns=None, options=()):
+        """(place, distance_km) pairs within radius_km of (lat, lon), nearest first."""
+        return self._nearest(spatial.radius_boxes(lat, lon, radius_km), lat, lon, limit, radius_km,
+                             columns, options)
+
+    def get_in_bbox(self, min_lat, min_lon, max_lat, max_lon, limit=None, columns=None, options=()):
+        """(place, distance_km) pairs inside the box, nearest to its center first."""
+        boxes = spatial.bbox_boxes(min_lat, min_lon, max_lat, max_lon)
+        lat, lon = spatial.bbox_center(min_lat, min_lon, max_lat, max_lon)
+        return self._nearest(boxes, lat, lon, limit, columns=columns, options=options)
+
+    def search(self, query, limit=None, cursor=None, columns=None, options=()):
+        """Full-text search: ([(place, snippet)], next_cursor), best match first."""
+        limit = clamp_limit(limit)
+        after_score, after_id = decode_score_cursor(cursor) if cursor else (float('-inf'), '')
+        rows = read_session().execute(db.text(_SEARCH), {
+            'match': search.match_expression(query), 'start': search.MATCH_START, 'end': search.MATCH_END,
+            'after_score': after_score, 'after_id': after_id, 'limit': limit + 1}).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_score_cursor(rows[-1].score, rows[-1].place_id)
+        places = {}
+        if rows:
+            places = {obj.id: obj for obj in self._query().options(*self._loaders(columns, options)).filter(
+                self.model.id.in_([row.place_id for row in rows]))}
+        return [(places[row.place_id], row.snippet) for row in rows if row.place_id in places], next_cursor
+
+
+class RevokedTokenRepository(SQLAlchemyRepository):
+    """Refresh tokens revoked at logout, keyed by their jti claim."""
+
+    def __init__(self):
+        super().__init__(revoked_token.RevokedToken)
+
+    def revoke(self, jti, expires_at):
+        # INSERT ... ON CONFLICT DO NOTHING: two logouts racing with the same
+        # token both succeed, where checking first would fail one on the key
+        db.session.execute(insert(self.model).values(id=jti, expires_at=expires_at, created_at=datetime.utcnow())
+                           .on_conflict_do_nothing(index_elements=[self.model.id]))
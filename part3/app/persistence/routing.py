@@ -0,0 +1,65 @@
+"""Route repository reads to a dedicated read-only engine.
+
+With SQLite in WAL mode, readers on their own connections never wait for
+the writer, so GET handlers can use a separate pool of read-only
+connections. A request keeps reading through the primary session once it
+is inside a unit of work or has committed, so it always sees its own writes.
+"""
+import os
+from flask.globals import app_ctx
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
+from app import db
+from app.persistence.sqlite import init_sqlite_profile
+from app.persistence.unit_of_work import has_written, in_unit_of_work
+
+
+def _app_ctx_id():
+    return id(app_ctx._get_current_object())
+
+
+def read_only_url(url):
+    """Turn a SQLite file URL into its read-only URI form."""
+    url = make_url(url)
+    if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+        return None
+    path = os.path.abspath(url.database)
+    return url.set(database='file:{}'.format(path), query={'mode': 'ro', 'uri': 'true'})
+
+
+class ReadReplica:
+    """Read-only engine, pool and request-scoped session."""
+
+    def __init__(self):
+        self.engine = None
+        self.session = None
+
+    def init_app(self, app, primary_engine):
+        """Create the read engine when SQLALCHEMY_READ_ONLY_POOL is enabled.
+
+        SQLALCHEMY_READ_DATABASE_URI overrides the URL; by default the primary
+        SQLite file is reopened read-only. Must run inside an app context.
+        """
+        if not app.config.get('SQLALCHEMY_READ_ONLY_POOL'):
+            return
+        url = app.config.get('SQLALCHEMY_READ_DATABASE_URI') or read_only_url(primary_engine.url)
+        if url is None:
+            return
+        self.engine = create_engine(url, **app.config.get('SQLALCHEMY_READ_ENGINE_OPTIONS', {}))
+        pragmas = {name: value for name, value in app.config.get('SQLITE_PRAGMAS', {}).items()
+                   if name != 'journal_mode'}
+        pragmas['query_only'] = 'ON'
+        init_sqlite_profile(self.engine, pragmas)
+        self.session = scoped_session(sessionmaker(bind=self.engine), scopefunc=_app_ctx_id)
+        app.teardown_appcontext(lambda exc: self.session.remove())
+
+
+read_replica = ReadReplica()
+
+
+def read_session():
+    """Session to read from: the read-only one unless the request has written."""
+    if read_replica.session is None or in_unit_of_work() or has_written():
+        return db.session
+    return read_replica.session()
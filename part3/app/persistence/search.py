@@ -0,0 +1,91 @@
+"""Full-text search index of places and reviews on SQLite's FTS5 module.
+
+places_fts indexes places._title/_description and reviews_fts indexes
+reviews.text. Both are external-content tables: they store only the
+index, read the text back from places/reviews by rowid, and are kept in
+sync by triggers. Like places_rtree (app.persistence.spatial) they depend
+on rowids, so run `python manage.py rebuild-search-index` after a VACUUM.
+"""
+from html import escape
+from sqlalchemy import text
+
+TOKENIZER = 'unicode61 remove_diacritics 2'
+
+# Snippets mark matches with control characters, turned into HTML by highlight()
+MATCH_START, MATCH_END = '\x02', '\x03'
+
+# table -> (fts table, indexed columns)
+INDEXES = {
+    'places': ('places_fts', ('_title', '_description')),
+    'reviews': ('reviews_fts', ('text',)),
+}
+
+
+def _statements(table, fts, columns):
+    cols = ', '.join(columns)
+    new = ', '.join('new.' + column for column in columns)
+    old = ', '.join('old.' + column for column in columns)
+    insert = "INSERT INTO {0} (rowid, {1}) VALUES (new.rowid, {2});".format(fts, cols, new)
+    delete = "INSERT INTO {0} ({0}, rowid, {1}) VALUES ('delete', old.rowid, {2});".format(fts, cols, old)
+    return [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS {0} USING fts5({1}, content='{2}', content_rowid='rowid', "
+        "tokenize='{3}')".format(fts, cols, table, TOKENIZER),
+        "CREATE TRIGGER IF NOT EXISTS {0}_insert AFTER INSERT ON {1} BEGIN {2} END".format(fts, table, insert),
+        "CREATE TRIGGER IF NOT EXISTS {0}_delete AFTER DELETE ON {1} BEGIN {2} END".format(fts, table, delete),
+        "CREATE TRIGGER IF NOT EXISTS {0}_update AFTER UPDATE OF {1} ON {2} BEGIN {3} {4} END".format(
+            fts, cols, table, delete, insert),
+    ]
+
+
+def install_search_index(engine):
+    """Create the FTS5 tables and their triggers, unless they already exist."""
+    with engine.begin() as conn:
+        for table, (fts, columns) in INDEXES.items():
+            for statement in _statements(table, fts, columns):
+                conn.execute(text(statement))
+
+
+def rebuild_search_index(engine, batch_size):
+    """Re-index every place and review, batch_size rows per transaction.
+
+    Searches only see the rows indexed so far until the rebuild finishes.
+    Returns the number of rows indexed.
+    """
+    total = 0
+    for table, (fts, columns) in INDEXES.items():
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO {0} ({0}) VALUES ('delete-all')".format(fts)))
+        last = 0
+        while True:
+            with engine.begin() as conn:
+                first, last_in_batch, count = conn.execute(text(
+                    "SELECT MIN(rowid), MAX(rowid), COUNT(*) FROM (SELECT rowid FROM {} "
+                    "WHERE rowid > :last ORDER BY rowid LIMIT :batch_size)".format(table)),
+                    {'last': last, 'batch_size': batch_size}).one()
+                if not count:
+                    break
+                conn.execute(text(
+                    "INSERT INTO {0} (rowid, {1}) SELECT rowid, {1} FROM {2} "
+                    "WHERE rowid BETWEEN :first AND :last".format(fts, ', '.join(columns), table)),
+                    {'first': first, 'last': last_in_batch})
+            total += count
+            last = last_in_batch
+    return total
+
+
+def match_expression(query):
+    """FTS5 MATCH expression requiring every word of a free-text query.
+
+    Words are quoted so that user input can never be parsed as FTS5
+    syntax; the last word also matches as a prefix.
+    """
+    words = ['"{}"'.format(word.replace('"', '""')) for word in query.split()]
+    if not words:
+        raise ValueError('q must contain at least one word')
+    words[-1] += '*'
+    return ' '.join(words)
+
+
+def highlight(snippet):
+    """HTML-escape a snippet and wrap its matches in <mark> elements."""
+    return escape(snippet or '').replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
@@ -0,0 +1,111 @@
+"""Spatial index of place coordinates on SQLite's R*Tree module.
+
+places_rtree holds one zero-area box per place, keyed by the place's rowid
+and carrying the place id as an auxiliary column, and is kept in sync with
+the places table by triggers. A bounding-box lookup only visits the tree
+nodes that overlap the box instead of scanning every place.
+
+VACUUM may renumber the rowids of tables without an INTEGER PRIMARY KEY,
+which places is; run `python manage.py rebuild-spatial-index` after it.
+"""
+import math
+from sqlalchemy import column, table, text
+
+EARTH_RADIUS_KM = 6371.0088
+MAX_RADIUS_KM = 1000
+
+places_rtree = table('places_rtree', column('id'), column('min_lat'), column('max_lat'),
+                     column('min_lon'), column('max_lon'), column('place_id'))
+
+_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS places_rtree_insert AFTER INSERT ON places "
+    "WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN "
+    "INSERT INTO places_rtree VALUES (new.rowid, new.latitude, new.latitude, "
+    "new.longitude, new.longitude, new.id); END",
+    "CREATE TRIGGER IF NOT EXISTS places_rtree_update AFTER UPDATE OF latitude, longitude ON places BEGIN "
+    "DELETE FROM places_rtree WHERE id = old.rowid; "
+    "INSERT INTO places_rtree SELECT new.rowid, new.latitude, new.latitude, new.longitude, "
+    "new.longitude, new.id WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL; END",
+    "CREATE TRIGGER IF NOT EXISTS places_rtree_delete AFTER DELETE ON places BEGIN "
+    "DELETE FROM places_rtree WHERE id = old.rowid; END",
+]
+
+
+def install_rtree(engine):
+    """Create places_rtree and its triggers, unless they already exist."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS places_rtree USING rtree("
+            "id, min_lat, max_lat, min_lon, max_lon, +place_id)"))
+        for trigger in _TRIGGERS:
+            conn.execute(text(trigger))
+
+
+def rebuild_rtree(engine, batch_size):
+    """Refill places_rtree from places, batch_size places per transaction."""
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM places_rtree"))
+    total, last = 0, 0
+    while True:
+        with engine.begin() as conn:
+            first, last_in_batch, count = conn.execute(text(
+                "SELECT MIN(rowid), MAX(rowid), COUNT(*) FROM (SELECT rowid FROM places "
+                "WHERE rowid > :last ORDER BY rowid LIMIT :batch_size)"),
+                {'last': last, 'batch_size': batch_size}).one()
+            if not count:
+                return total
+            conn.execute(text(
+                "INSERT INTO places_rtree SELECT rowid, latitude, latitude, longitude, longitude, id "
+                "FROM places WHERE rowid BETWEEN :first AND :last "
+                "AND latitude IS NOT NULL AND longitude IS NOT NULL"),
+                {'first': first, 'last': last_in_batch})
+        total += count
+        last = last_in_batch
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points, in kilometres."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_boxes(lat, lon, radius_km):
+    """(min_lat, min_lon, max_lat, max_lon) boxes covering the circle around (lat, lon).
+
+    A circle crossing the antimeridian is covered by two boxes, one on
+    each side.
+    """
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        # The circle contains a pole: every longitude is in range
+        return [(max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0)]
+    delta_lon = math.degrees(math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM)
+                                           / math.cos(math.radians(lat)))))
+    min_lon, max_lon = lon - delta_lon, lon + delta_lon
+    if min_lon < -180:
+        return [(min_lat, min_lon + 360, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+    if max_lon > 180:
+        return [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon - 360)]
+    return [(min_lat, min_lon, max_lat, max_lon)]
+
+
+def bbox_boxes(min_lat, min_lon, max_lat, max_lon):
+    """Split a box whose min_lon > max_lon (it crosses the antimeridian) in two."""
+    if min_lon > max_lon:
+        return [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+    return [(min_lat, min_lon, max_lat, max_lon)]
+
+
+def bbox_center(min_lat, min_lon, max_lat, max_lon):
+    if min_lon > max_lon:
+        max_lon += 360
+    lon = (min_lon + max_lon) / 2
+    return (min_lat + max_lat) / 2, lon - 360 if lon > 180 else lon
+
+
+def in_boxes(boxes, lat, lon):
+    return any(min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+               for min_lat, min_lon, max_lat, max_lon in boxes)
@@ -0,0 +1,31 @@
+import re
+from sqlalchemy import event
+
+_PRAGMA_VALUE = re.compile(r'^-?[A-Za-z0-9_]+$')
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    """Run PRAGMA statements on a raw sqlite3 connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            if not _PRAGMA_VALUE.match(str(name)) or not _PRAGMA_VALUE.match(str(value)):
+                raise ValueError("Invalid SQLite pragma {}={!r}".format(name, value))
+            cursor.execute("PRAGMA {} = {}".format(name, value))
+    finally:
+        cursor.close()
+
+
+def init_sqlite_profile(engine, pragmas):
+    """Apply pragmas to every connection the engine opens from now on.
+
+    Call it before the engine is first used so pooled connections are covered.
+    Does nothing for non-SQLite engines or an empty profile.
+    """
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+    pragmas = dict(pragmas)
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
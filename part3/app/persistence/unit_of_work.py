@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+from functools import wraps
+from app import db
+
+_DEPTH_KEY = 'unit_of_work_depth'
+_WRITTEN_KEY = 'unit_of_work_written'
+
+
+@contextmanager
+def unit_of_work():
+    """Group every repository write made inside the block into one transaction.
+
+    Repositories only flush; the outermost block commits when it exits
+    normally and rolls back when it exits with an exception. Nested
+    blocks join the transaction of the outermost one.
+    """
+    session = db.session
+    depth = session.info.get(_DEPTH_KEY, 0)
+    session.info[_DEPTH_KEY] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+            session.info[_WRITTEN_KEY] = True
+    except BaseException:
+        if depth == 0:
+            session.rollback()
+        raise
+    finally:
+        session.info[_DEPTH_KEY] = depth
+
+
+def in_unit_of_work():
+    """Tell whether the current session is inside a unit of work."""
+    return db.session.info.get(_DEPTH_KEY, 0) > 0
+
+
+def has_written():
+    """Tell whether a unit of work already committed during this request."""
+    return db.session.info.get(_WRITTEN_KEY, False)
+
+
+def transactional(method):
+    """Run a facade method inside a unit of work."""
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with unit_of_work():
+            return method(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,44 @@
+"""Collection versions: one counter per table, bumped by the writing transaction.
+
+List ETags need a value that changes whenever a collection does. Deriving
+it from the rows (count and max(updated_at)) scans the whole table on
+every GET; instead every flush that adds, changes or deletes rows bumps
+the counter of their tables in collection_versions, inside the same
+transaction, so a rollback leaves it untouched. Bulk UPDATE statements
+made outside the ORM's unit of work must call bump() themselves.
+
+Reading versions is a single primary key lookup, whatever the number of
+tables.
+"""
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from app.models.collection_version import CollectionVersion
+
+_TABLE = CollectionVersion.__tablename__
+
+
+def bump(session, *tables):
+    """Increment the versions of tables in the session's transaction."""
+    statement = insert(CollectionVersion).values([{'name': table, 'version': 1} for table in sorted(tables)])
+    statement = statement.on_conflict_do_update(
+        index_elements=[CollectionVersion.name], set_={'version': CollectionVersion.version + 1})
+    session.connection().execute(statement)
+
+
+def current(session, *tables):
+    """Versions of tables, in order; 0 for a table never written to."""
+    rows = dict(session.execute(
+        select(CollectionVersion.name, CollectionVersion.version).where(CollectionVersion.name.in_(tables))).all())
+    return tuple(rows.get(table, 0) for table in tables)
+
+
+def _bump_flushed(session, flush_context):
+    tables = {obj.__table__.name for obj in session.new} | {obj.__table__.name for obj in session.deleted}
+    tables.update(obj.__table__.name for obj in session.dirty if session.is_modified(obj))
+    tables.discard(_TABLE)
+    if tables:
+        bump(session, *tables)
+
+
+event.listen(Session, 'after_flush', _bump_flushed)
@@ -0,0 +1,102 @@
+import asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.persistence.async_repository import AsyncSQLAlchemyRepository, async_unit_of_work
+from app.models.user import User
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+
+
+class AsyncHBnBFacade:
+    """Async version of HBnBFacade for the ASGI entry point.
+
+    Every method runs in its own async unit of work unless the caller
+    already opened one with unit_of_work(). CPU-bound password hashing is
+    pushed to a worker thread so it never blocks the event loop.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        self.user_repo = AsyncSQLAlchemyRepository(User)
+        self.place_repo = AsyncSQLAlchemyRepository(Place)
+        self.review_repo = AsyncSQLAlchemyRepository(Review)
+        self.amenity_repo = AsyncSQLAlchemyRepository(Amenity)
+
+    def unit_of_work(self):
+        return async_unit_of_work(self.sessionmaker)
+
+    def _reading(self):
+        return async_unit_of_work(self.sessionmaker, commit=False)
+
+    # Users. Users, amenities and places are created through HBnBFacade,
+    # which hashes passwords with the app's BCRYPT_LOG_ROUNDS.
+    async def get_user(self, user_id):
+        async with self._reading():
+            return await self.user_repo.get(user_id)
+
+    async def get_user_by_email(self, email):
+        async with self._reading():
+            return await self.user_repo.get_by_attribute('email', email)
+
+    async def get_users_page(self, limit=None, cursor=None):
+        async with self._reading():
+            return await self.user_repo.get_page(limit, cursor)
+
+    async def authenticate(self, email, password):
+        # Return the user when the credentials match, None otherwise.
+        # A hash made at another cost than the configured one is replaced.
+        user = await self.get_user_by_email(email)
+        if not user:
+            return None
+        stored = user.password
+        if not await asyncio.to_thread(user.verify_password, password):
+            return None
+        if user.password != stored:
+            async with self.unit_of_work():
+                await self.user_repo.update(user.id, {'password': user.password})
+        return user
+
+    # Amenities
+    async def get_amenity(self, amenity_id):
+        async with self._reading():
+            return await self.amenity_repo.get(amenity_id)
+
+    async def get_amenities_page(self, limit=None, cursor=None):
+        async with self._reading():
+            return await self.amenity_repo.get_page(limit, cursor)
+
+    async def get_amenities_version(self):
+        async with self._reading():
+            return await self.amenity_repo.version()
+
+    # Places
+    async def get_place(self, place_id):
+        async with self._reading():
+            return await self.place_repo.get(place_id)
+
+    async def get_places_page(self, limit=None, cursor=None):
+        async with self._reading():
+            return await self.place_repo.get_page(limit, cursor)
+
+    async def get_places_version(self):
+        async with self._reading():
+            return await self.place_repo.version()
+
+    async def place_exists(self, place_id):
+        async with self._reading():
+            return await self.place_repo.exists(place_id)
+
+    # Reviews. Review writes go through HBnBFacade, which maintains the places'
+    # rating aggregates and the one-review-per-user-and-place rule.
+    async def get_review(self, review_id):
+        async with self._reading():
+            return await self.review_repo.get(review_id)
+
+    async def get_reviews_page(self, limit=None, cursor=None):
+        async with self._reading():
+            return await self.review_repo.get_page(limit, cursor)
+
+    async def get_reviews_by_place(self, place_id, limit=None, cursor=None):
+        async with self._reading():
+            return await self.review_repo.get_page(limit, cursor, newest_first=True, place_id=place_id)
@@ -1,32 +1,110 @@
-from app.persistence.repository import SQLAlchemyRepository
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
+from app.persistence.repository import PlaceRepository, RevokedTokenRepository, SQLAlchemyRepository
+from app.persistence.spatial import MAX_RADIUS_KM
+from app.persistence.unit_of_work import transactional, unit_of_work
 from app.models.user import User
 from app.models.amenity import Amenity
 from app.models.place import Place
 from app.models.review import Review
 
 
+# Place relationship -> eager loader used when a request expands it: the owner
+# rides along in the places query as a JOIN, each collection is read for all
+# the loaded places at once with one IN query
+PLACE_LOADERS = {'owner': joinedload, 'amenities': selectinload, 'reviews': selectinload}
+
+
+def place_loaders(expand):
+    """Loader options eager-loading the given Place relationships."""
+    relationships = inspect(Place).relationships
+    return [PLACE_LOADERS[name](relationships[name].class_attribute) for name in expand]
+
+
 class HBnBFacade:
     def __init__(self):
         self.user_repo = SQLAlchemyRepository(User)
-        self.place_repo = SQLAlchemyRepository(Place)
+        self.place_repo = PlaceRepository()
         self.review_repo = SQLAlchemyRepository(Review)
         self.amenity_repo = SQLAlchemyRepository(Amenity)
+        self.revoked_token_repo = RevokedTokenRepository()
 
+    def unit_of_work(self):
+        # One transaction for several facade calls made by the same request
+        return unit_of_work()
+
+    def _create_many(self, repo, factory, items):
+        # Validate every item first, then insert the valid ones in one transaction.
+        # Returns one (obj, error) pair per item, in input order.
+        results = []
+        for item in items:
+            try:
+                results.append((factory(item), None))
+            except (TypeError, ValueError, KeyError) as e:
+                results.append((None, str(e)))
+        objs = [obj for obj, error in results if obj is not None]
+        if objs:
+            repo.add_many(objs)
+        return results
+
+    def _adjust_ratings(self, changes):
+        # Apply (place_id, rating, +1 or -1) review changes to the places' rating
+        # aggregates, with one UPDATE per place in the caller's transaction
+        deltas = {}
+        for place_id, rating, sign in changes:
+            place = deltas.setdefault(place_id, {'review_count': 0, 'rating_sum': 0})
+            place['review_count'] += sign
+            place['rating_sum'] += sign * rating
+            key = 'rating_{}'.format(rating)
+            place[key] = place.get(key, 0) + sign
+        for place_id, place_deltas in deltas.items():
+            self.place_repo.increment(place_id, place_deltas)
+
+    @transactional
     def create_user(self, user_data):
         user = User(**user_data)
         self.user_repo.add(user)
         return user
 
-    def get_user(self, user_id):
-        return self.user_repo.get(user_id)
+    def get_user(self, user_id, columns=None):
+        return self.user_repo.get(user_id, columns)
 
     def get_user_by_email(self, email):
-        return User.query.filter_by(email=email).first()
+        return self.user_repo.get_by_attribute('email', email)
+
+    @transactional
+    def authenticate(self, email, password):
+        # Return the user when the credentials match, None otherwise.
+        # A hash made at another cost than the configured one is replaced.
+        user = self.user_repo.get_by_attribute('email', email)
+        if not user:
+            return None
+        stored = user.password
+        if not user.verify_password(password):
+            return None
+        if user.password != stored:
+            self.user_repo.update(user.id, {'password': user.password})
+        return user
+
+    @transactional
+    def revoke_token(self, jti, expires_at):
+        # Revoking the same token twice, even concurrently, is a no-op
+        self.revoked_token_repo.revoke(jti, expires_at)
+
+    @transactional
+    def is_token_revoked(self, jti):
+        # Read on the primary: a lagging replica must not let a revoked token through
+        return self.revoked_token_repo.exists(jti)
 
     def get_all_users(self):
         return self.user_repo.get_all()
 
-    def updated_user(self, user_id, user_data):
+    def get_users_page(self, limit=None, cursor=None, columns=None):
+        return self.user_repo.get_page(limit, cursor, columns=columns)
+
+    @transactional
+    def update_user(self, user_id, user_data):
         # Fetch the user by their ID
         user = self.user_repo.get(user_id)
         if user:
@@ -34,20 +112,35 @@ class HBnBFacade:
             return user
         return None
 
+    @transactional
     def create_amenity(self, amenity_data):
         # Placeholder for logic to create an amenity
         amenity = Amenity(**amenity_data)
         self.amenity_repo.add(amenity)
         return amenity
 
-    def get_amenity(self, amenity_id):
+    @transactional
+    def create_amenities(self, amenities_data):
+        # Bulk version of create_amenity, one result per item
+        return self._create_many(self.amenity_repo, lambda data: Amenity(**data), amenities_data)
+
+    def get_amenity(self, amenity_id, columns=None):
         # Placeholder for logic to retrieve an amenity by ID
-        return self.amenity_repo.get(amenity_id)
+        return self.amenity_repo.get(amenity_id, columns)
 
     def get_all_amenities(self):
         # Placeholder for logic to retrieve all amenities
         return self.amenity_repo.get_all()
 
+    def get_amenities_page(self, limit=None, cursor=None, columns=None):
+        # Retrieve one keyset page of amenities and the cursor for the next one
+        return self.amenity_repo.get_page(limit, cursor, columns=columns)
+
+    def get_amenities_version(self):
+        # Changes whenever an amenity is added, updated or deleted
+        return self.amenity_repo.version()
+
+    @transactional
     def update_amenity(self, amenity_id, amenity_data):
         # Placeholder for logic to update an amenity
         amenity = self.amenity_repo.get(amenity_id)
@@ -57,73 +150,188 @@ class HBnBFacade:
         return None
 
 
+    @transactional
     def create_place(self, place_data):
     # Placeholder for logic to create a place, including validation for price, latitude, and longitude
         place = Place(**place_data)
         self.place_repo.add(place)
         return place
 
-    def get_place(self, place_id):
-        # Placeholder for logic to retrieve a place by ID, including associated owner and amenities
-        return self.place_repo.get(place_id)
+    @transactional
+    def create_places(self, places_data, owner_id):
+        # Bulk version of create_place, every place is owned by owner_id
+        def build(data):
+            # A copy: the caller's payload is left as it was
+            return Place(**dict(data, owner_id=owner_id))
+        return self._create_many(self.place_repo, build, places_data)
+
+    def get_place(self, place_id, columns=None, expand=()):
+        # Retrieve a place by ID, with the relationships named in expand eager-loaded
+        return self.place_repo.get(place_id, columns, place_loaders(expand))
+
+    def get_place_full(self, place_id, limit=None, cursor=None):
+        # A place with its owner and amenities, and a newest-first page of its reviews
+        # with their authors: (place, reviews, next_cursor), or None when the place
+        # does not exist. Three statements: place JOIN owner, the amenities IN query
+        # and the reviews JOIN authors.
+        place = self.place_repo.get(place_id, options=place_loaders(('owner', 'amenities')))
+        if place is None:
+            return None
+        reviews, next_cursor = self.review_repo.get_page(
+            limit, cursor, newest_first=True, options=[joinedload(Review.author)], place_id=place.id)
+        return place, reviews, next_cursor
 
     def get_all_places(self):
         # Placeholder for logic to retrieve all places
         return self.place_repo.get_all()
 
+    def get_places_page(self, limit=None, cursor=None, columns=None, expand=(), **filters):
+        # Retrieve one keyset page of places and the cursor for the next one.
+        # filters: sort, min_price, max_price, amenity_ids and owner_id;
+        # columns: the only Place attributes to load; expand: the relationships
+        # to eager-load, none by default
+        options = place_loaders(expand)
+        if not any(value is not None for value in filters.values()):
+            return self.place_repo.get_page(limit, cursor, columns=columns, options=options)
+        return self.place_repo.get_filtered_page(limit, cursor, columns=columns, options=options, **filters)
+
+    def iter_places(self, columns=None, expand=()):
+        # Every place, oldest first, loaded in batches as the caller iterates
+        return self.place_repo.iter_all(columns=columns, options=place_loaders(expand))
+
+    def get_places_near(self, latitude, longitude, radius_km, limit=None, columns=None, expand=()):
+        # Places within radius_km of the point, nearest first, as (place, distance_km) pairs
+        self._check_coordinates(latitude, longitude)
+        if not 0 < radius_km <= MAX_RADIUS_KM:
+            raise ValueError('radius_km must be greater than 0 and at most {}'.format(MAX_RADIUS_KM))
+        return self.place_repo.get_near(latitude, longitude, radius_km, limit, columns, place_loaders(expand))
+
+    def get_places_in_bbox(self, min_lat, min_lon, max_lat, max_lon, limit=None, columns=None, expand=()):
+        # Places inside the box, nearest to its center first, as (place, distance_km) pairs.
+        # min_lon > max_lon selects a box crossing the antimeridian.
+        self._check_coordinates(min_lat, min_lon)
+        self._check_coordinates(max_lat, max_lon)
+        if min_lat > max_lat:
+            raise ValueError('bbox min latitude is greater than its max latitude')
+        return self.place_repo.get_in_bbox(min_lat, min_lon, max_lat, max_lon, limit, columns,
+                                           place_loaders(expand))
+
+    def search_places(self, query, limit=None, cursor=None, columns=None, expand=()):
+        # Full-text search over titles, descriptions and review texts, best match first:
+        # ([(place, snippet)], next_cursor)
+        return self.place_repo.search(query, limit, cursor, columns, place_loaders(expand))
+
+    def _check_coordinates(self, latitude, longitude):
+        if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+            raise ValueError("Coordinates of latitude and longitude aren't correct")
+
+    def get_places_version(self, expand=()):
+        # Changes whenever a place is added, updated or deleted, and with expand
+        # whenever one of the expanded collections changes
+        repos = {'owner': self.user_repo, 'amenities': self.amenity_repo, 'reviews': self.review_repo}
+        return self.place_repo.version(*(repos[name] for name in expand))
+
+    @transactional
     def update_place(self, place_id, place_data):
         # Placeholder for logic to update a place
         place = self.place_repo.get(place_id)
         if place:
-            if 'title' in place_data:
-                place.title = place_data['title']
-            if 'description' in place_data:
-                place.description = place_data['description']
-            if 'price' in place_data:
-                place.price = place_data['price']
-            if 'latitude' in place_data:
-                place.latitude = place_data['latitude']
-            if 'longitude' in place_data:
-                place.longitude = place_data['longitude']
-            if 'owner_id' in place_data:
-                place.owner_id = place_data['owner_id']
-            self.place_repo.update(place, place_data)
+            changes = {key: place_data[key] for key in
+                       ('title', 'description', 'price', 'latitude', 'longitude', 'owner_id')
+                       if key in place_data}
+            self.place_repo.update(place_id, changes)
         return place
     
+    @transactional
     def create_review(self, review_data):
     # Placeholder for logic to create a review, including validation for user_id, place_id, and rating
         review = Review(**review_data)
-        self.review_repo.add(review)
+        try:
+            self.review_repo.add(review)
+        except IntegrityError:
+            # ux_reviews_user_id_place_id: one review per user and place
+            raise ValueError('You have already reviewed this place')
+        self._adjust_ratings([(review.place_id, review.rating, 1)])
         return review
 
-    def get_review(self, review_id):
+    @transactional
+    def create_reviews(self, reviews_data, current_user):
+        # Bulk version of create_review, applying the same rules as ReviewList.post
+        # with one query for the places and one for the existing (user, place) pairs
+        is_admin = current_user.get('is_admin', False)
+        place_ids = {data.get('place_id') for data in reviews_data}
+        user_ids = {data.get('user_id') for data in reviews_data}
+        places = {place.id: place for place in Place.query.filter(Place.id.in_(place_ids))}
+        reviewed = {(row.user_id, row.place_id) for row in
+                    Review.query.with_entities(Review.user_id, Review.place_id).filter(
+                        Review.user_id.in_(user_ids), Review.place_id.in_(place_ids))}
+
+        def build(data):
+            place = places.get(data.get('place_id'))
+            if not place:
+                raise ValueError('Place not found')
+            if not is_admin and place.owner_id == current_user['id']:
+                raise ValueError('You cannot review your own place')
+            if (data.get('user_id'), place.id) in reviewed:
+                raise ValueError('You have already reviewed this place')
+            reviewed.add((data.get('user_id'), place.id))
+            return Review(**data)
+        results = self._create_many(self.review_repo, build, reviews_data)
+        self._adjust_ratings([(review.place_id, review.rating, 1) for review, error in results if review])
+        return results
+
+    def get_review(self, review_id, columns=None):
         # Placeholder for logic to retrieve a review by ID
-        return self.review_repo.get(review_id)
+        return self.review_repo.get(review_id, columns)
 
     def get_all_reviews(self):
         # Placeholder for logic to retrieve all reviews
         return self.review_repo.get_all()
 
-    def get_reviews_by_place(self, place_id):
-        # Placeholder for logic to retrieve all reviews for a specific place
-        return self.review_repo.get(place_id)
+    def get_reviews_page(self, limit=None, cursor=None, columns=None):
+        # Retrieve one keyset page of reviews and the cursor for the next one
+        return self.review_repo.get_page(limit, cursor, columns=columns)
+
+    def iter_reviews(self, columns=None):
+        # Every review, oldest first, loaded in batches as the caller iterates
+        return self.review_repo.iter_all(columns=columns)
+
+    def get_reviews_by_place(self, place_id, limit=None, cursor=None, columns=None):
+        # Newest-first page of a place's reviews: one range scan of ix_reviews_place_id_created_at
+        return self.review_repo.get_page(limit, cursor, newest_first=True, columns=columns, place_id=place_id)
+
+    def place_exists(self, place_id):
+        return self.place_repo.exists(place_id)
     
     def get_review_by_user_and_place(self, user_id, place_id):
         return Review.query.filter_by(user_id=user_id, place_id=place_id).first()
 
+    @transactional
     def update_review(self, review_id, review_data):
         # Placeholder for logic to update a review
 
         review = self.get_review(review_id)
         if not review:
             raise ValueError("Review not found")
+        if 'rating' in review_data and not 1 <= review_data['rating'] <= 5:
+            raise ValueError("Rating must be between 1 and 5")
 
-        self.review_repo.update(review_id, review_data)
-        return self.get_review(review_id)
+        before = (review.place_id, review.rating)
+        try:
+            self.review_repo.update(review_id, review_data)
+        except IntegrityError:
+            # A new user_id or place_id may collide with ux_reviews_user_id_place_id
+            raise ValueError('This user has already reviewed this place')
+        review = self.get_review(review_id)
+        if (review.place_id, review.rating) != before:
+            self._adjust_ratings([before + (-1,), (review.place_id, review.rating, 1)])
+        return review
 
+    @transactional
     def delete_review(self, review_id):
         # Placeholder for logic to delete a review
         review = self.review_repo.get(review_id)
         if review:
+            self._adjust_ratings([(review.place_id, review.rating, -1)])
             self.review_repo.delete(review_id)
             return {'message': 'Review deleted sucessfully'}
@@ -0,0 +1,19 @@
+"""ASGI entry point, e.g. `HBNB_CONFIG=production uvicorn asgi:app --workers 1`.
+
+Serves the same routes as run.py; see app/api/asgi.py for which ones run
+natively on the event loop.
+"""
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.api.asgi import async_database_url, create_asgi_app
+from app.models import db
+from app.persistence.sqlite import init_sqlite_profile
+from app.services.async_facade import AsyncHBnBFacade
+from run import app as flask_app
+
+with flask_app.app_context():
+    database_url = flask_app.config.get('ASYNC_DATABASE_URI') or async_database_url(db.engine.url)
+
+engine = create_async_engine(database_url)
+init_sqlite_profile(engine.sync_engine, flask_app.config.get('SQLITE_PRAGMAS'))
+
+app = create_asgi_app(flask_app, AsyncHBnBFacade(engine))
@@ -0,0 +1,90 @@
+"""Radius and bounding-box search over 1M synthetic places.
+
+Run from part3/: python -m benchmarks.bench_geo_search [--places 1000000] [--queries 200]
+
+Places are spread uniformly over the land-ish band -60..70 latitude. Each
+query is timed through HBnBFacade (R*Tree lookup, exact distance filter,
+loading the nearest places); the plain-column scan is timed once per
+query shape for comparison.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+import uuid
+
+from flask import Flask
+from app import db
+from app.persistence import migrations
+from app.services.facade import HBnBFacade
+
+
+def seed(path, count):
+    conn = sqlite3.connect(path)
+    rows = ((str(uuid.uuid4()), 'Place {}'.format(n), 'Synthetic', random.randrange(2000, 50000),
+             random.uniform(-60, 70), random.uniform(-180, 180), 'bench-owner')
+            for n in range(count))
+    conn.executemany(
+        "INSERT INTO places (id, _title, _description, price_cents, latitude, longitude, owner_id, "
+        "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)", rows)
+    conn.commit()
+    conn.close()
+
+
+def percentiles(samples):
+    samples.sort()
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.99) - 1] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--places', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'bench.db')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + path
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        migrations.upgrade(db.engine)
+        started = time.perf_counter()
+        seed(path, args.places)
+        print('Seeded {} places in {:.1f}s'.format(args.places, time.perf_counter() - started))
+
+        facade = HBnBFacade()
+        shapes = {
+            'near, 5 km': lambda lat, lon: facade.get_places_near(lat, lon, 5, 50),
+            'near, 50 km': lambda lat, lon: facade.get_places_near(lat, lon, 50, 50),
+            'bbox, 1 degree': lambda lat, lon: facade.get_places_in_bbox(lat, lon, lat + 1, lon + 1, 50),
+        }
+        print('{:<16} {:>8} {:>8} {:>10} {:>12}'.format('query', 'p50 ms', 'p99 ms', 'results', 'scan ms'))
+        for name, query in shapes.items():
+            samples, results = [], 0
+            for _ in range(args.queries):
+                lat, lon = random.uniform(-55, 65), random.uniform(-175, 175)
+                started = time.perf_counter()
+                results += len(query(lat, lon))
+                samples.append(time.perf_counter() - started)
+                db.session.remove()
+            started = time.perf_counter()
+            with db.engine.connect() as conn:
+                conn.exec_driver_sql(
+                    "SELECT id FROM places WHERE latitude BETWEEN 10 AND 11 AND longitude BETWEEN 10 AND 11").all()
+            scan = (time.perf_counter() - started) * 1000
+            p50, p99 = percentiles(samples)
+            print('{:<16} {:>8.2f} {:>8.2f} {:>10.1f} {:>12.1f}'.format(
+                name, p50, p99, results / args.queries, scan))
+        db.engine.dispose()
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
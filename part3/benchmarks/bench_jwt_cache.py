@@ -0,0 +1,62 @@
+"""Authenticated GET latency with and without the verified-claims cache.
+
+Run from part3/: python -m benchmarks.bench_jwt_cache [--requests 5000]
+
+Times GET /api/v1/auth/protected (token handling only) and a place
+detail through the Flask test client, with JWT_CLAIMS_CACHE_SIZE 0
+(every request verifies the HS512 token) and with the default cache.
+"""
+import argparse
+import statistics
+import time
+
+from flask_jwt_extended import create_access_token
+from app import db
+from app.api import create_app
+from app.models.place import Place
+from app.models.user import User
+from jwt_cache import DEFAULT_CLAIMS_CACHE_SIZE, CachingJWTManager
+
+
+def measure(cache_size, requests):
+    app = create_app()
+    app.config.update(TESTING=True, SQLALCHEMY_DATABASE_URI='sqlite://', BCRYPT_LOG_ROUNDS=4,
+                      JWT_SECRET_KEY='hbnb-benchmark-secret-' * 4, JWT_ALGORITHM='HS512',
+                      JWT_DECODE_ALGORITHMS=['HS512'], JWT_VERIFY_SUB=False, JWT_CLAIMS_CACHE_SIZE=cache_size)
+    db.init_app(app)
+    CachingJWTManager(app)
+    results = {}
+    with app.app_context():
+        db.create_all()
+        owner = User('Bench', 'User', 'bench@example.com', password='password')
+        place = Place('Bench place', 'Synthetic', 100.0, 10.0, 10.0, owner.id)
+        db.session.add_all([owner, place])
+        db.session.commit()
+        client = app.test_client()
+        token = create_access_token(identity={'id': owner.id, 'is_admin': False})
+        headers = {'Authorization': 'Bearer ' + token}
+        for name, url in (('protected', '/api/v1/auth/protected'), ('place detail', '/api/v1/places/' + place.id)):
+            samples = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                assert client.get(url, headers=headers).status_code == 200
+                samples.append(time.perf_counter() - started)
+            samples.sort()
+            results[name] = (statistics.median(samples) * 1e6, samples[int(len(samples) * 0.99) - 1] * 1e6)
+        db.session.remove()
+        db.drop_all()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+    print('{:<14} {:<10} {:>8} {:>8}'.format('route', 'cache', 'p50 us', 'p99 us'))
+    for label, size in (('off', 0), ('on', DEFAULT_CLAIMS_CACHE_SIZE)):
+        for name, (p50, p99) in measure(size, args.requests).items():
+            print('{:<14} {:<10} {:>8.0f} {:>8.0f}'.format(name, label, p50, p99))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Login throughput as a function of the bcrypt cost (BCRYPT_LOG_ROUNDS).
+
+Run from part3/: python -m benchmarks.bench_login_cost [--costs 4 8 10 12 13] [--seconds 3]
+
+Each cost is measured through POST /api/v1/auth/login on an in-memory
+database, single-threaded: the reported rate is per core.
+"""
+import argparse
+import time
+
+from flask_jwt_extended import JWTManager
+from app import db
+from app.api import create_app
+from app.models.user import User
+
+
+def measure(cost, seconds):
+    app = create_app()
+    app.config.update(TESTING=True, SQLALCHEMY_DATABASE_URI='sqlite://', BCRYPT_LOG_ROUNDS=cost,
+                      JWT_SECRET_KEY='hbnb-benchmark-secret-key-long-enough', JWT_VERIFY_SUB=False)
+    db.init_app(app)
+    JWTManager(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User('Bench', 'User', 'bench@example.com', password='password'))
+        db.session.commit()
+        client = app.test_client()
+        credentials = {'email': 'bench@example.com', 'password': 'password'}
+        logins = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < seconds:
+            assert client.post('/api/v1/auth/login', json=credentials).status_code == 200
+            logins += 1
+        elapsed = time.perf_counter() - started
+        db.session.remove()
+        db.drop_all()
+    return logins / elapsed, elapsed / logins * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--costs', type=int, nargs='+', default=[4, 8, 10, 12, 13])
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+    print('{:>5} {:>12} {:>10}'.format('cost', 'logins/s', 'ms/login'))
+    for cost in args.costs:
+        rate, latency = measure(cost, args.seconds)
+        print('{:>5} {:>12.1f} {:>10.2f}'.format(cost, rate, latency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""List-endpoint throughput with the stdlib encoder and with the compiled serializers.
+
+Run from part3/: python -m benchmarks.bench_serializers [--places 2000] [--seconds 3]
+
+"before" builds each place dict by hand and encodes it with json, as the
+handlers and Flask-RESTX's default representation did; "after" uses
+serializers.PLACE and the orjson representation. Both are timed on
+their own (100 places already loaded) and through GET /api/v1/places/.
+"""
+import argparse
+import json
+import time
+
+from flask_restx.representations import output_json as restx_output_json
+from app import db
+from app.api import create_app
+from app.api.v1.places import api as places_ns
+from app.api.v1.serializers import PLACE, dumps, output_json
+from app.models.place import Place
+from app.models.user import User
+
+
+def place_dict(place):
+    return {
+        "id": place.id,
+        "title": place.title,
+        "description": place.description,
+        "price": place.price,
+        "latitude": place.latitude,
+        "longitude": place.longitude,
+        "owner_id": place.owner_id,
+        "review_count": place.review_count,
+        "rating_sum": place.rating_sum,
+        "average_rating": place.average_rating,
+        "rating_histogram": place.rating_histogram
+    }
+
+
+def rate(fn, seconds):
+    count = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        fn()
+        count += 1
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--places', type=int, default=2000)
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+
+    app = create_app()
+    app.config.update(TESTING=True, SQLALCHEMY_DATABASE_URI='sqlite://', BCRYPT_LOG_ROUNDS=4)
+    db.init_app(app)
+    api = places_ns.apis[0]
+    with app.app_context():
+        db.create_all()
+        owner = User('Bench', 'User', 'bench@example.com', password='password')
+        db.session.add(owner)
+        db.session.add_all(Place('Place {}'.format(n), 'A synthetic place to stay ' * 4, 80.0 + n % 50,
+                                 10.0, 20.0, owner.id) for n in range(args.places))
+        db.session.commit()
+        places = db.session.query(Place).limit(100).all()
+        client = app.test_client()
+
+        print('{:<28} {:>12} {:>12}'.format('', 'before /s', 'after /s'))
+        before = rate(lambda: json.dumps([place_dict(place) for place in places]), args.seconds)
+        after = rate(lambda: dumps(PLACE.dump_many(places)), args.seconds)
+        print('{:<28} {:>12.0f} {:>12.0f}'.format('serialize 100 places', before, after))
+
+        results = []
+        for representation in (restx_output_json, output_json):
+            api.representations['application/json'] = representation
+            results.append(rate(lambda: client.get('/api/v1/places/?limit=100'), args.seconds))
+        print('{:<28} {:>12.0f} {:>12.0f}'.format('GET /places/?limit=100', *results))
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Read throughput while a writer is busy, with and without the SQLite profile.
+
+Run from part3/: python -m benchmarks.bench_sqlite_concurrency [--seconds 5] [--readers 4]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+from config import ProductionConfig
+from app.persistence.sqlite import apply_pragmas
+
+ROWS = 50_000
+
+
+def connect(path, pragmas):
+    conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+    apply_pragmas(conn, pragmas)
+    return conn
+
+
+def seed(path, pragmas):
+    conn = connect(path, pragmas)
+    conn.execute("CREATE TABLE reviews (id TEXT PRIMARY KEY, place_id TEXT, text TEXT, rating INTEGER)")
+    conn.execute("CREATE INDEX ix_reviews_place_id ON reviews (place_id)")
+    conn.executemany("INSERT INTO reviews VALUES (?, ?, ?, ?)",
+                     ((str(uuid.uuid4()), 'place-{}'.format(n % 1000), 'x' * 200, n % 5 + 1)
+                      for n in range(ROWS)))
+    conn.commit()
+    conn.close()
+
+
+def run(pragmas, seconds, readers):
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'bench.db')
+    seed(path, pragmas)
+    stop = threading.Event()
+    counts = {'reads': 0, 'read_errors': 0, 'writes': 0}
+    lock = threading.Lock()
+
+    def writer():
+        conn = connect(path, pragmas)
+        while not stop.is_set():
+            conn.execute("INSERT INTO reviews VALUES (?, ?, ?, ?)",
+                         (str(uuid.uuid4()), 'place-{}'.format(random.randrange(1000)), 'y' * 200, 3))
+            conn.commit()
+            with lock:
+                counts['writes'] += 1
+
+    def reader():
+        conn = connect(path, pragmas)
+        reads = errors = 0
+        while not stop.is_set():
+            try:
+                conn.execute("SELECT id, rating FROM reviews WHERE place_id = ?",
+                             ('place-{}'.format(random.randrange(1000)),)).fetchall()
+                reads += 1
+            except sqlite3.OperationalError:
+                errors += 1
+        with lock:
+            counts['reads'] += reads
+            counts['read_errors'] += errors
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+    return {key: value / seconds for key, value in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=4)
+    args = parser.parse_args()
+    print('{:<12} {:>12} {:>14} {:>12}'.format('profile', 'reads/s', 'read errors/s', 'writes/s'))
+    for label, pragmas in (('default', {}), ('production', ProductionConfig.SQLITE_PRAGMAS)):
+        result = run(pragmas, args.seconds, args.readers)
+        print('{:<12} {:>12.0f} {:>14.1f} {:>12.0f}'.format(
+            label, result['reads'], result['read_errors'], result['writes']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Peak memory and time to first byte of a whole-collection response.
+
+Run from part3/: python -m benchmarks.bench_streaming [--reviews 20000 100000]
+
+"list" loads every review, serializes the list and encodes one body, as
+a non-streamed response of the whole table would; "stream" reads
+GET /api/v1/reviews/?stream=true chunk by chunk. Peak memory is the
+Python heap measured by tracemalloc.
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from app import db
+from app.api import create_app
+from app.api.v1.serializers import REVIEW, dumps
+from app.services.facade import HBnBFacade
+
+
+def seed(path, count):
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO reviews (id, text, rating, place_id, user_id, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)",
+        ((str(uuid.uuid4()), 'A synthetic review of a synthetic place ' * 3, 1 + n % 5,
+          str(uuid.uuid4()), str(uuid.uuid4())) for n in range(count)))
+    conn.commit()
+    conn.close()
+
+
+def measure(run):
+    tracemalloc.start()
+    started = time.perf_counter()
+    first_byte, size = run(started)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    db.session.remove()
+    return first_byte * 1000, elapsed * 1000, peak / 2 ** 20, size / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--reviews', type=int, nargs='+', default=[20000, 100000])
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'bench.db')
+    app = create_app()
+    app.config.update(SQLALCHEMY_DATABASE_URI='sqlite:///' + path)
+    db.init_app(app)
+    facade = HBnBFacade()
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+
+        def whole_list(started):
+            body = dumps(REVIEW.dump_many(facade.review_repo.get_all()))
+            return time.perf_counter() - started, len(body)
+
+        def stream(started):
+            response = client.get('/api/v1/reviews/?stream=true', buffered=False)
+            chunks = iter(response.response)
+            size = len(next(chunks))
+            first_byte = time.perf_counter() - started
+            for chunk in chunks:
+                size += len(chunk)
+            response.close()
+            return first_byte, size
+
+        print('{:>8} {:<8} {:>8} {:>10} {:>10} {:>9}'.format('reviews', 'mode', 'TTFB ms', 'total ms',
+                                                            'peak MiB', 'body MiB'))
+        seeded = 0
+        for count in sorted(args.reviews):
+            seed(path, count - seeded)
+            seeded = count
+            for mode, run in (('list', whole_list), ('stream', stream)):
+                print('{:>8} {:<8} {:>8.0f} {:>10.0f} {:>10.1f} {:>9.1f}'.format(count, mode, *measure(run)))
+        db.engine.dispose()
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Load test: many concurrent slow clients against the WSGI and ASGI servers.
+
+Start both servers on the same database, then point this script at them:
+
+    gunicorn -w 1 --threads 16 -b 127.0.0.1:8000 run:app
+    uvicorn asgi:app --workers 1 --port 8001
+    python -m benchmarks.load_asgi_vs_wsgi http://127.0.0.1:8000 http://127.0.0.1:8001
+
+Each client trickles its request line and headers over --slowness seconds
+before waiting for the response, like a client on a bad mobile link, and
+then repeats. Reported: completed requests per second and latency
+percentiles measured from the last byte sent.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def slow_client(host, port, path, slowness, deadline, latencies, failures):
+    request = 'GET {} HTTP/1.1\r\nHost: {}\r\nConnection: close\r\n\r\n'.format(path, host).encode()
+    chunks = [request[i:i + 8] for i in range(0, len(request), 8)]
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            for chunk in chunks:
+                writer.write(chunk)
+                await writer.drain()
+                await asyncio.sleep(slowness / len(chunks))
+            sent = time.monotonic()
+            status = await reader.readline()
+            await reader.read()
+            writer.close()
+            if b' 200 ' not in status:
+                failures.append(status)
+                continue
+            latencies.append(time.monotonic() - sent)
+        except OSError as e:
+            failures.append(e)
+            await asyncio.sleep(0.1)
+
+
+async def run(url, clients, seconds, slowness):
+    parts = urlsplit(url)
+    path = (parts.path or '/api/v1/amenities/') + ('?' + parts.query if parts.query else '')
+    latencies, failures = [], []
+    deadline = time.monotonic() + seconds
+    await asyncio.gather(*(slow_client(parts.hostname, parts.port or 80, path, slowness,
+                                       deadline, latencies, failures) for _ in range(clients)))
+    return latencies, failures
+
+
+def report(url, latencies, failures, seconds):
+    if not latencies:
+        print('{:<40} no successful request, {} failures'.format(url, len(failures)))
+        return
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if len(latencies) >= 100 else latencies[-1]
+    print('{:<40} {:>9.1f} {:>10.1f} {:>10.1f} {:>9}'.format(
+        url, len(latencies) / seconds, statistics.median(latencies) * 1000, p99 * 1000, len(failures)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('urls', nargs='+', help='Base URL of each server, optionally with a path')
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--slowness', type=float, default=2.0, help='Seconds spent sending each request')
+    args = parser.parse_args()
+    print('{:<40} {:>9} {:>10} {:>10} {:>9}'.format('server', 'req/s', 'p50 ms', 'p99 ms', 'failures'))
+    for url in args.urls:
+        latencies, failures = asyncio.run(run(url, args.clients, args.seconds, args.slowness))
+        report(url, latencies, failures, args.seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -17,8 +17,20 @@ class Config:
     DEBUG = False
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'John_Hopkins')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+    # Exchanged at /api/v1/auth/refresh for new access tokens until revoked at /api/v1/auth/logout
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     JWT_ALGORITHM = 'HS512'
     JWT_DECODE_ALGORITHMS = ['HS512']
+    # Verified tokens whose claims are reused until they expire; 0 verifies every request
+    JWT_CLAIMS_CACHE_SIZE = int(os.getenv('JWT_CLAIMS_CACHE_SIZE', 10000))
+    # bcrypt work factor of new password hashes; existing ones are rehashed on login
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    # PRAGMA name -> value, applied to every new SQLite connection
+    SQLITE_PRAGMAS = {}
+    # Model name -> {'maxsize': entries, 'ttl': seconds}; empty disables the entity cache
+    ENTITY_CACHE = {}
+    # {'workers': processes, 'max_queue': waiting jobs} for bcrypt; None hashes on the request thread
+    PASSWORD_HASHING = None
 
 
 class DevelopmentConfig(Config):
@@ -27,8 +39,58 @@ class DevelopmentConfig(Config):
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
 
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # The minimum cost: hashing stays in the microseconds in tests and benchmarks
+    BCRYPT_LOG_ROUNDS = 4
+
+
+class ProductionConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///production.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # WAL lets readers run alongside the single writer; NORMAL only fsyncs at checkpoints
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -65536)),  # negative: KiB, i.e. 64 MiB
+        'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 268435456)),  # 256 MiB
+        'temp_store': os.getenv('SQLITE_TEMP_STORE', 'MEMORY'),
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),  # milliseconds
+    }
+    # GET handlers read through a separate pool of read-only connections
+    SQLALCHEMY_READ_ONLY_POOL = True
+    SQLALCHEMY_READ_DATABASE_URI = os.getenv('READ_DATABASE_URL')
+    SQLALCHEMY_READ_ENGINE_OPTIONS = {'pool_size': int(os.getenv('SQLITE_READ_POOL_SIZE', 8))}
+    ENTITY_CACHE = {
+        'Place': {'maxsize': 10000, 'ttl': 60},
+        'User': {'maxsize': 10000, 'ttl': 60},
+        'Review': {'maxsize': 10000, 'ttl': 60},
+        'Amenity': {'maxsize': 1000, 'ttl': 300},
+    }
+    # One bcrypt process per core; logins beyond the queue get a 503 with Retry-After
+    PASSWORD_HASHING = {
+        'workers': int(os.getenv('PASSWORD_HASH_WORKERS', 0)) or None,
+        'max_queue': int(os.getenv('PASSWORD_HASH_MAX_QUEUE', 32)),
+    }
+
+
 config = {
     'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
     'default': DevelopmentConfig,
     'admin': DefaultAdmin
 }
+
+
+def get_config(name=None):
+    """Config class for `name`, by default the HBNB_CONFIG environment variable.
+
+    run.py, asgi.py and manage.py load it, e.g. HBNB_CONFIG=production.
+    """
+    name = name or os.getenv('HBNB_CONFIG', 'default')
+    if name not in config or name == 'admin':
+        raise ValueError('Unknown HBNB_CONFIG {!r}, expected one of development, testing, production'.format(name))
+    return config[name]
@@ -1,8 +1,8 @@
 from flask_bcrypt import Bcrypt
-from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
+from jwt_cache import CachingJWTManager
 
 # Initialize Flask extensions
 db = SQLAlchemy()
 bcrypt = Bcrypt()
-jwt = JWTManager()
+jwt = CachingJWTManager()
@@ -0,0 +1,113 @@
+"""JWTManager that remembers the claims of tokens it has verified.
+
+A client sends the same access token with every request until it
+expires, and verifying its HS512 signature and claims each time is
+repeated work. The claims of a verified token are kept in a bounded LRU
+keyed by a SHA-256 digest of the decode key and the token, until the
+token's exp plus JWT_DECODE_LEEWAY; a miss, or a token without exp,
+goes through the full verification. JWT_CLAIMS_CACHE_SIZE sets the
+number of entries, 0 disables the cache.
+
+flask-jwt-extended has no public hook around decoding, so the manager
+overrides the private JWTManager._decode_jwt_from_config; requirements.txt
+pins the release line it was written against, and the cache turns itself
+off with a warning if the method's signature changes.
+
+Blocklist and user-lookup callbacks run after decoding, so they still
+see every request.
+"""
+import hashlib
+import inspect
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from datetime import timedelta
+from flask_jwt_extended import JWTManager
+from flask_jwt_extended.config import config
+
+DEFAULT_CLAIMS_CACHE_SIZE = 10000
+
+
+def supports_claims_cache():
+    """Tell whether JWTManager still decodes through the method CachingJWTManager overrides."""
+    method = getattr(JWTManager, '_decode_jwt_from_config', None)
+    if method is None:
+        return False
+    return list(inspect.signature(method).parameters) == ['self', 'encoded_token', 'csrf_value', 'allow_expired']
+
+
+class ClaimsCache:
+    """Thread-safe LRU of token digest -> claims, each entry expiring at its exp."""
+
+    def __init__(self, maxsize=DEFAULT_CLAIMS_CACHE_SIZE, clock=time.time):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, claims, expires):
+        with self._lock:
+            self._data[key] = (expires, claims)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._data), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+class CachingJWTManager(JWTManager):
+
+    def __init__(self, app=None, add_context_processor=False):
+        self.claims_cache = ClaimsCache()
+        super().__init__(app, add_context_processor)
+
+    def init_app(self, app, add_context_processor=False):
+        super().init_app(app, add_context_processor)
+        size = app.config.get('JWT_CLAIMS_CACHE_SIZE', DEFAULT_CLAIMS_CACHE_SIZE)
+        if size and not supports_claims_cache():
+            warnings.warn('This flask-jwt-extended release decodes tokens differently, '
+                          'the JWT claims cache is disabled', RuntimeWarning)
+            size = 0
+        self.claims_cache = ClaimsCache(size)
+
+    def _decode_jwt_from_config(self, encoded_token, *args, **kwargs):
+        if not self.claims_cache.maxsize:
+            return super()._decode_jwt_from_config(encoded_token, *args, **kwargs)
+        return self._decode_cached(encoded_token, *args, **kwargs)
+
+    def _decode_cached(self, encoded_token, csrf_value=None, allow_expired=False):
+        if csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        key = hashlib.sha256('{}.{}'.format(config.decode_key, encoded_token).encode('utf-8')).digest()
+        claims = self.claims_cache.get(key)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token)
+            if 'exp' in claims:
+                # Verification accepts the token until exp + leeway, and so does the cache
+                leeway = config.leeway
+                if isinstance(leeway, timedelta):
+                    leeway = leeway.total_seconds()
+                self.claims_cache.set(key, claims, claims['exp'] + leeway)
+        # A copy, so that a handler changing its claims leaves the cached ones intact
+        return dict(claims)
@@ -0,0 +1,104 @@
+"""Maintenance commands for an existing HBnB database.
+
+    python manage.py migrate [--target VERSION] [--batch-size N]
+    python manage.py version
+    python manage.py dedupe-reviews [--batch-size N]
+    python manage.py repair-ratings [--batch-size N]
+    python manage.py rebuild-spatial-index [--batch-size N]
+    python manage.py rebuild-search-index [--batch-size N]
+    python manage.py purge-revoked-tokens
+
+HBNB_CONFIG picks the database, e.g. HBNB_CONFIG=production.
+"""
+import argparse
+import sys
+from datetime import datetime
+from sqlalchemy import delete, inspect
+from app import create_app
+from app.models import db
+from app.models.collection_version import CollectionVersion
+from app.models.revoked_token import RevokedToken
+from app.persistence import cache as entity_cache, migrations, versions
+from app.persistence.aggregates import recompute_place_ratings
+from app.persistence.search import rebuild_search_index
+from app.persistence.spatial import rebuild_rtree
+from app.persistence.sqlite import init_sqlite_profile
+from config import get_config
+
+
+def rewritten(*tables):
+    """Record that tables were rewritten through the raw engine, outside the ORM.
+
+    Bumps their collection versions, so list ETags change, and drops the
+    entities this process cached. A running server's entity caches are in
+    its own memory: their entries expire after the configured ttl.
+    """
+    if inspect(db.engine).has_table(CollectionVersion.__tablename__):
+        versions.bump(db.session, *tables)
+        db.session.commit()
+    entity_cache.clear()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='HBnB maintenance commands')
+    commands = parser.add_subparsers(dest='command', required=True)
+    migrate = commands.add_parser('migrate', help='Apply pending schema migrations')
+    migrate.add_argument('--target', type=int, help='Stop at this schema version')
+    migrate.add_argument('--batch-size', type=int, default=migrations.DEFAULT_BATCH_SIZE,
+                         help='Rows rewritten per transaction')
+    commands.add_parser('version', help='Print the current schema version')
+    dedupe = commands.add_parser('dedupe-reviews',
+                                 help='Delete all but the latest review of each user and place, before migrate')
+    dedupe.add_argument('--batch-size', type=int, default=migrations.DEFAULT_BATCH_SIZE,
+                        help='Reviews deleted per transaction')
+    repair = commands.add_parser('repair-ratings', help="Recompute every place's rating aggregates")
+    repair.add_argument('--batch-size', type=int, default=migrations.DEFAULT_BATCH_SIZE,
+                        help='Places recomputed per transaction')
+    rebuild = commands.add_parser('rebuild-spatial-index', help='Refill places_rtree, e.g. after a VACUUM')
+    rebuild.add_argument('--batch-size', type=int, default=migrations.DEFAULT_BATCH_SIZE,
+                         help='Places indexed per transaction')
+    reindex = commands.add_parser('rebuild-search-index', help='Refill the full-text index, e.g. after a VACUUM')
+    reindex.add_argument('--batch-size', type=int, default=migrations.DEFAULT_BATCH_SIZE,
+                         help='Places or reviews indexed per transaction')
+    commands.add_parser('purge-revoked-tokens', help='Forget revoked refresh tokens that have expired')
+    args = parser.parse_args(argv)
+
+    app = create_app(get_config())
+    with app.app_context():
+        init_sqlite_profile(db.engine, app.config.get('SQLITE_PRAGMAS'))
+        if args.command == 'dedupe-reviews':
+            for user_id, place_id, count in migrations.duplicate_reviews(db.engine):
+                print('User {} has {} reviews of place {}, keeping the latest'.format(user_id, count, place_id))
+            count = migrations.dedupe_reviews(db.engine, args.batch_size)
+            rewritten('reviews')
+            print('Deleted {} duplicate reviews; run repair-ratings if the schema is past version 1'.format(count))
+            return
+        if args.command == 'repair-ratings':
+            count = recompute_place_ratings(db.engine, args.batch_size)
+            rewritten('places')
+            print('Recomputed the ratings of {} places'.format(count))
+            return
+        if args.command == 'rebuild-spatial-index':
+            count = rebuild_rtree(db.engine, args.batch_size)
+            print('Indexed {} places'.format(count))
+            return
+        if args.command == 'rebuild-search-index':
+            count = rebuild_search_index(db.engine, args.batch_size)
+            print('Indexed {} places and reviews'.format(count))
+            return
+        if args.command == 'purge-revoked-tokens':
+            with db.engine.begin() as conn:
+                count = conn.execute(delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow())).rowcount
+            print('Purged {} expired revoked tokens'.format(count))
+            return
+        if args.command == 'migrate':
+            try:
+                applied = migrations.upgrade(db.engine, args.target, args.batch_size)
+            except migrations.MigrationError as e:
+                sys.exit('Migration failed: {}'.format(e))
+            print('Applied migrations: {}'.format(applied or 'none'))
+        print('Schema version: {}'.format(migrations.current_version(db.engine)))
+
+
+if __name__ == '__main__':
+    main()
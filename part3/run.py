@@ -1,9 +1,19 @@
 from app import create_app
-from app.models import db
+from app.models import db, hashing
+from app.persistence import cache as entity_cache, migrations
+from app.persistence.routing import read_replica
+from app.persistence.sqlite import init_sqlite_profile
+from config import get_config
 
-app = create_app()
+# HBNB_CONFIG=production selects the SQLite profile, read pool, caches and hashing pool
+app = create_app(get_config())
 
-with app.app_context(): 
+with app.app_context():
+    init_sqlite_profile(db.engine, app.config.get('SQLITE_PRAGMAS'))
     db.create_all()
+    migrations.upgrade(db.engine)
+    read_replica.init_app(app, db.engine)
+    entity_cache.configure(app.config.get('ENTITY_CACHE'))
+    hashing.configure(app.config.get('PASSWORD_HASHING'))
 if __name__ == '__main__':
-    app.run(debug=True)
+    app.run(debug=app.config['DEBUG'])
@@ -0,0 +1,50 @@
+import unittest
+from flask_jwt_extended import create_access_token
+from app import db
+from app.persistence.instrumentation import QueryCounter
+from app.api import create_app
+from jwt_cache import CachingJWTManager
+
+
+class ApiTestCase(unittest.TestCase):
+    """Run the API against a fresh in-memory SQLite database."""
+
+    def setUp(self):
+        self.app = create_app()
+        self.app.config.update(
+            TESTING=True,
+            SQLALCHEMY_DATABASE_URI='sqlite://',
+            JWT_SECRET_KEY='hbnb-test-secret-key-long-enough-for-hs256',
+            JWT_VERIFY_SUB=False,
+            BCRYPT_LOG_ROUNDS=4
+        )
+        self.configure()
+        db.init_app(self.app)
+        self.jwt = CachingJWTManager(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+    def configure(self):
+        """Hook for test cases that need extra configuration."""
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def query_plans(self, call):
+        """Run call and return the EXPLAIN QUERY PLAN details of each SELECT it issued."""
+        with QueryCounter() as counter:
+            call()
+        plans = []
+        for statement, parameters in zip(counter.statements, counter.parameters):
+            if statement.lstrip().upper().startswith('SELECT'):
+                rows = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)
+                plans.append(' '.join(row[-1] for row in rows))
+        return plans
+
+    def auth_headers(self, user_id='admin', is_admin=True):
+        token = create_access_token(identity={'id': user_id, 'is_admin': is_admin})
+        return {'Authorization': 'Bearer {}'.format(token)}
@@ -0,0 +1,71 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from sqlalchemy.ext.asyncio import create_async_engine
+from app import db
+from app.api.asgi import async_database_url, create_asgi_app
+from app.models.amenity import Amenity
+from app.services.async_facade import AsyncHBnBFacade
+from tests.base import ApiTestCase
+
+
+class TestAsgiApp(ApiTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        super().setUp()
+
+    def configure(self):
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(self.directory, 'hbnb.db')
+
+    def tearDown(self):
+        super().tearDown()
+        shutil.rmtree(self.directory)
+
+    def call(self, method, path, query=b'', body=b''):
+        engine = create_async_engine(async_database_url(db.engine.url))
+        asgi = create_asgi_app(self.app, AsyncHBnBFacade(engine))
+        scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query,
+                 'headers': [(b'host', b'testserver')], 'scheme': 'http', 'http_version': '1.1'}
+        sent = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async def send(message):
+            sent.append(message)
+
+        async def run():
+            await asgi(scope, receive, send)
+            await engine.dispose()
+        asyncio.run(run())
+        headers = {key.decode(): value.decode() for key, value in sent[0].get('headers', [])}
+        return sent[0]['status'], headers, json.loads(b''.join(m.get('body', b'') for m in sent[1:]))
+
+    def test_native_list_matches_flask(self):
+        db.session.add_all([Amenity('Wifi'), Amenity('Pool'), Amenity('Gym')])
+        db.session.commit()
+        status, headers, body = self.call('GET', '/api/v1/amenities/', b'limit=2')
+        flask_response = self.client.get('/api/v1/amenities/?limit=2')
+        self.assertEqual(status, 200)
+        self.assertEqual(body, flask_response.get_json())
+        self.assertEqual(headers['x-next-cursor'], flask_response.headers['X-Next-Cursor'])
+        self.assertEqual(headers['etag'], flask_response.headers['ETag'])
+
+    def test_native_detail_not_found(self):
+        status, headers, body = self.call('GET', '/api/v1/users/missing')
+        self.assertEqual((status, body), (404, {'error': 'User not found'}))
+
+    def test_other_routes_are_forwarded_to_flask(self):
+        status, headers, body = self.call('POST', '/api/v1/amenities/', body=b'{"name": "Spa"}')
+        self.assertEqual(status, 401)
+
+    def test_empty_fields_is_left_to_flask(self):
+        status, headers, body = self.call('GET', '/api/v1/amenities/', b'fields=')
+        self.assertEqual(status, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.services.facade import HBnBFacade
+from tests.base import ApiTestCase
+
+
+class TestBatchEndpoints(ApiTestCase):
+    def test_amenities_created_in_one_batch(self):
+        response = self.client.post('/api/v1/amenities/batch', headers=self.auth_headers(),
+                                    json=[{'name': 'Wifi'}, {'name': 'Pool'}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([item['status'] for item in response.get_json()], [201, 201])
+        self.assertEqual(Amenity.query.count(), 2)
+
+    def test_invalid_items_are_reported_per_item(self):
+        response = self.client.post('/api/v1/amenities/batch', headers=self.auth_headers(),
+                                    json=[{'name': 'Wifi'}, {'name': ''}, {'label': 'x'}])
+        self.assertEqual(response.status_code, 207)
+        body = response.get_json()
+        self.assertEqual([item['status'] for item in body], [201, 400, 400])
+        self.assertEqual(Amenity.query.count(), 1)
+
+    def test_places_are_owned_by_caller(self):
+        places = [{'title': 'Place {}'.format(i), 'description': 'Nice', 'price': 10.0 + i,
+                   'latitude': 1.0, 'longitude': 2.0} for i in range(3)]
+        response = self.client.post('/api/v1/places/batch', json=places,
+                                    headers=self.auth_headers(user_id='owner', is_admin=False))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual({place.owner_id for place in Place.query.all()}, {'owner'})
+
+    def test_batch_leaves_the_payload_unchanged(self):
+        places = [{'title': 'Loft', 'description': 'Nice', 'price': 10.0, 'latitude': 1.0, 'longitude': 2.0,
+                   'owner_id': 'someone-else'}]
+        HBnBFacade().create_places(places, 'owner')
+        self.assertEqual(places[0]['owner_id'], 'someone-else')
+        self.assertEqual(Place.query.one().owner_id, 'owner')
+
+    def test_empty_batch_is_rejected(self):
+        response = self.client.post('/api/v1/amenities/batch', headers=self.auth_headers(), json=[])
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from app import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.user import User
+from app.persistence.instrumentation import QueryCounter
+from app.services.facade import HBnBFacade
+from tests.base import ApiTestCase
+
+
+class TestConditionalGet(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User('Olive', 'Owner', 'owner@example.com', password='password')
+        self.place = Place('Loft', 'Bright loft', 80.0, 1.0, 2.0, self.owner.id)
+        self.amenity = Amenity('Wifi')
+        db.session.add_all([self.owner, self.place, self.amenity])
+        db.session.commit()
+
+    def revalidate(self, url, **kwargs):
+        first = self.client.get(url, **kwargs)
+        self.assertEqual(first.status_code, 200)
+        headers = dict(kwargs.pop('headers', {}), **{'If-None-Match': first.headers['ETag']})
+        return first, self.client.get(url, headers=headers, **kwargs)
+
+    def test_unchanged_list_returns_304(self):
+        first, second = self.revalidate('/api/v1/amenities/')
+        self.assertEqual(first.headers['Cache-Control'], 'public, max-age=300')
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.data, b'')
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+
+    def test_list_etag_depends_on_query_string(self):
+        full = self.client.get('/api/v1/places/')
+        page = self.client.get('/api/v1/places/?limit=1')
+        self.assertNotEqual(full.headers['ETag'], page.headers['ETag'])
+
+    def test_write_changes_the_list_etag(self):
+        first = self.client.get('/api/v1/amenities/')
+        self.client.put('/api/v1/amenities/{}'.format(self.amenity.id),
+                        headers=self.auth_headers(), json={'name': 'Fast wifi'})
+        second = self.client.get('/api/v1/amenities/', headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.get_json()[0]['name'], 'Fast wifi')
+        db.session.delete(db.session.get(Amenity, self.amenity.id))
+        db.session.commit()
+        third = self.client.get('/api/v1/amenities/', headers={'If-None-Match': second.headers['ETag']})
+        self.assertEqual(third.status_code, 200)
+
+    def test_list_version_is_a_lookup_not_a_scan(self):
+        with QueryCounter() as counter:
+            self.client.get('/api/v1/places/')
+        self.assertEqual(counter.queries, 2)
+        self.assertNotIn('count(', ' '.join(counter.statements))
+
+    def test_versions_follow_commits_and_rating_updates(self):
+        facade = HBnBFacade()
+        before = facade.get_places_version()
+        with self.assertRaises(RuntimeError):
+            with facade.unit_of_work():
+                facade.update_place(self.place.id, {'title': 'Attic'})
+                raise RuntimeError('abort')
+        self.assertEqual(facade.get_places_version(), before)
+        # Rating aggregates are bulk UPDATEs, outside of the ORM's flush
+        facade.place_repo.increment(self.place.id, {'review_count': 1})
+        db.session.commit()
+        self.assertEqual(facade.get_places_version(), before + 1)
+
+    def test_unchanged_place_detail_returns_304(self):
+        url = '/api/v1/places/{}'.format(self.place.id)
+        first, second = self.revalidate(url, headers=self.auth_headers())
+        self.assertEqual(first.headers['Cache-Control'], 'no-cache')
+        self.assertEqual(second.status_code, 304)
+        stale = self.client.get(url, headers=dict(self.auth_headers(), **{'If-None-Match': '"stale"'}))
+        self.assertEqual(stale.get_json()['title'], 'Loft')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+from app import db
+from app.models.amenity import Amenity
+from app.persistence import cache as entity_cache
+from app.persistence.cache import EntityCache
+from app.persistence.instrumentation import QueryCounter
+from app.services.facade import HBnBFacade
+from config import ProductionConfig
+from tests.base import ApiTestCase
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEntityCache(unittest.TestCase):
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = EntityCache(maxsize=10, ttl=5, clock=clock)
+        cache.set('a', {'id': 'a'})
+        clock.now = 4
+        self.assertEqual(cache.get('a'), {'id': 'a'})
+        clock.now = 5
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = EntityCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        stats = cache.stats()
+        self.assertEqual((stats['size'], stats['hits'], stats['misses'], stats['evictions']), (2, 2, 1, 1))
+
+
+class TestRepositoryCache(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        entity_cache.configure({'Amenity': {'maxsize': 10, 'ttl': 60}})
+        self.facade = HBnBFacade()
+        amenity = Amenity('Wifi')
+        db.session.add(amenity)
+        db.session.commit()
+        self.amenity_id = amenity.id
+        db.session.expunge_all()
+
+    def tearDown(self):
+        entity_cache.configure({})
+        super().tearDown()
+
+    def test_second_get_is_served_from_the_cache(self):
+        self.facade.get_amenity(self.amenity_id)
+        db.session.expunge_all()
+        with QueryCounter() as counter:
+            amenity = self.facade.get_amenity(self.amenity_id)
+        self.assertEqual(counter.queries, 0)
+        self.assertEqual(amenity.name, 'Wifi')
+        self.assertIn(amenity, db.session)
+        self.assertEqual(entity_cache.stats()['Amenity']['hits'], 1)
+
+    def test_updates_invalidate_the_entry(self):
+        self.facade.get_amenity(self.amenity_id)
+        self.facade.update_amenity(self.amenity_id, {'name': 'Fast wifi'})
+        db.session.expunge_all()
+        self.assertEqual(self.facade.get_amenity(self.amenity_id).name, 'Fast wifi')
+
+    def test_commit_invalidates_orm_writes_outside_the_repository(self):
+        self.facade.get_amenity(self.amenity_id).name = 'Pool'
+        db.session.commit()
+        db.session.expunge_all()
+        self.assertEqual(self.facade.get_amenity(self.amenity_id).name, 'Pool')
+
+    def test_update_many_is_one_write_and_invalidates(self):
+        pool = Amenity('Pool')
+        db.session.add(pool)
+        db.session.commit()
+        pool_id = pool.id
+        self.facade.get_amenity(self.amenity_id)
+        self.facade.get_amenity(pool_id)
+        version = self.facade.amenity_repo.version()
+        with QueryCounter() as counter:
+            with self.facade.unit_of_work():
+                updated = self.facade.amenity_repo.update_many({
+                    self.amenity_id: {'name': 'Fast wifi'}, pool_id: {'name': 'Heated pool'}, 'missing': {}})
+        self.assertEqual(len(updated), 2)
+        self.assertEqual(counter.commits, 1)
+        self.assertEqual(len([sql for sql in counter.statements if sql.startswith('UPDATE amenities')]), 1)
+        self.assertGreater(self.facade.amenity_repo.version(), version)
+        db.session.expunge_all()
+        self.assertEqual(self.facade.get_amenity(self.amenity_id).name, 'Fast wifi')
+        self.assertEqual(self.facade.get_amenity(pool_id).name, 'Heated pool')
+
+    def test_rolled_back_writes_are_never_served(self):
+        with self.assertRaises(RuntimeError):
+            with self.facade.unit_of_work():
+                self.facade.update_amenity(self.amenity_id, {'name': 'Pool'})
+                db.session.expunge_all()
+                self.assertEqual(self.facade.get_amenity(self.amenity_id).name, 'Pool')
+                raise RuntimeError('abort')
+        db.session.expunge_all()
+        self.assertEqual(self.facade.get_amenity(self.amenity_id).name, 'Wifi')
+        db.session.expunge_all()
+        self.assertEqual(self.facade.get_amenity(self.amenity_id).name, 'Wifi')
+
+
+class TestProductionEntityCache(ApiTestCase):
+    def tearDown(self):
+        entity_cache.configure({})
+        super().tearDown()
+
+    def test_production_config_caches_every_model(self):
+        entity_cache.configure(ProductionConfig.ENTITY_CACHE)
+        models = {mapper.class_.__name__ for mapper in db.Model.registry.mappers}
+        self.assertLessEqual(set(entity_cache.stats()), models)
+        amenity = Amenity('Wifi')
+        db.session.add(amenity)
+        db.session.commit()
+        facade = HBnBFacade()
+        facade.get_amenity(amenity.id)
+        db.session.expunge_all()
+        with QueryCounter() as counter:
+            self.assertEqual(facade.get_amenity(amenity.id).name, 'Wifi')
+        self.assertEqual(counter.queries, 0)
@@ -0,0 +1,69 @@
+import unittest
+from app import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.persistence.instrumentation import QueryCounter
+from tests.base import ApiTestCase
+
+
+class TestExpand(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User('Olive', 'Owner', 'owner@example.com', password='password')
+        guest = User('Gus', 'Guest', 'guest@example.com', password='password')
+        wifi = Amenity('Wifi')
+        db.session.add_all([self.owner, guest, wifi])
+        for n in range(4):
+            place = Place('Place {}'.format(n), 'Nice', 50 + n, 1.0, 2.0, self.owner.id)
+            place.amenities.append(wifi)
+            db.session.add_all([place, Review('Great stay', 5, place.id, guest.id)])
+        db.session.commit()
+        self.owner_id = self.owner.id
+        db.session.expunge_all()
+
+    def get(self, url, **kwargs):
+        with QueryCounter() as counter:
+            response = self.client.get(url, **kwargs)
+        return response, counter.statements
+
+    def test_plain_list_loads_no_relationship(self):
+        response, statements = self.get('/api/v1/places/')
+        self.assertEqual(len(response.get_json()), 4)
+        self.assertNotIn('owner', response.get_json()[0])
+        self.assertFalse([sql for sql in statements if 'amenities' in sql or 'FROM reviews' in sql])
+
+    def test_expanded_list_uses_a_fixed_number_of_queries(self):
+        _, plain = self.get('/api/v1/places/')
+        response, expanded = self.get('/api/v1/places/?expand=reviews,owner,amenities')
+        # One IN query per collection, the owner comes with the places JOIN;
+        # the expanded collections' versions are read with the places' one
+        self.assertEqual(len(expanded), len(plain) + 2)
+        _, two = self.get('/api/v1/places/?expand=reviews,owner,amenities&limit=2')
+        self.assertEqual(len(two), len(expanded))
+        place = response.get_json()[0]
+        self.assertEqual(place['owner']['email'], 'owner@example.com')
+        self.assertEqual([amenity['name'] for amenity in place['amenities']], ['Wifi'])
+        self.assertEqual(place['reviews'][0]['text'], 'Great stay')
+
+    def test_detail_expand_and_fields(self):
+        place_id = self.client.get('/api/v1/places/').get_json()[0]['id']
+        response = self.client.get('/api/v1/places/{}?fields=title&expand=owner'.format(place_id),
+                                   headers=self.auth_headers())
+        self.assertEqual(response.get_json(), {'title': 'Place 0', 'owner': {
+            'id': self.owner_id, 'first_name': 'Olive', 'last_name': 'Owner', 'email': 'owner@example.com'}})
+
+    def test_stream_expands_every_place(self):
+        response = self.client.get('/api/v1/places/?stream=true&expand=amenities')
+        self.assertEqual([[amenity['name'] for amenity in place['amenities']] for place in response.get_json()],
+                         [['Wifi']] * 4)
+
+    def test_unknown_expand_is_rejected(self):
+        response = self.client.get('/api/v1/places/?expand=owner,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.get_json()['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
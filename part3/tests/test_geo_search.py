@@ -0,0 +1,65 @@
+import unittest
+from app import db
+from app.models.place import Place
+from app.models.user import User
+from app.persistence import migrations
+from app.persistence.spatial import haversine_km, rebuild_rtree
+from tests.base import ApiTestCase
+
+# Paris, Versailles (~17 km), Lyon (~390 km) and two places on both sides of the antimeridian
+PLACES = {'Paris': (48.8566, 2.3522), 'Versailles': (48.8049, 2.1204), 'Lyon': (45.764, 4.8357),
+          'Suva': (-18.1416, 178.4419), 'Taveuni': (-16.8, -179.97)}
+
+
+class TestGeoSearch(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        migrations.upgrade(db.engine)
+        owner = User('Olive', 'Owner', 'owner@example.com', password='password')
+        self.places = {title: Place(title, 'Nice', float(n), lat, lon, owner.id)
+                       for n, (title, (lat, lon)) in enumerate(PLACES.items())}
+        db.session.add_all([owner] + list(self.places.values()))
+        db.session.commit()
+
+    def search(self, query, status=200):
+        response = self.client.get('/api/v1/places/?' + query)
+        self.assertEqual(response.status_code, status, response.get_data(as_text=True))
+        return response.get_json()
+
+    def test_near_sorts_by_distance_within_radius(self):
+        body = self.search('near=48.85,2.35&radius_km=50')
+        self.assertEqual([place['title'] for place in body], ['Paris', 'Versailles'])
+        self.assertLess(body[0]['distance_km'], body[1]['distance_km'])
+        self.assertEqual([p['title'] for p in self.search('near=48.85,2.35&radius_km=500&limit=2')],
+                         ['Paris', 'Versailles'])
+
+    def test_bbox(self):
+        body = self.search('bbox=2,45,5,49')
+        self.assertEqual({place['title'] for place in body}, {'Paris', 'Versailles', 'Lyon'})
+
+    def test_antimeridian(self):
+        body = self.search('bbox=178,-20,-179,-15')
+        self.assertEqual({place['title'] for place in body}, {'Suva', 'Taveuni'})
+        body = self.search('near=-17.5,179.9&radius_km=200')
+        self.assertEqual({place['title'] for place in body}, {'Suva', 'Taveuni'})
+
+    def test_index_follows_writes(self):
+        lyon = self.places['Lyon']
+        lyon.latitude, lyon.longitude = 48.86, 2.36
+        db.session.delete(self.places['Versailles'])
+        db.session.commit()
+        self.assertEqual({p['title'] for p in self.search('near=48.85,2.35&radius_km=50')}, {'Paris', 'Lyon'})
+        self.assertEqual(rebuild_rtree(db.engine, batch_size=2), 4)
+        self.assertEqual({p['title'] for p in self.search('near=48.85,2.35&radius_km=50')}, {'Paris', 'Lyon'})
+
+    def test_invalid_parameters(self):
+        for query in ('near=91,0', 'near=1', 'near=1,2&radius_km=0', 'bbox=a,b,c,d',
+                      'bbox=0,0,1,1&near=0,0', 'near=0,0&cursor=abc', 'near=nan,0'):
+            self.search(query, 400)
+
+    def test_haversine(self):
+        self.assertAlmostEqual(haversine_km(48.8566, 2.3522, 45.764, 4.8357), 392, delta=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
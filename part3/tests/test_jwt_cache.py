@@ -0,0 +1,66 @@
+import unittest
+from datetime import timedelta
+from flask_jwt_extended import create_access_token
+from jwt_cache import ClaimsCache, supports_claims_cache
+from tests.base import ApiTestCase
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestClaimsCache(unittest.TestCase):
+    def test_entries_expire_at_the_token_exp(self):
+        clock = FakeClock()
+        cache = ClaimsCache(maxsize=10, clock=clock)
+        cache.set('token', {'sub': 'a'}, 1060)
+        clock.now = 1059
+        self.assertEqual(cache.get('token'), {'sub': 'a'})
+        clock.now = 1060
+        self.assertIsNone(cache.get('token'))
+
+
+class TestCachingJWTManager(ApiTestCase):
+    def get_protected(self, headers):
+        return self.client.get('/api/v1/auth/protected', headers=headers)
+
+    def test_repeated_token_is_verified_once(self):
+        headers = self.auth_headers('user-1')
+        for _ in range(3):
+            response = self.get_protected(headers)
+            self.assertEqual(response.get_json(), {'message': 'Hello, user user-1'})
+        stats = self.jwt.claims_cache.stats()
+        self.assertEqual((stats['size'], stats['hits'], stats['misses']), (1, 2, 1))
+
+    def test_tampered_token_is_still_rejected(self):
+        token = self.auth_headers('user-1')['Authorization']
+        self.assertEqual(self.get_protected({'Authorization': token}).status_code, 200)
+        self.assertEqual(self.get_protected({'Authorization': token[:-2] + 'xx'}).status_code, 422)
+
+    def test_expired_token_is_not_served_from_the_cache(self):
+        token = create_access_token(identity={'id': 'user-1'}, expires_delta=timedelta(seconds=-1))
+        self.assertEqual(self.get_protected({'Authorization': 'Bearer ' + token}).status_code, 401)
+        self.assertEqual(self.jwt.claims_cache.stats()['size'], 0)
+
+    def test_installed_release_can_be_hooked(self):
+        self.assertTrue(supports_claims_cache())
+
+
+class TestLeeway(ApiTestCase):
+    def configure(self):
+        self.app.config['JWT_DECODE_LEEWAY'] = 30
+
+    def test_token_within_the_leeway_is_served_from_the_cache(self):
+        token = create_access_token(identity={'id': 'user-1'}, expires_delta=timedelta(seconds=-1))
+        for _ in range(2):
+            self.assertEqual(self.client.get('/api/v1/auth/protected',
+                                             headers={'Authorization': 'Bearer ' + token}).status_code, 200)
+        self.assertEqual(self.jwt.claims_cache.stats()['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
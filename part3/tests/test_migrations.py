@@ -0,0 +1,91 @@
+import unittest
+from sqlalchemy import create_engine, inspect, text
+from app.persistence import migrations
+
+LEGACY_SCHEMA = [
+    "CREATE TABLE users (id VARCHAR(36) PRIMARY KEY, first_name VARCHAR(50) NOT NULL, "
+    "last_name VARCHAR(50) NOT NULL, email VARCHAR(120) NOT NULL UNIQUE, is_admin BOOLEAN, "
+    "password VARCHAR(100) NOT NULL, created_at DATETIME, updated_at DATETIME)",
+    "CREATE TABLE amenities (id VARCHAR(36) PRIMARY KEY, name VARCHAR(50) NOT NULL, "
+    "created_at DATETIME, updated_at DATETIME)",
+    "CREATE TABLE places (id VARCHAR(36) PRIMARY KEY, _title VARCHAR(50) NOT NULL, "
+    "_description VARCHAR(50) NOT NULL, _price VARCHAR(120) NOT NULL UNIQUE, latitude FLOAT, "
+    "longitude FLOAT NOT NULL, created_at DATETIME, updated_at DATETIME, "
+    "owner_id VARCHAR(36) NOT NULL REFERENCES users (id))",
+    "CREATE TABLE reviews (id VARCHAR(36) PRIMARY KEY, text VARCHAR(1024) NOT NULL, "
+    "rating INTEGER NOT NULL, place_id VARCHAR(36) NOT NULL REFERENCES places (id), "
+    "user_id VARCHAR(36) NOT NULL REFERENCES users (id))",
+    "CREATE TABLE place_amenity (place_id VARCHAR(36) NOT NULL REFERENCES places (id), "
+    "amenity_id VARCHAR(36) NOT NULL REFERENCES amenities (id), PRIMARY KEY (place_id, amenity_id))",
+]
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        with self.engine.begin() as conn:
+            for statement in LEGACY_SCHEMA:
+                conn.execute(text(statement))
+            conn.execute(text(
+                "INSERT INTO places (id, _title, _description, _price, latitude, longitude, "
+                "created_at, updated_at, owner_id) VALUES ('p1', 'Loft', 'Bright', '80.0', 1.0, 2.0, "
+                "'2024-01-01 00:00:00', '2024-01-01 00:00:00', 'u1')"))
+            for n in range(7):
+                conn.execute(text("INSERT INTO reviews (id, text, rating, place_id, user_id) "
+                                  "VALUES (:id, 'Nice', 4, 'p1', :user)"),
+                             {'id': 'r{}'.format(n), 'user': 'u{}'.format(n % 5)})
+
+    def test_duplicate_reviews_stop_the_upgrade(self):
+        with self.assertRaises(migrations.MigrationError) as raised:
+            migrations.upgrade(self.engine)
+        self.assertIn('(u0, p1): 2', str(raised.exception))
+        self.assertIn('(u1, p1): 2', str(raised.exception))
+        self.assertEqual(migrations.current_version(self.engine), 0)
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT COUNT(*) FROM reviews")).scalar(), 7)
+
+    def test_upgrade_legacy_database(self):
+        self.assertEqual(migrations.current_version(self.engine), 0)
+        self.assertEqual(migrations.dedupe_reviews(self.engine, batch_size=1), 2)
+        self.assertEqual(migrations.duplicate_reviews(self.engine), [])
+        applied = migrations.upgrade(self.engine, batch_size=2)
+        self.assertEqual(applied, [m.version for m in migrations.MIGRATIONS])
+        self.assertEqual(migrations.current_version(self.engine), migrations.MIGRATIONS[-1].version)
+
+        indexes = {index['name']: index for index in inspect(self.engine).get_indexes('reviews')}
+        self.assertTrue(indexes['ux_reviews_user_id_place_id']['unique'])
+        self.assertIn('ix_reviews_place_id_created_at', indexes)
+        with self.engine.connect() as conn:
+            self.assertIn('ix_places_owner_id', conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'places'")).scalars().all())
+            self.assertEqual(conn.execute(text("SELECT COUNT(*) FROM reviews")).scalar(), 5)
+            self.assertEqual(conn.execute(text(
+                "SELECT COUNT(*) FROM reviews WHERE created_at IS NULL")).scalar(), 0)
+            self.assertEqual(tuple(conn.execute(text(
+                "SELECT review_count, rating_sum, rating_4, rating_5 FROM places")).one()), (5, 20, 5, 0))
+            self.assertEqual(conn.execute(text("SELECT price_cents FROM places")).scalar(), 8000)
+            self.assertEqual(conn.execute(text("SELECT COUNT(*) FROM places_rtree")).scalar(), 1)
+            self.assertEqual(conn.execute(text(
+                "SELECT COUNT(*) FROM places_fts WHERE places_fts MATCH 'loft'")).scalar(), 1)
+        self.assertFalse(migrations.has_column(self.engine, 'places', '_price'))
+
+    def test_short_review_timestamps_get_microseconds(self):
+        migrations.dedupe_reviews(self.engine)
+        migrations.upgrade(self.engine, target=6)
+        with self.engine.begin() as conn:
+            conn.execute(text("UPDATE reviews SET created_at = '2024-01-01 00:00:00'"))
+        migrations.upgrade(self.engine, batch_size=2)
+        with self.engine.connect() as conn:
+            self.assertEqual(set(conn.execute(text("SELECT created_at FROM reviews")).scalars()),
+                             {'2024-01-01 00:00:00.000000'})
+            self.assertEqual(conn.execute(text(
+                "SELECT COUNT(*) FROM reviews WHERE length(updated_at) != 26")).scalar(), 0)
+
+    def test_upgrade_is_a_no_op_once_applied(self):
+        migrations.dedupe_reviews(self.engine)
+        migrations.upgrade(self.engine)
+        self.assertEqual(migrations.upgrade(self.engine), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
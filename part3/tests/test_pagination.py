@@ -0,0 +1,102 @@
+import unittest
+from datetime import datetime, timedelta
+from app import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.persistence import migrations
+from app.services.facade import HBnBFacade
+from tests.base import ApiTestCase
+
+
+class TestKeysetPagination(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        db.session.add_all([Amenity('Amenity {}'.format(i)) for i in range(7)])
+        db.session.commit()
+
+    def test_pages_cover_every_row_once(self):
+        seen = []
+        url = '/api/v1/amenities/?limit=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(item['id'] for item in response.get_json())
+            cursor = response.headers.get('X-Next-Cursor')
+            url = '/api/v1/amenities/?limit=3&cursor={}'.format(cursor) if cursor else None
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+
+    def test_last_page_has_no_cursor(self):
+        response = self.client.get('/api/v1/amenities/?limit=10')
+        self.assertEqual(len(response.get_json()), 7)
+        self.assertNotIn('X-Next-Cursor', response.headers)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get('/api/v1/amenities/?cursor=garbage').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/amenities/?limit=0').status_code, 400)
+
+
+class TestPlaceReviews(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.place = Place('Loft', 'Bright loft', 80.0, 1.0, 2.0, 'owner')
+        self.empty = Place('Cabin', 'Quiet cabin', 50.0, 1.0, 2.0, 'owner')
+        db.session.add_all([self.place, self.empty])
+        start = datetime(2024, 1, 1)
+        for day in range(5):
+            review = Review('Review {}'.format(day), 4, self.place.id, 'user-{}'.format(day))
+            review.created_at = start + timedelta(days=day)
+            db.session.add(review)
+        db.session.commit()
+
+    def test_newest_first_pages(self):
+        url = '/api/v1/reviews/places/{}/reviews?limit=3'.format(self.place.id)
+        first = self.client.get(url)
+        self.assertEqual([r['text'] for r in first.get_json()], ['Review 4', 'Review 3', 'Review 2'])
+        second = self.client.get(url + '&cursor=' + first.headers['X-Next-Cursor'])
+        self.assertEqual([r['text'] for r in second.get_json()], ['Review 1', 'Review 0'])
+        self.assertNotIn('X-Next-Cursor', second.headers)
+
+    def test_place_without_reviews_and_unknown_place(self):
+        response = self.client.get('/api/v1/reviews/places/{}/reviews'.format(self.empty.id))
+        self.assertEqual((response.status_code, response.get_json()), (200, []))
+        self.assertEqual(self.client.get('/api/v1/reviews/places/missing/reviews').status_code, 404)
+
+    def test_query_uses_place_index(self):
+        facade = HBnBFacade()
+        cursor = facade.get_reviews_by_place(self.place.id, limit=2)[1]
+        # The first page and one after a cursor, as the repository issues them
+        plans = self.query_plans(lambda: facade.get_reviews_by_place(self.place.id, limit=2))
+        plans += self.query_plans(lambda: facade.get_reviews_by_place(self.place.id, limit=2, cursor=cursor))
+        self.assertEqual(len(plans), 2)
+        for plan in plans:
+            self.assertIn('ix_reviews_place_id_created_at', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+
+class TestMigratedRows(ApiTestCase):
+    def test_backfilled_reviews_page_through(self):
+        place = Place('Loft', 'Bright loft', 80.0, 1.0, 2.0, 'owner')
+        db.session.add(place)
+        db.session.commit()
+        # Reviews of an older release, without timestamps
+        for n in range(5):
+            db.session.execute(db.text(
+                "INSERT INTO reviews (id, text, rating, place_id, user_id) VALUES (:id, 'Nice', 4, :place, :user)"),
+                {'id': 'r{}'.format(n), 'place': place.id, 'user': 'user-{}'.format(n)})
+        db.session.commit()
+        migrations.upgrade(db.engine)
+        for url in ('/api/v1/reviews/?limit=2', '/api/v1/reviews/places/{}/reviews?limit=2'.format(place.id)):
+            seen, next_url = [], url
+            while next_url:
+                response = self.client.get(next_url)
+                seen += [review['id'] for review in response.get_json()]
+                self.assertLessEqual(len(seen), 5, url)
+                cursor = response.headers.get('X-Next-Cursor')
+                next_url = url + '&cursor=' + cursor if cursor else None
+            self.assertEqual(sorted(seen), ['r0', 'r1', 'r2', 'r3', 'r4'], url)
+
+
+if __name__ == '__main__':
+    unittest.main()
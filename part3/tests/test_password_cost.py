@@ -0,0 +1,35 @@
+import unittest
+from app import db
+from app.models.user import User
+from tests.base import ApiTestCase
+
+
+class TestPasswordCost(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        user = User('Gus', 'Guest', 'guest@example.com', password='password')
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.id
+
+    def login(self, password='password'):
+        return self.client.post('/api/v1/auth/login', json={'email': 'guest@example.com', 'password': password})
+
+    def stored_cost(self):
+        db.session.expire_all()
+        return db.session.get(User, self.user_id).password_cost
+
+    def test_hash_uses_the_configured_cost(self):
+        self.assertEqual(self.stored_cost(), 4)
+
+    def test_login_rehashes_when_the_cost_changes(self):
+        self.app.config['BCRYPT_LOG_ROUNDS'] = 5
+        self.assertEqual(self.login('wrong').status_code, 401)
+        self.assertEqual(self.stored_cost(), 4)
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.stored_cost(), 5)
+        self.assertEqual(self.login().status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import threading
+import time
+import unittest
+from app import db
+from app.models import hashing
+from app.models.user import User
+from config import ProductionConfig
+from tests.base import ApiTestCase
+
+
+class TestPasswordHashingPool(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        hashing.configure({'workers': 1, 'max_queue': 0})
+        db.session.add(User('Gus', 'Guest', 'guest@example.com', password='password'))
+        db.session.commit()
+
+    def tearDown(self):
+        hashing.configure(None)
+        super().tearDown()
+
+    def login(self):
+        return self.client.post('/api/v1/auth/login', json={'email': 'guest@example.com', 'password': 'password'})
+
+    def test_login_is_verified_on_the_pool(self):
+        self.assertEqual(self.login().status_code, 200)
+        stats = hashing.stats()
+        self.assertEqual(stats['completed'], 2)
+        self.assertEqual((stats['in_flight'], stats['queued'], stats['rejected']), (0, 0, 0))
+
+    def test_login_over_the_queue_depth_gets_a_503(self):
+        # A slow hash keeps the only worker busy, and no job may wait
+        slow = threading.Thread(target=hashing.hash_password, args=('password', 14))
+        slow.start()
+        while hashing.stats()['in_flight'] == 0:
+            time.sleep(0.01)
+        response = self.login()
+        slow.join()
+        self.assertEqual(response.status_code, 503)
+        self.assertGreaterEqual(int(response.headers['Retry-After']), 1)
+        self.assertEqual(hashing.stats()['rejected'], 1)
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_pool_counters_are_served_to_admins(self):
+        self.login()
+        response = self.client.get('/api/v1/metrics/', headers=self.auth_headers())
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(body['password_hashing']['completed'], 2)
+        self.assertIn('hits', body['jwt_claims_cache'])
+        forbidden = self.client.get('/api/v1/metrics/', headers=self.auth_headers(is_admin=False))
+        self.assertEqual(forbidden.status_code, 403)
+
+
+class TestProductionPasswordHashing(ApiTestCase):
+    def tearDown(self):
+        hashing.configure(None)
+        super().tearDown()
+
+    def test_production_config_hashes_on_the_pool(self):
+        hashing.configure(ProductionConfig.PASSWORD_HASHING)
+        db.session.add(User('Gus', 'Guest', 'guest@example.com', password='password'))
+        db.session.commit()
+        response = self.client.post('/api/v1/auth/login', json={'email': 'guest@example.com', 'password': 'password'})
+        self.assertEqual(response.status_code, 200)
+        metrics = self.client.get('/api/v1/metrics/', headers=self.auth_headers()).get_json()
+        self.assertEqual(metrics['password_hashing']['completed'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from app import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.user import User
+from app.persistence import migrations
+from app.persistence.repository import PlaceRepository
+from tests.base import ApiTestCase
+
+
+class TestPlaceFilters(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User('Olive', 'Owner', 'owner@example.com', password='password')
+        self.other = User('Otto', 'Other', 'other@example.com', password='password')
+        self.wifi, self.pool = Amenity('Wifi'), Amenity('Pool')
+        self.places = {}
+        for title, price, owner, amenities, ratings in (
+                ('Loft', 80.0, self.owner, [self.wifi, self.pool], (5, 4)),
+                ('Cabin', 120.0, self.owner, [self.wifi], (3,)),
+                ('Studio', 45.5, self.other, [self.pool, self.wifi], ()),
+                ('Villa', 300.0, self.other, [self.pool], (5,))):
+            place = Place(title, 'Nice', price, 1.0, 2.0, owner.id)
+            place.amenities = amenities
+            place.review_count, place.rating_sum = len(ratings), sum(ratings)
+            self.places[title] = place
+        db.session.add_all([self.owner, self.other] + list(self.places.values()))
+        db.session.commit()
+
+    def titles(self, query, status=200):
+        response = self.client.get('/api/v1/places/?' + query)
+        self.assertEqual(response.status_code, status, response.get_data(as_text=True))
+        return [place['title'] for place in response.get_json()] if status == 200 else response
+
+    def test_price_range_and_sort(self):
+        self.assertEqual(self.titles('min_price=50&max_price=150&sort=price'), ['Loft', 'Cabin'])
+        self.assertEqual(self.titles('sort=-price'), ['Villa', 'Cabin', 'Loft', 'Studio'])
+
+    def test_amenities_all_of(self):
+        query = 'amenities={},{}&sort=price'.format(self.wifi.id, self.pool.id)
+        self.assertEqual(self.titles(query), ['Studio', 'Loft'])
+        self.assertEqual(self.titles('amenities={}&owner_id={}&sort=price'.format(
+            self.wifi.id, self.owner.id)), ['Loft', 'Cabin'])
+
+    def test_rating_and_newest_sorts(self):
+        self.assertEqual(self.titles('sort=rating'), ['Villa', 'Loft', 'Cabin', 'Studio'])
+        self.assertEqual(self.titles('sort=newest'), ['Villa', 'Studio', 'Cabin', 'Loft'])
+
+    def test_cursor_follows_the_sort(self):
+        seen, cursor = [], ''
+        while True:
+            response = self.client.get('/api/v1/places/?sort=rating&limit=1' + cursor)
+            seen += [place['title'] for place in response.get_json()]
+            if 'X-Next-Cursor' not in response.headers:
+                break
+            cursor = '&cursor=' + response.headers['X-Next-Cursor']
+        self.assertEqual(seen, ['Villa', 'Loft', 'Cabin', 'Studio'])
+
+    def test_price_is_stored_in_cents(self):
+        place = Place('Room', 'Nice', 0.285, 1.0, 2.0, self.owner.id)
+        self.assertEqual((place.price_cents, place.price), (29, 0.29))
+        for price in (-1, 'cheap', float('nan')):
+            with self.assertRaises(ValueError):
+                place.price = price
+        self.assertEqual(self.titles('min_price=45.5&max_price=80'), ['Loft', 'Studio'])
+
+    def test_invalid_price_is_a_400(self):
+        payload = {'title': 'Room', 'price': -5, 'latitude': 1.0, 'longitude': 2.0}
+        headers = self.auth_headers(self.owner.id, is_admin=False)
+        for price in (-5, 'cheap'):
+            response = self.client.post('/api/v1/places/', headers=headers, json=dict(payload, price=price))
+            self.assertEqual(response.status_code, 400, response.get_data(as_text=True))
+        url = '/api/v1/places/{}'.format(self.places['Loft'].id)
+        response = self.client.put(url, headers=headers, json={'price': -1})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('negative', response.get_json()['message'])
+        self.assertEqual(self.client.get(url, headers=headers).get_json()['price'], 80.0)
+
+    def test_invalid_filters(self):
+        self.titles('sort=cheapest', 400)
+        self.titles('min_price=cheap', 400)
+        self.titles('sort=price&cursor=abc', 400)
+        self.titles('near=1,2&sort=price', 400)
+
+    def test_queries_use_the_indexes(self):
+        migrations.upgrade(db.engine)
+        repo = PlaceRepository()
+        amenity_ids = [self.wifi.id, self.pool.id]
+        calls = {
+            'ix_places_price_cents_id': lambda: repo.get_filtered_page(sort='price', min_price=1, max_price=200),
+            'ix_places_rating_id': lambda: repo.get_filtered_page(sort='rating'),
+            'ix_place_amenity_amenity_id': lambda: repo.get_filtered_page(amenity_ids=amenity_ids),
+            'places_rtree': lambda: repo.get_in_bbox(0.0, 0.0, 3.0, 3.0),
+        }
+        for index, call in calls.items():
+            # The first statement selects the places, any later one loads them by id
+            plans = self.query_plans(call)
+            self.assertIn(index, plans[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from app import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.persistence.instrumentation import QueryCounter
+from tests.base import ApiTestCase
+
+
+class TestPlaceFull(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        owner = User('Olive', 'Owner', 'owner@example.com', password='password')
+        place = Place('Loft', 'Bright loft', 80, 1.0, 2.0, owner.id)
+        place.amenities.extend([Amenity('Wifi'), Amenity('Pool')])
+        db.session.add_all([owner, place])
+        for n in range(3):
+            guest = User('Guest', str(n), 'guest{}@example.com'.format(n), password='password')
+            db.session.add_all([guest, Review('Stay {}'.format(n), 4, place.id, guest.id)])
+            db.session.commit()
+        self.url = '/api/v1/places/{}/full'.format(place.id)
+        db.session.expunge_all()
+
+    def test_everything_in_at_most_three_queries(self):
+        with QueryCounter() as counter:
+            response = self.client.get(self.url, headers=self.auth_headers())
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(counter.queries, 3)
+        data = response.get_json()
+        self.assertEqual(data['title'], 'Loft')
+        self.assertEqual(data['owner']['email'], 'owner@example.com')
+        self.assertEqual(sorted(amenity['name'] for amenity in data['amenities']), ['Pool', 'Wifi'])
+        self.assertEqual([review['text'] for review in data['reviews']], ['Stay 2', 'Stay 1', 'Stay 0'])
+        self.assertEqual(data['reviews'][0]['author']['last_name'], '2')
+        self.assertNotIn('email', data['reviews'][0]['author'])
+
+    def test_reviews_are_paginated(self):
+        first = self.client.get(self.url + '?limit=2', headers=self.auth_headers())
+        self.assertEqual(len(first.get_json()['reviews']), 2)
+        second = self.client.get(self.url + '?limit=2&cursor=' + first.headers['X-Next-Cursor'],
+                                 headers=self.auth_headers())
+        self.assertEqual([review['text'] for review in second.get_json()['reviews']], ['Stay 0'])
+        self.assertEqual(second.get_json()['owner']['first_name'], 'Olive')
+        self.assertNotIn('X-Next-Cursor', second.headers)
+
+    def test_not_modified_and_missing_place(self):
+        etag = self.client.get(self.url, headers=self.auth_headers()).headers['ETag']
+        cached = self.client.get(self.url, headers=dict(self.auth_headers(), **{'If-None-Match': etag}))
+        self.assertEqual(cached.status_code, 304)
+        missing = self.client.get('/api/v1/places/nope/full', headers=self.auth_headers())
+        self.assertEqual(missing.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import manage
+from app import db
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.persistence import cache as entity_cache
+from app.persistence.aggregates import recompute_place_ratings
+from app.services.facade import HBnBFacade
+from tests.base import ApiTestCase
+
+
+class TestRatingAggregates(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.facade = HBnBFacade()
+        self.owner = User('Olive', 'Owner', 'owner@example.com', password='password')
+        self.guests = [User('Gus', 'Guest', 'guest{}@example.com'.format(n), password='password')
+                       for n in range(3)]
+        self.place = Place('Loft', 'Bright loft', 80.0, 1.0, 2.0, self.owner.id)
+        db.session.add_all([self.owner, self.place] + self.guests)
+        db.session.commit()
+
+    def review(self, guest, rating):
+        return self.facade.create_review({'text': 'Nice', 'rating': rating,
+                                          'place_id': self.place.id, 'user_id': guest.id})
+
+    def aggregates(self):
+        db.session.expire_all()
+        place = db.session.get(Place, self.place.id)
+        return place.review_count, place.rating_sum, place.rating_histogram
+
+    def test_review_writes_update_the_aggregates(self):
+        first = self.review(self.guests[0], 5)
+        self.review(self.guests[1], 3)
+        self.assertEqual(self.aggregates(), (2, 8, {'1': 0, '2': 0, '3': 1, '4': 0, '5': 1}))
+
+        self.facade.update_review(first.id, {'rating': 4})
+        self.assertEqual(self.aggregates(), (2, 7, {'1': 0, '2': 0, '3': 1, '4': 1, '5': 0}))
+
+        self.facade.delete_review(first.id)
+        self.assertEqual(self.aggregates(), (1, 3, {'1': 0, '2': 0, '3': 1, '4': 0, '5': 0}))
+
+    def test_batch_reviews_update_the_aggregates(self):
+        self.facade.create_reviews([
+            {'text': 'Nice', 'rating': 2, 'place_id': self.place.id, 'user_id': guest.id}
+            for guest in self.guests], {'id': 'admin', 'is_admin': True})
+        self.assertEqual(self.aggregates()[:2], (3, 6))
+
+    def test_place_responses_include_the_aggregates(self):
+        self.review(self.guests[0], 5)
+        self.review(self.guests[1], 4)
+        body = self.client.get('/api/v1/places/{}'.format(self.place.id), headers=self.auth_headers()).get_json()
+        self.assertEqual((body['review_count'], body['average_rating']), (2, 4.5))
+        self.assertEqual(self.client.get('/api/v1/places/').get_json()[0]['rating_histogram']['4'], 1)
+
+    def test_invalid_rating_update_is_rejected(self):
+        review = self.review(self.guests[0], 5)
+        with self.assertRaises(ValueError):
+            self.facade.update_review(review.id, {'rating': 9})
+        self.assertEqual(self.aggregates()[:2], (1, 5))
+
+    def test_update_onto_an_existing_pair_is_a_400(self):
+        self.review(self.guests[0], 5)
+        second = self.review(self.guests[1], 3)
+        response = self.client.put('/api/v1/reviews/{}'.format(second.id), headers=self.auth_headers(),
+                                   json={'text': 'Nice', 'rating': 3, 'place_id': self.place.id,
+                                         'user_id': self.guests[0].id})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('already reviewed', response.get_json()['error'])
+        self.assertEqual(self.aggregates()[:2], (2, 8))
+
+    def test_recompute_repairs_drift(self):
+        db.session.add(Review('Nice', 1, self.place.id, self.guests[0].id))
+        db.session.commit()
+        self.assertEqual(recompute_place_ratings(db.engine, batch_size=1), 1)
+        self.assertEqual(self.aggregates()[:2], (1, 1))
+
+    def test_repair_is_visible_to_the_api(self):
+        entity_cache.configure({'Place': {'maxsize': 10, 'ttl': 60}})
+        self.addCleanup(entity_cache.configure, {})
+        place_id = self.place.id
+        db.session.add(Review('Nice', 4, place_id, self.guests[0].id))
+        db.session.commit()
+        self.assertEqual(self.facade.get_place(place_id).review_count, 0)
+        version = self.facade.get_places_version()
+        recompute_place_ratings(db.engine, batch_size=10)
+        manage.rewritten('places')
+        self.assertNotEqual(self.facade.get_places_version(), version)
+        db.session.expunge_all()
+        self.assertEqual(self.facade.get_place(place_id).review_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
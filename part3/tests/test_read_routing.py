@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+from flask import Flask
+from app import db
+from app.persistence.routing import ReadReplica, read_session
+from app.persistence import routing
+from app.services.facade import HBnBFacade
+from config import ProductionConfig
+
+
+class TestReadRouting(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.config.update(
+            SQLALCHEMY_DATABASE_URI='sqlite:///' + os.path.join(self.directory, 'hbnb.db'),
+            SQLALCHEMY_READ_ONLY_POOL=True
+        )
+        db.init_app(self.app)
+        with self.app.app_context():
+            db.create_all()
+            self.replica = ReadReplica()
+            self.replica.init_app(self.app, db.engine)
+        self.previous, routing.read_replica = routing.read_replica, self.replica
+        self.facade = HBnBFacade()
+
+    def tearDown(self):
+        routing.read_replica = self.previous
+        self.replica.engine.dispose()
+        with self.app.app_context():
+            db.engine.dispose()
+        shutil.rmtree(self.directory)
+
+    def test_reads_use_the_read_only_engine(self):
+        with self.app.app_context():
+            self.facade.create_amenity({'name': 'Wifi'})
+        with self.app.app_context():
+            self.assertIs(read_session().get_bind(), self.replica.engine)
+            self.assertEqual([a.name for a in self.facade.get_all_amenities()], ['Wifi'])
+            with self.assertRaises(Exception):
+                read_session().execute(db.text("INSERT INTO amenities (id, name) VALUES ('x', 'y')"))
+
+    def test_request_reads_its_own_writes(self):
+        with self.app.app_context():
+            self.assertEqual(self.facade.get_all_amenities(), [])
+            amenity = self.facade.create_amenity({'name': 'Pool'})
+            self.assertIs(read_session(), db.session)
+            self.assertIs(self.facade.get_amenity(amenity.id), amenity)
+
+
+class TestProductionReadPool(unittest.TestCase):
+    def test_production_config_opens_the_read_only_pool(self):
+        directory = tempfile.mkdtemp()
+        app = Flask(__name__)
+        app.config.from_object(ProductionConfig)
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(directory, 'hbnb.db')
+        db.init_app(app)
+        replica = ReadReplica()
+        try:
+            with app.app_context():
+                db.create_all()
+                replica.init_app(app, db.engine)
+                with replica.engine.connect() as conn:
+                    self.assertEqual(conn.execute(db.text('PRAGMA query_only')).scalar(), 1)
+                    self.assertEqual(conn.execute(db.text('PRAGMA busy_timeout')).scalar(), 5000)
+                self.assertEqual(replica.engine.pool.size(), 8)
+                db.engine.dispose()
+        finally:
+            if replica.engine is not None:
+                replica.engine.dispose()
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from datetime import datetime, timedelta
+from app import db
+from app.models.revoked_token import RevokedToken
+from app.models.user import User
+from app.persistence.instrumentation import QueryCounter
+from app.services.facade import HBnBFacade
+from tests.base import ApiTestCase
+
+
+class TestRefreshTokens(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        db.session.add(User('Gus', 'Guest', 'guest@example.com', password='password'))
+        db.session.commit()
+        response = self.client.post('/api/v1/auth/login', json={'email': 'guest@example.com', 'password': 'password'})
+        self.tokens = response.get_json()
+
+    def post(self, path, token):
+        return self.client.post('/api/v1/auth/' + path, headers={'Authorization': 'Bearer ' + token})
+
+    def test_refresh_returns_a_working_access_token(self):
+        response = self.post('refresh', self.tokens['refresh_token'])
+        self.assertEqual(response.status_code, 200)
+        headers = {'Authorization': 'Bearer ' + response.get_json()['access_token']}
+        self.assertEqual(self.client.get('/api/v1/auth/protected', headers=headers).status_code, 200)
+
+    def test_access_token_cannot_refresh(self):
+        self.assertEqual(self.post('refresh', self.tokens['access_token']).status_code, 422)
+
+    def test_revoked_refresh_token_is_rejected(self):
+        self.assertEqual(self.post('logout', self.tokens['refresh_token']).status_code, 200)
+        with QueryCounter() as counter:
+            response = self.post('refresh', self.tokens['refresh_token'])
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(counter.queries, 1)
+        self.assertEqual(self.post('logout', self.tokens['refresh_token']).status_code, 200)
+
+    def test_revoking_an_already_revoked_token_is_a_no_op(self):
+        facade = HBnBFacade()
+        expires_at = datetime.utcnow() + timedelta(days=1)
+        facade.revoke_token('some-jti', expires_at)
+        facade.revoke_token('some-jti', expires_at)
+        self.assertEqual(db.session.query(RevokedToken).count(), 1)
+        self.assertTrue(facade.is_token_revoked('some-jti'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from app import db
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.persistence import migrations
+from app.persistence.search import rebuild_search_index
+from tests.base import ApiTestCase
+
+
+class TestPlaceSearch(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        migrations.upgrade(db.engine)
+        owner = User('Olive', 'Owner', 'owner@example.com', password='password')
+        self.guest = User('Gus', 'Guest', 'guest@example.com', password='password')
+        self.loft = Place('Seaside loft', 'Bright loft by the beach', 80.0, 1.0, 2.0, owner.id)
+        self.cabin = Place('Mountain cabin', 'Quiet wooden cabin', 60.0, 1.0, 2.0, owner.id)
+        self.studio = Place('City studio', 'Small studio downtown', 50.0, 1.0, 2.0, owner.id)
+        review = Review('Great view of the beach <script>', 5, self.cabin.id, self.guest.id)
+        db.session.add_all([owner, self.guest, self.loft, self.cabin, self.studio, review])
+        db.session.commit()
+
+    def search(self, query, status=200):
+        response = self.client.get('/api/v1/places/search?' + query)
+        self.assertEqual(response.status_code, status, response.get_data(as_text=True))
+        return response
+
+    def test_title_matches_rank_before_review_matches(self):
+        body = self.search('q=beach').get_json()
+        self.assertEqual([place['title'] for place in body], ['Seaside loft', 'Mountain cabin'])
+        self.assertIn('<mark>beach</mark>', body[0]['snippet'])
+        self.assertIn('&lt;script&gt;', body[1]['snippet'])
+
+    def test_prefix_and_diacritics(self):
+        self.assertEqual([p['title'] for p in self.search('q=quiet+cab').get_json()], ['Mountain cabin'])
+        self.assertEqual([p['title'] for p in self.search('q=wood').get_json()], ['Mountain cabin'])
+        self.assertEqual([p['title'] for p in self.search('q=stud%C3%AFo').get_json()], ['City studio'])
+
+    def test_cursor_pagination(self):
+        first = self.search('q=beach&limit=1')
+        second = self.search('q=beach&limit=1&cursor=' + first.headers['X-Next-Cursor'])
+        self.assertEqual(second.get_json()[0]['title'], 'Mountain cabin')
+        self.assertNotIn('X-Next-Cursor', second.headers)
+
+    def test_index_follows_writes(self):
+        self.studio.description = 'Small studio near the beach'
+        db.session.delete(self.loft)
+        db.session.commit()
+        self.assertEqual({p['title'] for p in self.search('q=beach').get_json()}, {'City studio', 'Mountain cabin'})
+        self.assertEqual(rebuild_search_index(db.engine, batch_size=1), 3)
+        self.assertEqual({p['title'] for p in self.search('q=beach').get_json()}, {'City studio', 'Mountain cabin'})
+
+    def test_invalid_queries(self):
+        self.search('q=', 400)
+        self.search('q=beach&cursor=abc', 400)
+        self.assertEqual(self.search('q=%22beach%22+AND+NEAR(').get_json(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import json
+import unittest
+from app import db
+from app.api.v1.serializers import AMENITY, Serializer
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.user import User
+from tests.base import ApiTestCase
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class TestSerializer(unittest.TestCase):
+    def test_dumps_the_fields_in_order(self):
+        self.assertEqual(list(Serializer('y', 'x').dump(Point(1, 2)).items()), [('y', 2), ('x', 1)])
+        self.assertEqual(Serializer('x').dump_many([Point(1, 2), Point(3, 4)]), [{'x': 1}, {'x': 3}])
+
+
+class TestJsonRepresentation(ApiTestCase):
+    def test_list_is_encoded_with_the_serializer(self):
+        amenity = Amenity('Wifi')
+        db.session.add(amenity)
+        db.session.commit()
+        response = self.client.get('/api/v1/amenities/')
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertTrue(response.data.endswith(b'\n'))
+        self.assertEqual(json.loads(response.data), [AMENITY.dump(amenity)])
+        self.assertIn('ETag', response.headers)
+
+    def test_updated_place_has_the_detail_representation(self):
+        owner = User('Olive', 'Owner', 'owner@example.com', password='password')
+        place = Place('Loft', 'Bright loft', 80.0, 1.0, 2.0, owner.id)
+        db.session.add_all([owner, place])
+        db.session.commit()
+        url = '/api/v1/places/{}'.format(place.id)
+        headers = self.auth_headers(owner.id, is_admin=False)
+        updated = self.client.put(url, headers=headers, json={'title': 'Sunny loft', 'price': 90.0})
+        self.assertEqual(updated.status_code, 200)
+        self.assertEqual(updated.get_json(), self.client.get(url, headers=headers).get_json())
+        self.assertEqual((updated.get_json()['title'], updated.get_json()['price']), ('Sunny loft', 90.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
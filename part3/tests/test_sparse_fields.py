@@ -0,0 +1,57 @@
+import unittest
+from app import db
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.persistence.instrumentation import QueryCounter
+from tests.base import ApiTestCase
+
+
+class TestSparseFields(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        owner = User('Olive', 'Owner', 'owner@example.com', password='password')
+        self.place = Place('Loft', 'Bright loft', 80.5, 1.0, 2.0, owner.id)
+        review = Review('A long review text', 4, self.place.id, owner.id)
+        db.session.add_all([owner, self.place, review])
+        db.session.commit()
+        self.place_id = self.place.id
+        db.session.expunge_all()
+
+    def get(self, url, **kwargs):
+        with QueryCounter() as counter:
+            response = self.client.get(url, **kwargs)
+        return response, ' '.join(counter.statements)
+
+    def test_place_list_returns_and_loads_only_the_fields(self):
+        response, sql = self.get('/api/v1/places/?fields=id,price,title')
+        self.assertEqual(response.get_json(), [{'id': self.place_id, 'title': 'Loft', 'price': 80.5}])
+        self.assertIn('price_cents', sql)
+        self.assertNotIn('_description', sql)
+        self.assertNotIn('rating_1', sql)
+
+    def test_review_list_skips_the_text_column(self):
+        response, sql = self.get('/api/v1/reviews/?fields=rating')
+        self.assertEqual(response.get_json(), [{'rating': 4}])
+        self.assertNotIn('reviews.text', sql)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get('/api/v1/reviews/?fields=rating,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.get_json()['error'])
+        self.assertEqual(self.client.get('/api/v1/users/?fields=,').status_code, 400)
+        for value in ('', ' ', ' , '):
+            response = self.client.get('/api/v1/places/?fields=' + value)
+            self.assertEqual(response.status_code, 400, value)
+            self.assertIn('at least one field', response.get_json()['error'])
+
+    def test_detail_etag_depends_on_the_fields(self):
+        url = '/api/v1/places/' + self.place_id
+        full = self.client.get(url, headers=self.auth_headers())
+        narrow = self.client.get(url + '?fields=average_rating', headers=self.auth_headers())
+        self.assertEqual(narrow.get_json(), {'average_rating': None})
+        self.assertNotEqual(full.headers['ETag'], narrow.headers['ETag'])
+
+
+if __name__ == '__main__':
+    unittest.main()
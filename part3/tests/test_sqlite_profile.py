@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from sqlalchemy import create_engine, text
+from app.persistence.sqlite import init_sqlite_profile
+from config import DevelopmentConfig, ProductionConfig, get_config
+
+
+class TestSqliteProfile(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.engine = create_engine('sqlite:///' + self.path)
+
+    def tearDown(self):
+        self.engine.dispose()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def pragma(self, conn, name):
+        return conn.execute(text('PRAGMA {}'.format(name))).scalar()
+
+    def test_production_pragmas_apply_to_new_connections(self):
+        init_sqlite_profile(self.engine, ProductionConfig.SQLITE_PRAGMAS)
+        with self.engine.connect() as conn:
+            self.assertEqual(self.pragma(conn, 'journal_mode'), 'wal')
+            self.assertEqual(self.pragma(conn, 'synchronous'), 1)  # NORMAL
+            self.assertEqual(self.pragma(conn, 'busy_timeout'), 5000)
+            self.assertEqual(self.pragma(conn, 'temp_store'), 2)  # MEMORY
+
+    def test_empty_profile_keeps_sqlite_defaults(self):
+        init_sqlite_profile(self.engine, DevelopmentConfig.SQLITE_PRAGMAS)
+        with self.engine.connect() as conn:
+            self.assertEqual(self.pragma(conn, 'journal_mode'), 'delete')
+
+
+class TestGetConfig(unittest.TestCase):
+    def test_reads_hbnb_config(self):
+        with mock.patch.dict(os.environ, {'HBNB_CONFIG': 'production'}):
+            self.assertIs(get_config(), ProductionConfig)
+        with mock.patch.dict(os.environ, clear=True):
+            self.assertIs(get_config(), DevelopmentConfig)
+
+    def test_unknown_name_is_rejected(self):
+        for name in ('staging', 'admin'):
+            with self.assertRaises(ValueError):
+                get_config(name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import json
+import unittest
+from app import db
+from app.api.v1 import streaming
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from tests.base import ApiTestCase
+
+
+class TestStreaming(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        owner = User('Olive', 'Owner', 'owner@example.com', password='password')
+        places = [Place('Loft {}'.format(n), 'Bright loft', 80.0, 1.0, 2.0, owner.id) for n in range(5)]
+        db.session.add_all([owner] + places)
+        db.session.add_all(Review('Review {}'.format(n), 1 + n, place.id, owner.id) for n, place in enumerate(places))
+        db.session.commit()
+        self.page = self.client.get('/api/v1/reviews/?limit=500').get_json()
+
+    def test_stream_is_one_json_array_without_pagination(self):
+        response = self.client.get('/api/v1/reviews/?stream=true&limit=2')
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertNotIn('X-Next-Cursor', response.headers)
+        self.assertEqual(json.loads(response.data), self.page)
+
+    def test_ndjson_stream_has_one_item_per_line(self):
+        streaming.CHUNK_ITEMS, chunk_items = 2, streaming.CHUNK_ITEMS
+        try:
+            response = self.client.get('/api/v1/reviews/', headers={'Accept': streaming.NDJSON})
+            lines = response.data.decode().splitlines()
+        finally:
+            streaming.CHUNK_ITEMS = chunk_items
+        self.assertEqual(response.mimetype, streaming.NDJSON)
+        self.assertEqual([json.loads(line) for line in lines], self.page)
+
+    def test_place_stream_rejects_filters(self):
+        self.assertEqual(len(json.loads(self.client.get('/api/v1/places/?stream=1').data)), 5)
+        self.assertEqual(self.client.get('/api/v1/places/?stream=1&sort=price').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
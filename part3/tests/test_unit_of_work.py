@@ -0,0 +1,69 @@
+import unittest
+from app import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.persistence.instrumentation import QueryCounter
+from app.services.facade import HBnBFacade
+from tests.base import ApiTestCase
+
+
+class TestOneCommitPerWrite(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User('Olive', 'Owner', 'owner@example.com', password='password')
+        self.guest = User('Gus', 'Guest', 'guest@example.com', password='password')
+        self.place = Place('Loft', 'Bright loft', 80.0, 1.0, 2.0, self.owner.id)
+        self.amenity = Amenity('Wifi')
+        self.review = Review('Lovely', 5, self.place.id, self.guest.id)
+        db.session.add_all([self.owner, self.guest, self.place, self.amenity, self.review])
+        db.session.commit()
+
+    def assertOneCommit(self, method, url, status, **kwargs):
+        with QueryCounter() as counter:
+            response = getattr(self.client, method)(url, **kwargs)
+        self.assertEqual(response.status_code, status, response.get_data(as_text=True))
+        self.assertEqual(counter.commits, 1)
+
+    def test_user_writes(self):
+        self.assertOneCommit('post', '/api/v1/users/', 201, headers=self.auth_headers(), json={
+            'first_name': 'New', 'last_name': 'User', 'email': 'new@example.com', 'password': 'password'})
+        self.assertOneCommit('put', '/api/v1/users/{}'.format(self.guest.id), 200,
+                             headers=self.auth_headers(self.guest.id, False),
+                             json={'first_name': 'Gustave'})
+
+    def test_amenity_writes(self):
+        self.assertOneCommit('post', '/api/v1/amenities/', 201,
+                             headers=self.auth_headers(), json={'name': 'Pool'})
+        self.assertOneCommit('put', '/api/v1/amenities/{}'.format(self.amenity.id), 200,
+                             headers=self.auth_headers(), json={'name': 'Fast wifi'})
+
+    def test_place_writes(self):
+        headers = self.auth_headers(self.owner.id, False)
+        self.assertOneCommit('post', '/api/v1/places/', 201, headers=headers, json={
+            'title': 'Cabin', 'description': 'Quiet', 'price': 50.0, 'latitude': 3.0, 'longitude': 4.0})
+        self.assertOneCommit('put', '/api/v1/places/{}'.format(self.place.id), 200,
+                             headers=headers, json={'title': 'Sunny loft', 'price': 90.0})
+        self.assertEqual(db.session.get(Place, self.place.id).title, 'Sunny loft')
+
+    def test_review_writes(self):
+        headers = self.auth_headers(self.guest.id, False)
+        url = '/api/v1/reviews/{}'.format(self.review.id)
+        self.assertOneCommit('put', url, 200, headers=headers, json={
+            'text': 'Still lovely', 'rating': 4, 'user_id': self.guest.id, 'place_id': self.place.id})
+        self.assertOneCommit('delete', url, 200, headers=headers)
+        self.assertOneCommit('post', '/api/v1/reviews/', 201, headers=headers, json={
+            'text': 'Again', 'rating': 3, 'user_id': self.guest.id, 'place_id': self.place.id})
+
+    def test_failed_write_is_rolled_back(self):
+        facade = HBnBFacade()
+        with self.assertRaises(ValueError):
+            with facade.unit_of_work():
+                facade.create_amenity({'name': 'Sauna'})
+                facade.create_amenity({'name': ''})
+        self.assertIsNone(Amenity.query.filter_by(name='Sauna').first())
+
+
+if __name__ == '__main__':
+    unittest.main()